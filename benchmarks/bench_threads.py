@@ -0,0 +1,234 @@
+"""Threaded stress test: do concurrent calls into the Rust kernels scale?
+
+Usage:
+
+    python benchmarks/bench_threads.py
+    python benchmarks/bench_threads.py --threads 1 2 4 8 --kernels resize letterbox nms
+    RAYON_NUM_THREADS=4 python benchmarks/bench_threads.py --rayon-threads 0
+
+Every kernel in ``scanlt._rust_core`` releases the GIL for its heavy loop, so
+N Python threads each calling a kernel should get close to N times the
+throughput of one thread (up to the core count). To measure that and not
+rayon's own fan-out inside a single call, the rayon pool is pinned to one
+thread by default (``--rayon-threads 0`` leaves it alone). Each thread works on
+its own inputs, and every result is checked against the single-threaded one.
+
+A kernel that held the GIL would stay at ~1.0x however many threads run it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import threading
+import time
+from typing import Callable
+
+import numpy as np
+
+
+def _kernels(accel, h: int, w: int) -> dict[str, Callable[[], Callable[[], object]]]:
+    """Kernel name -> factory building one thread's inputs and returning the call."""
+
+    def frame(seed: int) -> np.ndarray:
+        return np.random.default_rng(seed).integers(0, 255, (h, w, 3), dtype=np.uint8)
+
+    def boxes(seed: int, n: int = 4000) -> tuple[np.ndarray, np.ndarray]:
+        rng = np.random.default_rng(seed)
+        xy = rng.uniform(0, 600, (n, 2)).astype(np.float32)
+        wh = rng.uniform(10, 80, (n, 2)).astype(np.float32)
+        return np.concatenate([xy, xy + wh], axis=1), rng.random(n, dtype=np.float32)
+
+    seed = iter(range(1_000_000))
+
+    def resize():
+        f = frame(next(seed))
+        return lambda: accel.resize_bilinear(f, h // 2, w // 2)
+
+    def resize_area():
+        f = frame(next(seed))
+        return lambda: accel.resize(f, h // 4, w // 4, "area")
+
+    def resize_planes():
+        m = np.random.default_rng(next(seed)).random((32, 160, 160), dtype=np.float32)
+        return lambda: accel.resize(m, 640, 640, planar=True)
+
+    def bgr2rgb():
+        f = frame(next(seed))
+        return lambda: accel.bgr_to_rgb(f)
+
+    def normalize():
+        f = frame(next(seed))
+        return lambda: accel.normalize_frame(f)
+
+    def letterbox():
+        f = frame(next(seed))
+        out = np.empty((1, 3, 640, 640), dtype=np.float32)
+        return lambda: accel.letterbox_normalize(f, 640, out=out)[1:]
+
+    def nms():
+        b, s = boxes(next(seed))
+        return lambda: accel.nms_boxes(b, s, 0.5)
+
+    def batched():
+        b, s = boxes(next(seed))
+        c = (np.arange(len(s)) % 8).astype(np.int32)
+        return lambda: accel.batched_nms(b, s, c, iou_threshold=0.5, max_det=300)
+
+    def iou():
+        a, _ = boxes(next(seed), 300)
+        b, _ = boxes(next(seed), 300)
+        return lambda: accel.iou_matrix(a, b)
+
+    def decode():
+        pred = np.random.default_rng(next(seed)).random((4 + 80 + 32, 8400), dtype=np.float32)
+        return lambda: accel.decode_yolo_seg(pred, 32, 0.9)
+
+    def luma():
+        f = frame(next(seed))
+        ref = accel.downsample_luma(frame(next(seed)))
+        return lambda: accel.luma_sad(accel.downsample_luma(f), ref, 16)[0]
+
+    def colormap():
+        d = np.random.default_rng(next(seed)).random((h, w), dtype=np.float32)
+        return lambda: accel.depth_to_colormap_jet(accel.normalize_depth_map(d))
+
+    def colorize():
+        d = np.random.default_rng(next(seed)).random((h, w), dtype=np.float32)
+        return lambda: accel.colorize_depth(d, 0.1, 0.9, "turbo")
+
+    def pointcloud():
+        d = np.random.default_rng(next(seed)).random((h, w), dtype=np.float32)
+        return lambda: accel.depth_to_pointcloud(d, 500.0, 500.0, w / 2, h / 2)
+
+    def draw():
+        f = frame(next(seed))
+        b, _ = boxes(next(seed), 200)
+        return lambda: accel.draw_bboxes_on_frame(f, b)
+
+    def composite():
+        f = frame(next(seed))
+        b, _ = boxes(next(seed), 50)
+        cls = (np.arange(len(b)) % 20).astype(np.int32)
+        pal = np.random.default_rng(0).integers(0, 255, (20, 3), dtype=np.uint8)
+        masks = [np.ones((40, 40), np.uint8)] * len(b)
+        labels = [f"{i}:0.50" for i in range(len(b))]
+
+        def call():
+            out = f.copy()
+            return accel.composite_detections(out, b, cls, pal, masks=masks, labels=labels)
+
+        return call
+
+    return {
+        "resize": resize,
+        "resize_area": resize_area,
+        "resize_planes": resize_planes,
+        "bgr_to_rgb": bgr2rgb,
+        "normalize": normalize,
+        "letterbox": letterbox,
+        "nms": nms,
+        "batched_nms": batched,
+        "iou_matrix": iou,
+        "decode": decode,
+        "motion": luma,
+        "colormap": colormap,
+        "colorize": colorize,
+        "pointcloud": pointcloud,
+        "draw": draw,
+        "composite": composite,
+    }
+
+
+def _same(a: object, b: object) -> bool:
+    if isinstance(a, tuple):
+        return isinstance(b, tuple) and len(a) == len(b) and all(map(_same, a, b))
+    if isinstance(a, np.ndarray):
+        return isinstance(b, np.ndarray) and a.shape == b.shape and bool(np.array_equal(a, b))
+    return a == b
+
+
+def _run(calls: list[Callable[[], object]], seconds: float) -> tuple[int, float, bool]:
+    """Run each call on its own thread for ``seconds``; return (calls, elapsed, ok)."""
+    expected = [c() for c in calls]  # warm-up + reference results
+    start = threading.Barrier(len(calls) + 1)
+    stop = threading.Event()
+    counts = [0] * len(calls)
+    ok = [True] * len(calls)
+
+    def worker(k: int) -> None:
+        call = calls[k]
+        start.wait()
+        while not stop.is_set():
+            if not _same(call(), expected[k]):
+                ok[k] = False
+            counts[k] += 1
+
+    threads = [threading.Thread(target=worker, args=(k,), daemon=True) for k in range(len(calls))]
+    for t in threads:
+        t.start()
+    start.wait()
+    t0 = time.perf_counter()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    return sum(counts), time.perf_counter() - t0, all(ok)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    ap.add_argument("--threads", type=int, nargs="+", default=None)
+    ap.add_argument("--kernels", nargs="+", default=None)
+    ap.add_argument("--width", type=int, default=1280)
+    ap.add_argument("--height", type=int, default=720)
+    ap.add_argument("--seconds", type=float, default=2.0, help="run time per measurement")
+    ap.add_argument(
+        "--rayon-threads", type=int, default=1, help="rayon pool size per call (0 = default)"
+    )
+    args = ap.parse_args()
+
+    # Must be set before the extension (and with it the rayon pool) is loaded.
+    if args.rayon_threads > 0:
+        os.environ["RAYON_NUM_THREADS"] = str(args.rayon_threads)
+    from scanlt import _accel
+
+    if not _accel.RUST_AVAILABLE:
+        print("scanlt._rust_core is not built; measuring the NumPy fallbacks instead.")
+
+    cores = os.cpu_count() or 1
+    thread_counts = args.threads or sorted({1, 2, 4, cores})
+    kernels = _kernels(_accel, args.height, args.width)
+    names = args.kernels or list(kernels)
+    unknown = [n for n in names if n not in kernels]
+    if unknown:
+        sys.exit(f"Unknown kernels: {', '.join(unknown)}. Choose from: {', '.join(kernels)}")
+
+    print(
+        f"{cores} cores, frames {args.width}x{args.height}, "
+        f"rayon threads: {os.environ.get('RAYON_NUM_THREADS', 'default')}"
+    )
+    header = f"{'kernel':<12}" + "".join(f"{f'{n} thr':>16}" for n in thread_counts)
+    print(header)
+    failed = False
+    for name in names:
+        cells = []
+        base = None
+        for n in thread_counts:
+            calls = [kernels[name]() for _ in range(n)]
+            count, dt, ok = _run(calls, args.seconds)
+            rate = count / dt
+            base = base or rate
+            cells.append(f"{rate:8.1f}/s {rate / base:4.1f}x" + ("" if ok else "!"))
+            failed |= not ok
+        print(f"{name:<12}" + "".join(f"{c:>16}" for c in cells))
+
+    if failed:
+        sys.exit("Results marked '!' differed from the single-threaded result.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Throughput vs. recall of tiled inference on high-resolution frames.
+
+Usage:
+
+    python benchmarks/bench_tiling.py --model yolov8n-seg.onnx --image street_4k.jpg
+    python benchmarks/bench_tiling.py --model yolov8n-seg.onnx --image a.jpg --labels a.txt
+
+``--labels`` is a text file with one ``x1 y1 x2 y2 [class_id]`` box per line in
+pixel coordinates. Without labels, the detections of the densest configuration
+(smallest tile, full-frame pass on) are used as the reference, so recall is
+relative to what tiling can find at all. Without ``--image`` a synthetic frame
+is used and only throughput is meaningful.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from scanlt._accel import iou_matrix
+from scanlt.onnx_yolo_seg import OnnxYoloSegDetector
+from scanlt.tiling import TileConfig, TiledDetector, tile_grid
+
+
+def _load_image(path: str | None, width: int, height: int) -> np.ndarray:
+    if path is None:
+        rng = np.random.default_rng(0)
+        return rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    from PIL import Image
+
+    return np.asarray(Image.open(path).convert("RGB"))
+
+
+def _load_labels(path: str) -> np.ndarray:
+    rows = [line.split() for line in open(path) if line.strip()]
+    return np.array([[float(v) for v in r[:4]] for r in rows], dtype=np.float32).reshape(-1, 4)
+
+
+def _recall(found: np.ndarray, reference: np.ndarray, iou: float = 0.5) -> float:
+    if len(reference) == 0:
+        return float("nan")
+    if len(found) == 0:
+        return 0.0
+    return float((iou_matrix(reference, found).max(axis=1) >= iou).mean())
+
+
+def _bench(det, frame: np.ndarray, repeats: int) -> tuple[float, np.ndarray]:
+    dets = det.predict(frame)  # warm-up
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        dets = det.predict(frame)
+    dt = (time.perf_counter() - t0) / repeats
+    boxes = np.array([d.xyxy for d in dets], dtype=np.float32).reshape(-1, 4)
+    return dt, boxes
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    ap.add_argument("--model", required=True)
+    ap.add_argument("--image")
+    ap.add_argument("--labels")
+    ap.add_argument("--width", type=int, default=3840)
+    ap.add_argument("--height", type=int, default=2160)
+    ap.add_argument("--backend", default="auto")
+    ap.add_argument("--tiles", type=int, nargs="+", default=[1280, 960, 640])
+    ap.add_argument("--overlap", type=float, default=0.2)
+    ap.add_argument("--workers", type=int, default=1, help="parallel sessions for tiles")
+    ap.add_argument("--repeats", type=int, default=5)
+    args = ap.parse_args()
+
+    frame = _load_image(args.image, args.width, args.height)
+    h, w = frame.shape[:2]
+    base = OnnxYoloSegDetector(args.model, backend=args.backend)
+    pool = [base] + [
+        OnnxYoloSegDetector(args.model, backend=args.backend) for _ in range(args.workers - 1)
+    ]
+
+    configs: list[tuple[str, object]] = [("full frame", base)]
+    for size in sorted(args.tiles, reverse=True):
+        for full in (False, True):
+            n = len(tile_grid(h, w, size, args.overlap))
+            name = f"tile {size} x{n}" + (" + full" if full else "")
+            configs.append((name, TiledDetector(pool, TileConfig(size, args.overlap, full))))
+
+    results = [(name, *_bench(det, frame, args.repeats)) for name, det in configs]
+
+    if args.labels:
+        reference = _load_labels(args.labels)
+        ref_name = args.labels
+    else:
+        # Densest configuration: smallest tile with the full-frame pass.
+        reference = results[-1][2]
+        ref_name = results[-1][0]
+
+    print(f"frame {w}x{h}, reference: {ref_name} ({len(reference)} boxes)")
+    print(f"{'config':<24} {'ms/frame':>9} {'fps':>7} {'dets':>5} {'recall':>7}")
+    for name, dt, boxes in results:
+        print(
+            f"{name:<24} {dt * 1e3:9.1f} {1.0 / dt:7.2f} {len(boxes):5d} "
+            f"{_recall(boxes, reference):7.3f}"
+        )
+
+    for _, det in configs:
+        close = getattr(det, "close", None)
+        if close is not None:
+            close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+use numpy::ndarray::Dimension;
+use numpy::{
+    Element, PyArray, PyArrayDescrMethods, PyArrayMethods, PyReadwriteArray, PyUntypedArray,
+    PyUntypedArrayMethods,
+};
+use pyo3::exceptions::PyValueError;
+use pyo3::prelude::*;
+
+/// Return the caller's `out` array after checking its dtype and shape, or a new
+/// zeroed array of `shape` when no `out` was passed.
+///
+/// `out` is taken untyped so that a wrong dtype raises the same ValueError as
+/// a wrong shape (and as the NumPy fallbacks) instead of PyO3's TypeError
+/// from argument extraction.
+pub fn out_or_zeros<'py, T: Element, D: Dimension>(
+    py: Python<'py>,
+    out: Option<Bound<'py, PyAny>>,
+    shape: D,
+) -> PyResult<Bound<'py, PyArray<T, D>>> {
+    let Some(out) = out else {
+        return Ok(PyArray::<T, D>::zeros_bound(py, shape, false));
+    };
+    let want = T::get_dtype_bound(py);
+    let arr = out.downcast::<PyUntypedArray>().map_err(|_| {
+        PyValueError::new_err(format!(
+            "out must be a {want} array of shape {}, got {}",
+            fmt_shape(shape.slice()),
+            out.get_type()
+        ))
+    })?;
+    if !arr.dtype().is_equiv_to(&want) || arr.shape() != shape.slice() {
+        return Err(PyValueError::new_err(format!(
+            "out must be a {want} array of shape {}, got {} {}",
+            fmt_shape(shape.slice()),
+            arr.dtype(),
+            fmt_shape(arr.shape())
+        )));
+    }
+    Ok(out.downcast_into::<PyArray<T, D>>()?)
+}
+
+/// Format a shape the way Python prints a tuple, e.g. `(480, 640, 3)`.
+fn fmt_shape(shape: &[usize]) -> String {
+    match shape {
+        [n] => format!("({n},)"),
+        _ => format!(
+            "({})",
+            shape
+                .iter()
+                .map(|n| n.to_string())
+                .collect::<Vec<_>>()
+                .join(", ")
+        ),
+    }
+}
+
+/// Borrow `out` mutably. Fails (instead of panicking) when `out` is also
+/// borrowed as an input, i.e. when the caller passed the same array twice.
+pub fn borrow_out<'py, T: Element, D: Dimension>(
+    out: &Bound<'py, PyArray<T, D>>,
+) -> PyResult<PyReadwriteArray<'py, T, D>> {
+    out.try_readwrite().map_err(|e| {
+        PyValueError::new_err(format!(
+            "out must not overlap the input ({e}); use the in-place variant"
+        ))
+    })
+}
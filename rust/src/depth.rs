@@ -1,29 +1,62 @@
-use numpy::ndarray::{Array2, Array3};
-use numpy::{IntoPyArray, PyArray2, PyArray3, PyReadonlyArray2};
+use std::sync::OnceLock;
+
+use numpy::ndarray::{Array2, ArrayView2, Axis, Ix2, Ix3, Zip};
+use numpy::{IntoPyArray, PyArray1, PyArray2, PyArray3, PyReadonlyArray2};
+use pyo3::exceptions::PyValueError;
 use pyo3::prelude::*;
 use rayon::prelude::*;
 
+use crate::buffers::{borrow_out, out_or_zeros};
+
+/// Min and max of a depth map in one parallel pass (NaN is ignored).
+/// Returns (inf, -inf) when there is no value.
+fn min_max(arr: &ArrayView2<f32>) -> (f32, f32) {
+    let empty = (f32::INFINITY, f32::NEG_INFINITY);
+    arr.axis_iter(Axis(0))
+        .into_par_iter()
+        .map(|row| row.iter().fold(empty, |(lo, hi), &v| (lo.min(v), hi.max(v))))
+        .reduce(|| empty, |a, b| (a.0.min(b.0), a.1.max(b.1)))
+}
+
 /// Normalize a float32 depth map to uint8 [0, 255].
+///
+/// Writes into `out` (same shape, uint8) when given. Returns the output array.
 #[pyfunction]
+#[pyo3(signature = (depth, out=None))]
 pub fn normalize_depth_map<'py>(
     py: Python<'py>,
     depth: PyReadonlyArray2<'py, f32>,
-) -> Bound<'py, PyArray2<u8>> {
+    out: Option<Bound<'py, PyAny>>,
+) -> PyResult<Bound<'py, PyArray2<u8>>> {
     let arr = depth.as_array();
-    let d_min = arr.iter().cloned().fold(f32::INFINITY, f32::min);
-    let d_max = arr.iter().cloned().fold(f32::NEG_INFINITY, f32::max);
+    let (h, w) = arr.dim();
 
-    let range = d_max - d_min;
-    if range < 1e-9 {
-        return Array2::<u8>::zeros(arr.dim()).into_pyarray_bound(py);
-    }
+    let out = out_or_zeros::<u8, _>(py, out, Ix2(h, w))?;
+    {
+        let mut dst = borrow_out(&out)?;
+        let mut view = dst.as_array_mut();
+        py.allow_threads(|| {
+            let (d_min, d_max) = min_max(&arr);
 
-    let out = arr.mapv(|v| ((v - d_min) / range * 255.0).clamp(0.0, 255.0) as u8);
-    out.into_pyarray_bound(py)
+            let range = d_max - d_min;
+            if range < 1e-9 {
+                view.fill(0);
+                return;
+            }
+
+            Zip::from(&mut view)
+                .and(&arr)
+                .par_for_each(|o, &v| *o = ((v - d_min) / range * 255.0).clamp(0.0, 255.0) as u8);
+        });
+    }
+    Ok(out)
 }
 
+/// 256-entry colormap, BGR order to match OpenCV convention.
+type Lut = [[u8; 3]; 256];
+
 /// JET LUT (BGR order to match OpenCV convention)
-fn build_jet_lut() -> [[u8; 3]; 256] {
+fn build_jet_lut() -> Lut {
     let mut lut = [[0u8; 3]; 256];
     for i in 0..256 {
         let t = i as f32 / 255.0;
@@ -72,31 +105,265 @@ fn build_jet_lut() -> [[u8; 3]; 256] {
     lut
 }
 
+/// Build a LUT from a function of t in [0, 1] returning (r, g, b) in [0, 1].
+fn build_lut(f: impl Fn(f64) -> [f64; 3]) -> Lut {
+    let mut lut = [[0u8; 3]; 256];
+    for (i, px) in lut.iter_mut().enumerate() {
+        let [r, g, b] = f(i as f64 / 255.0);
+        let q = |v: f64| (v.clamp(0.0, 1.0) * 255.0).round() as u8;
+        *px = [q(b), q(g), q(r)];
+    }
+    lut
+}
+
+/// Turbo, from its published polynomial approximation.
+fn build_turbo_lut() -> Lut {
+    build_lut(|t| {
+        let poly = |c: [f64; 6]| {
+            c[0] + t * (c[1] + t * (c[2] + t * (c[3] + t * (c[4] + t * c[5]))))
+        };
+        [
+            poly([0.13572138, 4.61539260, -42.66032258, 132.13108234, -152.94239396, 59.28637943]),
+            poly([0.09140261, 2.19418839, 4.84296658, -14.18503333, 4.27729857, 2.82956604]),
+            poly([0.10667330, 12.64194608, -60.58204836, 110.36276771, -89.90310912, 27.34824973]),
+        ]
+    })
+}
+
+/// Inferno, from a degree-6 polynomial fit of matplotlib's table.
+fn build_inferno_lut() -> Lut {
+    const C: [[f64; 3]; 7] = [
+        [0.0002189403691192265, 0.001651004631001012, -0.01948089843709184],
+        [0.1065134194856116, 0.5639564367884091, 3.932712388889277],
+        [11.60249308247187, -3.972853965665698, -15.9423941062914],
+        [-41.70399613139459, 17.43639888205313, 44.35414519872813],
+        [77.162935699427, -33.40235894210092, -81.80730925738993],
+        [-71.31942824499214, 32.62606426397723, 73.20951985803202],
+        [25.13112622477341, -12.24266895238567, -23.07032500287172],
+    ];
+    build_lut(|t| {
+        let mut rgb = [0.0; 3];
+        for (k, v) in rgb.iter_mut().enumerate() {
+            *v = C.iter().rev().fold(0.0, |acc, c| acc * t + c[k]);
+        }
+        rgb
+    })
+}
+
+/// Cached LUT of a colormap by name ("jet", "turbo" or "inferno").
+fn colormap_lut(name: &str) -> PyResult<&'static Lut> {
+    static JET: OnceLock<Lut> = OnceLock::new();
+    static TURBO: OnceLock<Lut> = OnceLock::new();
+    static INFERNO: OnceLock<Lut> = OnceLock::new();
+    match name {
+        "jet" => Ok(JET.get_or_init(build_jet_lut)),
+        "turbo" => Ok(TURBO.get_or_init(build_turbo_lut)),
+        "inferno" => Ok(INFERNO.get_or_init(build_inferno_lut)),
+        _ => Err(PyValueError::new_err(format!(
+            "Unknown colormap '{name}'. Choose one of: jet, turbo, inferno"
+        ))),
+    }
+}
+
 /// Apply JET colormap to a single-channel uint8 image → (H, W, 3) BGR uint8.
+///
+/// Writes into `out` ((H, W, 3) uint8) when given. Returns the output array.
 #[pyfunction]
+#[pyo3(signature = (depth_u8, out=None))]
 pub fn depth_to_colormap_jet<'py>(
     py: Python<'py>,
     depth_u8: PyReadonlyArray2<'py, u8>,
-) -> Bound<'py, PyArray3<u8>> {
+    out: Option<Bound<'py, PyAny>>,
+) -> PyResult<Bound<'py, PyArray3<u8>>> {
     let arr = depth_u8.as_array();
     let (h, w) = arr.dim();
-    let lut = build_jet_lut();
 
-    let mut out = Array3::<u8>::zeros((h, w, 3));
+    let out = out_or_zeros::<u8, _>(py, out, Ix3(h, w, 3))?;
+    {
+        let mut dst = borrow_out(&out)?;
+        let mut view = dst.as_array_mut();
+        let lut = colormap_lut("jet")?;
+        py.allow_threads(|| {
+            view.axis_iter_mut(Axis(0))
+                .into_par_iter()
+                .enumerate()
+                .for_each(|(i, mut row)| {
+                    for j in 0..w {
+                        let idx = arr[[i, j]] as usize;
+                        row[[j, 0]] = lut[idx][0];
+                        row[[j, 1]] = lut[idx][1];
+                        row[[j, 2]] = lut[idx][2];
+                    }
+                });
+        });
+    }
+    Ok(out)
+}
 
-    out.axis_iter_mut(ndarray::Axis(0))
-        .into_par_iter()
-        .enumerate()
-        .for_each(|(i, mut row)| {
-            for j in 0..w {
-                let idx = arr[[i, j]] as usize;
-                row[[j, 0]] = lut[idx][0];
-                row[[j, 1]] = lut[idx][1];
-                row[[j, 2]] = lut[idx][2];
+/// Histogram bins: values below the range, 256 colormap indices, values above.
+const HIST_BINS: usize = 258;
+
+/// Maps depth values in [lo, hi] to colormap indices like `normalize_depth_map`.
+#[derive(Clone, Copy)]
+struct DepthRange {
+    lo: f32,
+    hi: f32,
+    range: f32,
+}
+
+impl DepthRange {
+    /// The given bounds, with missing ones taken from the data (extra pass).
+    fn resolve(arr: &ArrayView2<f32>, lo: Option<f32>, hi: Option<f32>) -> Self {
+        let (lo, hi) = match (lo, hi) {
+            (Some(lo), Some(hi)) => (lo, hi),
+            _ => {
+                let (d_min, d_max) = min_max(arr);
+                if d_min > d_max {
+                    (0.0, 0.0)
+                } else {
+                    (lo.unwrap_or(d_min), hi.unwrap_or(d_max))
+                }
             }
-        });
+        };
+        DepthRange { lo, hi, range: hi - lo }
+    }
 
-    out.into_pyarray_bound(py)
+    #[inline]
+    fn index(&self, v: f32) -> u8 {
+        if self.range < 1e-9 {
+            return 0;
+        }
+        ((v - self.lo) / self.range * 255.0).clamp(0.0, 255.0) as u8
+    }
+
+    #[inline]
+    fn bin(&self, v: f32, idx: u8) -> usize {
+        if v < self.lo {
+            0
+        } else if v > self.hi {
+            HIST_BINS - 1
+        } else {
+            1 + idx as usize
+        }
+    }
+}
+
+/// Min, max and histogram of a depth map (NaN is skipped).
+#[derive(Clone, Copy)]
+struct DepthStats {
+    min: f32,
+    max: f32,
+    hist: [u64; HIST_BINS],
+}
+
+impl DepthStats {
+    fn new() -> Self {
+        DepthStats { min: f32::INFINITY, max: f32::NEG_INFINITY, hist: [0; HIST_BINS] }
+    }
+
+    #[inline]
+    fn add(&mut self, v: f32, bin: usize) {
+        if v.is_nan() {
+            return;
+        }
+        self.min = self.min.min(v);
+        self.max = self.max.max(v);
+        self.hist[bin] += 1;
+    }
+
+    fn merge(mut self, other: Self) -> Self {
+        self.min = self.min.min(other.min);
+        self.max = self.max.max(other.max);
+        for (a, b) in self.hist.iter_mut().zip(other.hist.iter()) {
+            *a += b;
+        }
+        self
+    }
+}
+
+/// Min, max and a 258-bin histogram of a float32 depth map.
+///
+/// Bin 0 counts values below `lo`, bins 1..=256 the colormap index each value
+/// in [lo, hi] gets from `colorize_depth`, bin 257 values above `hi`. `lo` /
+/// `hi` default to the map's min / max. NaN values are not counted.
+///
+/// Returns (min, max, hist).
+#[pyfunction]
+#[pyo3(signature = (depth, lo=None, hi=None))]
+pub fn depth_histogram<'py>(
+    py: Python<'py>,
+    depth: PyReadonlyArray2<'py, f32>,
+    lo: Option<f32>,
+    hi: Option<f32>,
+) -> (f32, f32, Bound<'py, PyArray1<u64>>) {
+    let arr = depth.as_array();
+
+    let stats = py.allow_threads(|| {
+        let map = DepthRange::resolve(&arr, lo, hi);
+        arr.axis_iter(Axis(0))
+            .into_par_iter()
+            .fold(DepthStats::new, |mut s, row| {
+                for &v in row.iter() {
+                    s.add(v, map.bin(v, map.index(v)));
+                }
+                s
+            })
+            .reduce(DepthStats::new, DepthStats::merge)
+    });
+
+    (stats.min, stats.max, PyArray1::from_slice_bound(py, &stats.hist))
+}
+
+/// Map a float32 depth map through a colormap → (H, W, 3) BGR uint8, in one
+/// parallel pass that also measures the map.
+///
+/// Values in [lo, hi] are spread over the colormap's 256 entries (the same
+/// mapping as `normalize_depth_map` for lo=min, hi=max) and clipped outside;
+/// `lo` / `hi` default to the map's min / max (one extra pass). `colormap` is
+/// "jet", "turbo" or "inferno"; the LUTs are built once per process.
+///
+/// Writes into `out` ((H, W, 3) uint8) when given.
+/// Returns (image, min, max, hist) with the statistics of `depth_histogram`.
+#[pyfunction]
+#[pyo3(signature = (depth, lo=None, hi=None, colormap="jet", out=None))]
+#[allow(clippy::type_complexity)]
+pub fn colorize_depth<'py>(
+    py: Python<'py>,
+    depth: PyReadonlyArray2<'py, f32>,
+    lo: Option<f32>,
+    hi: Option<f32>,
+    colormap: &str,
+    out: Option<Bound<'py, PyAny>>,
+) -> PyResult<(Bound<'py, PyArray3<u8>>, f32, f32, Bound<'py, PyArray1<u64>>)> {
+    let arr = depth.as_array();
+    let (h, w) = arr.dim();
+    let lut = colormap_lut(colormap)?;
+
+    let out = out_or_zeros::<u8, _>(py, out, Ix3(h, w, 3))?;
+    let stats = {
+        let mut dst = borrow_out(&out)?;
+        let mut view = dst.as_array_mut();
+        py.allow_threads(|| {
+            let map = DepthRange::resolve(&arr, lo, hi);
+            view.axis_iter_mut(Axis(0))
+                .into_par_iter()
+                .zip(arr.axis_iter(Axis(0)).into_par_iter())
+                .fold(DepthStats::new, |mut s, (mut orow, drow)| {
+                    for (j, &v) in drow.iter().enumerate() {
+                        let idx = map.index(v);
+                        let px = lut[idx as usize];
+                        orow[[j, 0]] = px[0];
+                        orow[[j, 1]] = px[1];
+                        orow[[j, 2]] = px[2];
+                        s.add(v, map.bin(v, idx));
+                    }
+                    s
+                })
+                .reduce(DepthStats::new, DepthStats::merge)
+        })
+    };
+
+    Ok((out, stats.min, stats.max, PyArray1::from_slice_bound(py, &stats.hist)))
 }
 
 /// Back-project a (H, W) depth map to (H*W, 3) XYZ point cloud.
@@ -113,19 +380,22 @@ pub fn depth_to_pointcloud<'py>(
     let (h, w) = arr.dim();
     let n = h * w;
 
-    let mut out = Array2::<f32>::zeros((n, 3));
+    let out = py.allow_threads(|| {
+        let mut out = Array2::<f32>::zeros((n, 3));
 
-    out.axis_iter_mut(ndarray::Axis(0))
-        .into_par_iter()
-        .enumerate()
-        .for_each(|(idx, mut point)| {
-            let i = idx / w;
-            let j = idx % w;
-            let z = arr[[i, j]];
-            point[0] = (j as f32 - cx) * z / fx;
-            point[1] = (i as f32 - cy) * z / fy;
-            point[2] = z;
-        });
+        out.axis_iter_mut(Axis(0))
+            .into_par_iter()
+            .enumerate()
+            .for_each(|(idx, mut point)| {
+                let i = idx / w;
+                let j = idx % w;
+                let z = arr[[i, j]];
+                point[0] = (j as f32 - cx) * z / fx;
+                point[1] = (i as f32 - cy) * z / fy;
+                point[2] = z;
+            });
+        out
+    });
 
     out.into_pyarray_bound(py)
 }
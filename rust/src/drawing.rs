@@ -1,28 +1,24 @@
-use numpy::IntoPyArray;
-use numpy::{PyArray3, PyReadonlyArray2, PyReadonlyArray3};
+use numpy::ndarray::{ArrayView2, ArrayViewMut2, ArrayViewMut3, Axis, Ix3};
+use numpy::{PyArray3, PyReadonlyArray1, PyReadonlyArray2, PyReadonlyArray3, PyReadwriteArray3};
+use pyo3::exceptions::PyValueError;
 use pyo3::prelude::*;
+use rayon::prelude::*;
 
-/// Draw rectangles on a (H, W, 3) uint8 image. Returns a new array.
-///
-/// boxes: (N, 4) float32 [x1, y1, x2, y2]
-/// color: (R, G, B) tuple
-/// thickness: line thickness in pixels
-#[pyfunction]
-#[pyo3(signature = (frame, boxes, color=(0, 255, 0), thickness=2))]
-pub fn draw_bboxes_on_frame<'py>(
-    py: Python<'py>,
-    frame: PyReadonlyArray3<'py, u8>,
-    boxes: PyReadonlyArray2<'py, f32>,
-    color: (u8, u8, u8),
+use crate::buffers::{borrow_out, out_or_zeros};
+
+/// Draw rectangle outlines from `boxes` ((N, 4) x1, y1, x2, y2) onto `out`.
+fn draw_boxes_into(
+    out: &mut ArrayViewMut3<u8>,
+    b: &ArrayView2<f32>,
+    pixel: [u8; 3],
     thickness: usize,
-) -> Bound<'py, PyArray3<u8>> {
-    let arr = frame.as_array();
-    let (h, w, _c) = arr.dim();
-    let mut out = arr.to_owned();
-    let b = boxes.as_array();
-    let n = b.nrows();
+) {
+    let (h, w, _c) = out.dim();
+    if h == 0 || w == 0 {
+        return;
+    }
 
-    for idx in 0..n {
+    for idx in 0..b.nrows() {
         let x1 = (b[[idx, 0]] as isize).clamp(0, w as isize - 1) as usize;
         let y1 = (b[[idx, 1]] as isize).clamp(0, h as isize - 1) as usize;
         let x2 = (b[[idx, 2]] as isize).clamp(0, w as isize - 1) as usize;
@@ -32,8 +28,6 @@ pub fn draw_bboxes_on_frame<'py>(
             continue;
         }
 
-        let pixel = [color.0, color.1, color.2];
-
         // Top edge
         for dy in 0..thickness.min(y2 - y1) {
             let y = y1 + dy;
@@ -75,6 +69,486 @@ pub fn draw_bboxes_on_frame<'py>(
             }
         }
     }
+}
+
+/// Draw rectangles on a (H, W, 3) uint8 image. Returns a new array.
+///
+/// boxes: (N, 4) float32 [x1, y1, x2, y2]
+/// color: (R, G, B) tuple
+/// thickness: line thickness in pixels
+/// out: optional (H, W, 3) uint8 array receiving the frame with the boxes
+///      (returned instead of a new array)
+#[pyfunction]
+#[pyo3(signature = (frame, boxes, color=(0, 255, 0), thickness=2, out=None))]
+pub fn draw_bboxes_on_frame<'py>(
+    py: Python<'py>,
+    frame: PyReadonlyArray3<'py, u8>,
+    boxes: PyReadonlyArray2<'py, f32>,
+    color: (u8, u8, u8),
+    thickness: usize,
+    out: Option<Bound<'py, PyAny>>,
+) -> PyResult<Bound<'py, PyArray3<u8>>> {
+    let arr = frame.as_array();
+    let b = boxes.as_array();
+    let (h, w, c) = arr.dim();
+
+    let out = out_or_zeros::<u8, _>(py, out, Ix3(h, w, c))?;
+    {
+        let mut dst = borrow_out(&out)?;
+        let mut view = dst.as_array_mut();
+        py.allow_threads(|| {
+            view.assign(&arr);
+            draw_boxes_into(&mut view, &b, [color.0, color.1, color.2], thickness);
+        });
+    }
+    Ok(out)
+}
+
+/// Draw rectangles directly onto a (H, W, 3) uint8 image (no copy).
+#[pyfunction]
+#[pyo3(signature = (frame, boxes, color=(0, 255, 0), thickness=2))]
+pub fn draw_bboxes_inplace<'py>(
+    py: Python<'py>,
+    mut frame: PyReadwriteArray3<'py, u8>,
+    boxes: PyReadonlyArray2<'py, f32>,
+    color: (u8, u8, u8),
+    thickness: usize,
+) {
+    let mut arr = frame.as_array_mut();
+    let b = boxes.as_array();
+
+    py.allow_threads(|| draw_boxes_into(&mut arr, &b, [color.0, color.1, color.2], thickness));
+}
+
+/// 5x7 bitmap font for printable ASCII (0x20..=0x7E). Each glyph is five
+/// columns, bit 0 is the top row.
+const FONT_5X7: [[u8; 5]; 95] = [
+    [0x00, 0x00, 0x00, 0x00, 0x00], // ' '
+    [0x00, 0x00, 0x5F, 0x00, 0x00], // '!'
+    [0x00, 0x07, 0x00, 0x07, 0x00], // '"'
+    [0x14, 0x7F, 0x14, 0x7F, 0x14], // '#'
+    [0x24, 0x2A, 0x7F, 0x2A, 0x12], // '$'
+    [0x23, 0x13, 0x08, 0x64, 0x62], // '%'
+    [0x36, 0x49, 0x55, 0x22, 0x50], // '&'
+    [0x00, 0x05, 0x03, 0x00, 0x00], // "'"
+    [0x00, 0x1C, 0x22, 0x41, 0x00], // '('
+    [0x00, 0x41, 0x22, 0x1C, 0x00], // ')'
+    [0x08, 0x2A, 0x1C, 0x2A, 0x08], // '*'
+    [0x08, 0x08, 0x3E, 0x08, 0x08], // '+'
+    [0x00, 0x50, 0x30, 0x00, 0x00], // ','
+    [0x08, 0x08, 0x08, 0x08, 0x08], // '-'
+    [0x00, 0x60, 0x60, 0x00, 0x00], // '.'
+    [0x20, 0x10, 0x08, 0x04, 0x02], // '/'
+    [0x3E, 0x51, 0x49, 0x45, 0x3E], // '0'
+    [0x00, 0x42, 0x7F, 0x40, 0x00], // '1'
+    [0x42, 0x61, 0x51, 0x49, 0x46], // '2'
+    [0x21, 0x41, 0x45, 0x4B, 0x31], // '3'
+    [0x18, 0x14, 0x12, 0x7F, 0x10], // '4'
+    [0x27, 0x45, 0x45, 0x45, 0x39], // '5'
+    [0x3C, 0x4A, 0x49, 0x49, 0x30], // '6'
+    [0x01, 0x71, 0x09, 0x05, 0x03], // '7'
+    [0x36, 0x49, 0x49, 0x49, 0x36], // '8'
+    [0x06, 0x49, 0x49, 0x29, 0x1E], // '9'
+    [0x00, 0x36, 0x36, 0x00, 0x00], // ':'
+    [0x00, 0x56, 0x36, 0x00, 0x00], // ';'
+    [0x08, 0x14, 0x22, 0x41, 0x00], // '<'
+    [0x14, 0x14, 0x14, 0x14, 0x14], // '='
+    [0x00, 0x41, 0x22, 0x14, 0x08], // '>'
+    [0x02, 0x01, 0x51, 0x09, 0x06], // '?'
+    [0x32, 0x49, 0x79, 0x41, 0x3E], // '@'
+    [0x7E, 0x11, 0x11, 0x11, 0x7E], // 'A'
+    [0x7F, 0x49, 0x49, 0x49, 0x36], // 'B'
+    [0x3E, 0x41, 0x41, 0x41, 0x22], // 'C'
+    [0x7F, 0x41, 0x41, 0x22, 0x1C], // 'D'
+    [0x7F, 0x49, 0x49, 0x49, 0x41], // 'E'
+    [0x7F, 0x09, 0x09, 0x09, 0x01], // 'F'
+    [0x3E, 0x41, 0x49, 0x49, 0x7A], // 'G'
+    [0x7F, 0x08, 0x08, 0x08, 0x7F], // 'H'
+    [0x00, 0x41, 0x7F, 0x41, 0x00], // 'I'
+    [0x20, 0x40, 0x41, 0x3F, 0x01], // 'J'
+    [0x7F, 0x08, 0x14, 0x22, 0x41], // 'K'
+    [0x7F, 0x40, 0x40, 0x40, 0x40], // 'L'
+    [0x7F, 0x02, 0x0C, 0x02, 0x7F], // 'M'
+    [0x7F, 0x04, 0x08, 0x10, 0x7F], // 'N'
+    [0x3E, 0x41, 0x41, 0x41, 0x3E], // 'O'
+    [0x7F, 0x09, 0x09, 0x09, 0x06], // 'P'
+    [0x3E, 0x41, 0x51, 0x21, 0x5E], // 'Q'
+    [0x7F, 0x09, 0x19, 0x29, 0x46], // 'R'
+    [0x46, 0x49, 0x49, 0x49, 0x31], // 'S'
+    [0x01, 0x01, 0x7F, 0x01, 0x01], // 'T'
+    [0x3F, 0x40, 0x40, 0x40, 0x3F], // 'U'
+    [0x1F, 0x20, 0x40, 0x20, 0x1F], // 'V'
+    [0x3F, 0x40, 0x38, 0x40, 0x3F], // 'W'
+    [0x63, 0x14, 0x08, 0x14, 0x63], // 'X'
+    [0x07, 0x08, 0x70, 0x08, 0x07], // 'Y'
+    [0x61, 0x51, 0x49, 0x45, 0x43], // 'Z'
+    [0x00, 0x7F, 0x41, 0x41, 0x00], // '['
+    [0x02, 0x04, 0x08, 0x10, 0x20], // '\\'
+    [0x00, 0x41, 0x41, 0x7F, 0x00], // ']'
+    [0x04, 0x02, 0x01, 0x02, 0x04], // '^'
+    [0x40, 0x40, 0x40, 0x40, 0x40], // '_'
+    [0x00, 0x01, 0x02, 0x04, 0x00], // '`'
+    [0x20, 0x54, 0x54, 0x54, 0x78], // 'a'
+    [0x7F, 0x48, 0x44, 0x44, 0x38], // 'b'
+    [0x38, 0x44, 0x44, 0x44, 0x20], // 'c'
+    [0x38, 0x44, 0x44, 0x48, 0x7F], // 'd'
+    [0x38, 0x54, 0x54, 0x54, 0x18], // 'e'
+    [0x08, 0x7E, 0x09, 0x01, 0x02], // 'f'
+    [0x0C, 0x52, 0x52, 0x52, 0x3E], // 'g'
+    [0x7F, 0x08, 0x04, 0x04, 0x78], // 'h'
+    [0x00, 0x44, 0x7D, 0x40, 0x00], // 'i'
+    [0x20, 0x40, 0x44, 0x3D, 0x00], // 'j'
+    [0x7F, 0x10, 0x28, 0x44, 0x00], // 'k'
+    [0x00, 0x41, 0x7F, 0x40, 0x00], // 'l'
+    [0x7C, 0x04, 0x18, 0x04, 0x78], // 'm'
+    [0x7C, 0x08, 0x04, 0x04, 0x78], // 'n'
+    [0x38, 0x44, 0x44, 0x44, 0x38], // 'o'
+    [0x7C, 0x14, 0x14, 0x14, 0x08], // 'p'
+    [0x08, 0x14, 0x14, 0x18, 0x7C], // 'q'
+    [0x7C, 0x08, 0x04, 0x04, 0x08], // 'r'
+    [0x48, 0x54, 0x54, 0x54, 0x20], // 's'
+    [0x04, 0x3F, 0x44, 0x40, 0x20], // 't'
+    [0x3C, 0x40, 0x40, 0x20, 0x7C], // 'u'
+    [0x1C, 0x20, 0x40, 0x20, 0x1C], // 'v'
+    [0x3C, 0x40, 0x30, 0x40, 0x3C], // 'w'
+    [0x44, 0x28, 0x10, 0x28, 0x44], // 'x'
+    [0x0C, 0x50, 0x50, 0x50, 0x3C], // 'y'
+    [0x44, 0x64, 0x54, 0x4C, 0x44], // 'z'
+    [0x00, 0x08, 0x36, 0x41, 0x00], // '{'
+    [0x00, 0x00, 0x7F, 0x00, 0x00], // '|'
+    [0x00, 0x41, 0x36, 0x08, 0x00], // '}'
+    [0x08, 0x04, 0x08, 0x10, 0x08], // '~'
+];
+
+/// Label text cell: 5 glyph columns + 1 column spacing, 7 rows.
+const GLYPH_W: usize = 6;
+const GLYPH_H: usize = 7;
+
+fn glyph(ch: u8) -> &'static [u8; 5] {
+    let idx = if (0x20..=0x7E).contains(&ch) { ch - 0x20 } else { b'?' - 0x20 };
+    &FONT_5X7[idx as usize]
+}
+
+/// Black or white, whichever reads better on `bg`. The weights are symmetric
+/// in channels 0 and 2, so RGB and BGR colors give the same answer.
+fn text_color(bg: [u8; 3]) -> [u8; 3] {
+    let luma = (bg[0] as u32 + 2 * bg[1] as u32 + bg[2] as u32) / 4;
+    if luma > 140 {
+        [0, 0, 0]
+    } else {
+        [255, 255, 255]
+    }
+}
+
+/// A label's filled background rectangle and text, in frame pixels.
+/// (x, y) may be negative; drawing clips to the frame.
+struct Label {
+    x: isize,
+    y: isize,
+    w: usize,
+    h: usize,
+    scale: usize,
+    text: Vec<u8>,
+    fg: [u8; 3],
+}
+
+impl Label {
+    fn new(text: &str, x1: isize, y1: isize, scale: usize, bg: [u8; 3]) -> Self {
+        let text: Vec<u8> = text.bytes().collect();
+        let s = scale.max(1);
+        let w = text.len() * GLYPH_W * s + s;
+        let h = (GLYPH_H + 2) * s;
+        // Above the box when it fits, otherwise just inside its top edge.
+        let y = if y1 >= h as isize { y1 - h as isize } else { y1 };
+        Label { x: x1, y, w, h, scale: s, text, fg: text_color(bg) }
+    }
+
+    /// Label pixel (row r, column c) is text (true) or background (false).
+    #[inline]
+    fn is_ink(&self, r: usize, c: usize) -> bool {
+        let s = self.scale;
+        if r < s || c < s {
+            return false;
+        }
+        let (gr, c) = ((r - s) / s, c - s);
+        if gr >= GLYPH_H {
+            return false;
+        }
+        let cell = c / (GLYPH_W * s);
+        let gc = (c % (GLYPH_W * s)) / s;
+        cell < self.text.len() && gc < 5 && (glyph(self.text[cell])[gc] >> gr) & 1 == 1
+    }
+}
+
+/// One detection prepared for the row pass.
+struct Item<'a> {
+    // Box outline, clamped to the frame; None when the box is degenerate.
+    rect: Option<(usize, usize, usize, usize)>,
+    color: [u8; 3],
+    // Mask (nonzero = inside) and the frame position of its top-left pixel.
+    mask: Option<(ArrayView2<'a, u8>, isize, isize)>,
+    label: Option<Label>,
+}
+
+#[inline]
+fn blend(px: u8, col: u8, a: u32) -> u8 {
+    ((px as u32 * (256 - a) + col as u32 * a + 128) >> 8) as u8
+}
+
+/// Draw every item onto one frame row, in item order (mask, outline, label).
+fn composite_row(row: &mut ArrayViewMut2<u8>, y: usize, items: &[Item], a: u32, thickness: usize) {
+    let w = row.nrows();
+    let yi = y as isize;
+
+    for it in items {
+        let c = it.color;
+
+        if let Some((m, ox, oy)) = &it.mask {
+            let (mh, mw) = m.dim();
+            if yi >= *oy && yi < oy + mh as isize {
+                let my = (yi - oy) as usize;
+                let x0 = (-ox).max(0) as usize;
+                let x1 = ((w as isize - ox).max(0) as usize).min(mw);
+                for mx in x0..x1 {
+                    if m[[my, mx]] != 0 {
+                        let x = (ox + mx as isize) as usize;
+                        for k in 0..3 {
+                            row[[x, k]] = blend(row[[x, k]], c[k], a);
+                        }
+                    }
+                }
+            }
+        }
+
+        if let Some((x1, y1, x2, y2)) = it.rect {
+            if y >= y1 && y <= y2 {
+                let ty = thickness.min(y2 - y1);
+                let tx = thickness.min(x2 - x1);
+                let spans = if y < y1 + ty || y + ty > y2 {
+                    // Top / bottom edge: the whole width of the box.
+                    [(x1, x2 + 1), (0, 0)]
+                } else {
+                    // Left / right edges.
+                    [(x1, x1 + tx), (x2 + 1 - tx, x2 + 1)]
+                };
+                for (a0, a1) in spans {
+                    for x in a0..a1 {
+                        row[[x, 0]] = c[0];
+                        row[[x, 1]] = c[1];
+                        row[[x, 2]] = c[2];
+                    }
+                }
+            }
+        }
+
+        if let Some(l) = &it.label {
+            if yi >= l.y && yi < l.y + l.h as isize {
+                let r = (yi - l.y) as usize;
+                let c0 = (-l.x).max(0) as usize;
+                let c1 = ((w as isize - l.x).max(0) as usize).min(l.w);
+                for cx in c0..c1 {
+                    let x = (l.x + cx as isize) as usize;
+                    let px = if l.is_ink(r, cx) { l.fg } else { c };
+                    row[[x, 0]] = px[0];
+                    row[[x, 1]] = px[1];
+                    row[[x, 2]] = px[2];
+                }
+            }
+        }
+    }
+}
+
+/// Draw detections onto a (H, W, 3) uint8 frame in place, in one parallel pass
+/// over the frame rows (rows nothing touches are skipped).
+///
+/// boxes: (N, 4) float32 [x1, y1, x2, y2]
+/// class_ids: (N,) int32; detection i is drawn in palette[class_ids[i] % K]
+/// palette: (K, 3) uint8 colors, in the frame's channel order
+/// masks: optional list of N box-relative (h, w) uint8 masks (nonzero = inside)
+///        or None entries; mask_origins (N, 2) int32 gives each mask's (x, y)
+///        in the frame (default: the box's top-left corner)
+/// labels: optional list of N strings drawn on a filled tag above each box
+///         ("" = no label), scaled by `text_scale`
+/// alpha: mask opacity, applied in 8-bit fixed point
+///
+/// Detections are drawn in order: later ones cover earlier ones.
+#[pyfunction]
+#[pyo3(signature = (
+    frame,
+    boxes,
+    class_ids,
+    palette,
+    masks=None,
+    mask_origins=None,
+    labels=None,
+    alpha=0.45,
+    thickness=2,
+    text_scale=1
+))]
+#[allow(clippy::too_many_arguments)]
+pub fn composite_detections<'py>(
+    py: Python<'py>,
+    mut frame: PyReadwriteArray3<'py, u8>,
+    boxes: PyReadonlyArray2<'py, f32>,
+    class_ids: PyReadonlyArray1<'py, i32>,
+    palette: PyReadonlyArray2<'py, u8>,
+    masks: Option<Vec<Option<PyReadonlyArray2<'py, u8>>>>,
+    mask_origins: Option<PyReadonlyArray2<'py, i32>>,
+    labels: Option<Vec<String>>,
+    alpha: f32,
+    thickness: usize,
+    text_scale: usize,
+) -> PyResult<()> {
+    let mut arr = frame.as_array_mut();
+    let (h, w, c) = arr.dim();
+    let b = boxes.as_array();
+    let cls = class_ids.as_array();
+    let pal = palette.as_array();
+    let n = b.nrows();
+
+    if c != 3 {
+        return Err(PyValueError::new_err("frame must be (H, W, 3) uint8"));
+    }
+    if b.ncols() != 4 || cls.len() != n {
+        return Err(PyValueError::new_err("boxes must be (N, 4) and class_ids (N,)"));
+    }
+    if pal.nrows() == 0 || pal.ncols() != 3 {
+        return Err(PyValueError::new_err("palette must be a non-empty (K, 3) uint8 array"));
+    }
+    if masks.as_ref().is_some_and(|m| m.len() != n) {
+        return Err(PyValueError::new_err("masks must have one entry per box"));
+    }
+    if labels.as_ref().is_some_and(|l| l.len() != n) {
+        return Err(PyValueError::new_err("labels must have one entry per box"));
+    }
+    let origins = mask_origins.as_ref().map(|o| o.as_array());
+    if origins.as_ref().is_some_and(|o| o.nrows() != n || o.ncols() != 2) {
+        return Err(PyValueError::new_err("mask_origins must be (N, 2) int32"));
+    }
+    if h == 0 || w == 0 || n == 0 {
+        return Ok(());
+    }
+
+    let mask_views: Vec<Option<ArrayView2<u8>>> = match &masks {
+        Some(ms) => ms.iter().map(|m| m.as_ref().map(|a| a.as_array())).collect(),
+        None => vec![None; n],
+    };
+
+    py.allow_threads(|| {
+        let k = pal.nrows();
+        let items: Vec<Item> = (0..n)
+            .map(|i| {
+                let ci = (cls[i] as i64).rem_euclid(k as i64) as usize;
+                let color = [pal[[ci, 0]], pal[[ci, 1]], pal[[ci, 2]]];
+
+                let x1 = (b[[i, 0]] as isize).clamp(0, w as isize - 1) as usize;
+                let y1 = (b[[i, 1]] as isize).clamp(0, h as isize - 1) as usize;
+                let x2 = (b[[i, 2]] as isize).clamp(0, w as isize - 1) as usize;
+                let y2 = (b[[i, 3]] as isize).clamp(0, h as isize - 1) as usize;
+                let rect = if x2 > x1 && y2 > y1 { Some((x1, y1, x2, y2)) } else { None };
+
+                let mask = mask_views[i].clone().map(|m| match &origins {
+                    Some(o) => (m, o[[i, 0]] as isize, o[[i, 1]] as isize),
+                    None => (m, b[[i, 0]] as isize, b[[i, 1]] as isize),
+                });
+
+                let label = labels
+                    .as_ref()
+                    .map(|l| &l[i])
+                    .filter(|t| !t.is_empty())
+                    .map(|t| Label::new(t, x1 as isize, y1 as isize, text_scale, color));
+
+                Item { rect, color, mask, label }
+            })
+            .collect();
+
+        // Rows any item can touch; everything else is left alone.
+        let mut touched = vec![false; h];
+        for it in &items {
+            let mut mark = |y0: isize, y1: isize| {
+                for y in y0.max(0)..y1.min(h as isize) {
+                    touched[y as usize] = true;
+                }
+            };
+            if let Some((_, y1, _, y2)) = it.rect {
+                mark(y1 as isize, y2 as isize + 1);
+            }
+            if let Some((m, _, oy)) = &it.mask {
+                mark(*oy, oy + m.nrows() as isize);
+            }
+            if let Some(l) = &it.label {
+                mark(l.y, l.y + l.h as isize);
+            }
+        }
+
+        let a = (alpha.clamp(0.0, 1.0) * 256.0).round() as u32;
+        arr.axis_iter_mut(Axis(0))
+            .into_par_iter()
+            .enumerate()
+            .filter(|(y, _)| touched[*y])
+            .for_each(|(y, mut row)| composite_row(&mut row, y, &items, a, thickness));
+    });
+
+    Ok(())
+}
+
+/// Draw `text` with the built-in 5x7 font; (x, y) is the top-left corner of
+/// its tag (one `scale` of padding around the glyphs).
+///
+/// With `background` the text sits on a filled tag of that color; otherwise
+/// only the glyph pixels are drawn, in `color`.
+#[pyfunction]
+#[pyo3(signature = (frame, text, x, y, color=(255, 255, 255), scale=1, background=None))]
+#[allow(clippy::too_many_arguments)]
+pub fn draw_text<'py>(
+    py: Python<'py>,
+    mut frame: PyReadwriteArray3<'py, u8>,
+    text: &str,
+    x: isize,
+    y: isize,
+    color: (u8, u8, u8),
+    scale: usize,
+    background: Option<(u8, u8, u8)>,
+) -> PyResult<()> {
+    let mut arr = frame.as_array_mut();
+    let (h, w, c) = arr.dim();
+    if c != 3 {
+        return Err(PyValueError::new_err("frame must be (H, W, 3) uint8"));
+    }
 
-    out.into_pyarray_bound(py)
+    let s = scale.max(1);
+    let label = Label {
+        x,
+        y,
+        w: text.len() * GLYPH_W * s + s,
+        h: (GLYPH_H + 2) * s,
+        scale: s,
+        text: text.bytes().collect(),
+        fg: [color.0, color.1, color.2],
+    };
+    let bg = background.map(|b| [b.0, b.1, b.2]);
+
+    py.allow_threads(|| {
+        for r in 0..label.h {
+            let fy = y + r as isize;
+            if fy < 0 || fy >= h as isize {
+                continue;
+            }
+            for cx in 0..label.w {
+                let fx = x + cx as isize;
+                if fx < 0 || fx >= w as isize {
+                    continue;
+                }
+                let px = match (label.is_ink(r, cx), bg) {
+                    (true, _) => label.fg,
+                    (false, Some(bg)) => bg,
+                    (false, None) => continue,
+                };
+                for k in 0..3 {
+                    arr[[fy as usize, fx as usize, k]] = px[k];
+                }
+            }
+        }
+    });
+    Ok(())
 }
@@ -1,23 +1,38 @@
-use numpy::ndarray::Array3;
-use numpy::{IntoPyArray, PyArray3};
+use numpy::ndarray::{s, Ix3};
+use numpy::PyArray3;
 use pyo3::prelude::*;
 
+use crate::buffers::{borrow_out, out_or_zeros};
+
 /// Generate a (H, W, 3) uint8 test frame with a moving green square.
+///
+/// Draws into `out` ((H, W, 3) uint8) when given. Returns the output array.
 #[pyfunction]
-pub fn generate_dummy_frame<'py>(py: Python<'py>, h: usize, w: usize, t: f64) -> Bound<'py, PyArray3<u8>> {
-    let mut frame = Array3::<u8>::zeros((h, w, 3));
+#[pyo3(signature = (h, w, t, out=None))]
+pub fn generate_dummy_frame<'py>(
+    py: Python<'py>,
+    h: usize,
+    w: usize,
+    t: f64,
+    out: Option<Bound<'py, PyAny>>,
+) -> PyResult<Bound<'py, PyArray3<u8>>> {
+    let out = out_or_zeros::<u8, _>(py, out, Ix3(h, w, 3))?;
+    {
+        let mut dst = borrow_out(&out)?;
+        let mut frame = dst.as_array_mut();
+        py.allow_threads(|| {
+            frame.fill(0);
 
-    let x = ((t.sin() * 0.4 + 0.5) * (w as f64 - 80.0)) as usize;
-    let y = ((t.cos() * 0.4 + 0.5) * (h as f64 - 80.0)) as usize;
+            let x = ((t.sin() * 0.4 + 0.5) * (w as f64 - 80.0)) as usize;
+            let y = ((t.cos() * 0.4 + 0.5) * (h as f64 - 80.0)) as usize;
 
-    let x_end = (x + 80).min(w);
-    let y_end = (y + 80).min(h);
+            let x_end = (x + 80).min(w);
+            let y_end = (y + 80).min(h);
 
-    for i in y..y_end {
-        for j in x..x_end {
-            frame[[i, j, 1]] = 255; // Green channel
-        }
+            if x < x_end && y < y_end {
+                frame.slice_mut(s![y..y_end, x..x_end, 1]).fill(255); // Green channel
+            }
+        });
     }
-
-    frame.into_pyarray_bound(py)
+    Ok(out)
 }
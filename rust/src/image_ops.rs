@@ -1,93 +1,260 @@
-use numpy::ndarray::Array3;
-use numpy::{PyArray3, PyReadonlyArray3, IntoPyArray};
+use numpy::ndarray::{Array3, ArrayView3, ArrayViewMut3, Axis, Ix3, Zip};
+use numpy::{PyArray3, PyReadonlyArray3, PyReadwriteArray3, PyReadwriteArray4};
+use pyo3::exceptions::PyValueError;
 use pyo3::prelude::*;
 use rayon::prelude::*;
 
-/// Convert a (H, W, 3) BGR uint8 image to RGB by swapping channels 0 and 2.
-#[pyfunction]
-pub fn bgr_to_rgb<'py>(py: Python<'py>, frame: PyReadonlyArray3<'py, u8>) -> Bound<'py, PyArray3<u8>> {
-    let arr = frame.as_array();
-    let (h, w, _c) = arr.dim();
-    let mut out = Array3::<u8>::zeros((h, w, 3));
+use crate::buffers::{borrow_out, out_or_zeros};
+use crate::resize::{self, resize_planes_into, Filter};
 
-    // Parallel over rows
-    out.axis_iter_mut(ndarray::Axis(0))
+/// Swap channels 0 and 2 of `src` into `dst` (same shape), parallel over rows.
+fn swap_rb_into(src: &ArrayView3<u8>, dst: &mut ArrayViewMut3<u8>) {
+    let w = src.dim().1;
+    dst.axis_iter_mut(Axis(0))
         .into_par_iter()
         .enumerate()
         .for_each(|(i, mut row)| {
             for j in 0..w {
-                row[[j, 0]] = arr[[i, j, 2]]; // R ← B
-                row[[j, 1]] = arr[[i, j, 1]]; // G ← G
-                row[[j, 2]] = arr[[i, j, 0]]; // B ← R
+                row[[j, 0]] = src[[i, j, 2]]; // R ← B
+                row[[j, 1]] = src[[i, j, 1]]; // G ← G
+                row[[j, 2]] = src[[i, j, 0]]; // B ← R
             }
         });
+}
 
-    out.into_pyarray_bound(py)
+/// Convert a (H, W, 3) BGR uint8 image to RGB by swapping channels 0 and 2.
+///
+/// Writes into `out` (same shape, must not be `frame` itself) when given,
+/// otherwise into a new array. Returns the output array.
+#[pyfunction]
+#[pyo3(signature = (frame, out=None))]
+pub fn bgr_to_rgb<'py>(
+    py: Python<'py>,
+    frame: PyReadonlyArray3<'py, u8>,
+    out: Option<Bound<'py, PyAny>>,
+) -> PyResult<Bound<'py, PyArray3<u8>>> {
+    let arr = frame.as_array();
+    let (h, w, c) = arr.dim();
+    if c != 3 {
+        return Err(PyValueError::new_err("frame must be (H, W, 3) uint8"));
+    }
+
+    let out = out_or_zeros::<u8, _>(py, out, Ix3(h, w, 3))?;
+    {
+        let mut dst = borrow_out(&out)?;
+        let mut view = dst.as_array_mut();
+        py.allow_threads(|| swap_rb_into(&arr, &mut view));
+    }
+    Ok(out)
 }
 
 /// Convert a (H, W, 3) RGB uint8 image to BGR.
 #[pyfunction]
-pub fn rgb_to_bgr<'py>(py: Python<'py>, frame: PyReadonlyArray3<'py, u8>) -> Bound<'py, PyArray3<u8>> {
+#[pyo3(signature = (frame, out=None))]
+pub fn rgb_to_bgr<'py>(
+    py: Python<'py>,
+    frame: PyReadonlyArray3<'py, u8>,
+    out: Option<Bound<'py, PyAny>>,
+) -> PyResult<Bound<'py, PyArray3<u8>>> {
     // Channel swap is symmetric: RGB→BGR is the same as BGR→RGB.
-    bgr_to_rgb(py, frame)
+    bgr_to_rgb(py, frame, out)
 }
 
-/// Resize a (H, W, 3) uint8 image using bilinear interpolation.
+/// Swap channels 0 and 2 of a (H, W, 3) uint8 image in place (RGB <-> BGR).
 #[pyfunction]
+pub fn swap_rb_inplace<'py>(py: Python<'py>, mut frame: PyReadwriteArray3<'py, u8>) -> PyResult<()> {
+    let mut arr = frame.as_array_mut();
+    let (_h, w, c) = arr.dim();
+    if c != 3 {
+        return Err(PyValueError::new_err("frame must be (H, W, 3) uint8"));
+    }
+
+    py.allow_threads(|| {
+        arr.axis_iter_mut(Axis(0))
+            .into_par_iter()
+            .for_each(|mut row| {
+                for j in 0..w {
+                    let r = row[[j, 0]];
+                    row[[j, 0]] = row[[j, 2]];
+                    row[[j, 2]] = r;
+                }
+            });
+    });
+    Ok(())
+}
+
+/// Resize a (H, W, C) uint8 image using bilinear interpolation.
+///
+/// Runs on the resize engine (`resize::resize_u8`): cached coefficient tables,
+/// fixed-point math, half-pixel centers like OpenCV's INTER_LINEAR.
+///
+/// Writes into `out` ((new_h, new_w, C) uint8) when given. Returns the output array.
+#[pyfunction]
+#[pyo3(signature = (frame, new_h, new_w, out=None))]
 pub fn resize_bilinear<'py>(
     py: Python<'py>,
     frame: PyReadonlyArray3<'py, u8>,
     new_h: usize,
     new_w: usize,
-) -> Bound<'py, PyArray3<u8>> {
+    out: Option<Bound<'py, PyAny>>,
+) -> PyResult<Bound<'py, PyArray3<u8>>> {
     let arr = frame.as_array();
     let (h, w, c) = arr.dim();
-
-    if h == new_h && w == new_w {
-        return arr.to_owned().into_pyarray_bound(py);
+    if h == 0 || w == 0 {
+        return Err(PyValueError::new_err("frame must not be empty"));
     }
 
-    let row_ratio = h as f64 / new_h as f64;
-    let col_ratio = w as f64 / new_w as f64;
-
-    let mut out = Array3::<u8>::zeros((new_h, new_w, c));
-
-    out.axis_iter_mut(ndarray::Axis(0))
-        .into_par_iter()
-        .enumerate()
-        .for_each(|(i, mut row)| {
-            let y_f = i as f64 * row_ratio;
-            let y0 = (y_f as usize).min(h.saturating_sub(2));
-            let y1 = y0 + 1;
-            let fy = (y_f - y0 as f64) as f32;
-
-            for j in 0..new_w {
-                let x_f = j as f64 * col_ratio;
-                let x0 = (x_f as usize).min(w.saturating_sub(2));
-                let x1 = x0 + 1;
-                let fx = (x_f - x0 as f64) as f32;
-
-                for k in 0..c {
-                    let tl = arr[[y0, x0, k]] as f32;
-                    let tr = arr[[y0, x1, k]] as f32;
-                    let bl = arr[[y1, x0, k]] as f32;
-                    let br = arr[[y1, x1, k]] as f32;
-
-                    let top = tl * (1.0 - fx) + tr * fx;
-                    let bot = bl * (1.0 - fx) + br * fx;
-                    let val = top * (1.0 - fy) + bot * fy;
-                    row[[j, k]] = val.clamp(0.0, 255.0) as u8;
+    let out = out_or_zeros::<u8, _>(py, out, Ix3(new_h, new_w, c))?;
+    {
+        let mut dst = borrow_out(&out)?;
+        let mut view = dst.as_array_mut();
+        py.allow_threads(|| {
+            if h == new_h && w == new_w {
+                view.assign(&arr);
+                return;
+            }
+            let (yt, xt) = resize::tables(h, w, new_h, new_w, Filter::Bilinear);
+            let src = arr.as_standard_layout();
+            let src = src.as_slice().expect("standard layout is contiguous");
+            match view.as_slice_mut() {
+                Some(data) => resize_planes_into(src, (1, h, w, c), data, &yt, &xt),
+                None => {
+                    let mut tmp = Array3::<u8>::zeros((new_h, new_w, c));
+                    let data = tmp.as_slice_mut().expect("new array is contiguous");
+                    resize_planes_into(src, (1, h, w, c), data, &yt, &xt);
+                    view.assign(&tmp);
                 }
             }
         });
-
-    out.into_pyarray_bound(py)
+    }
+    Ok(out)
 }
 
 /// Normalize (H, W, 3) uint8 to float32 in [0, 1].
+///
+/// Writes into `out` (same shape, float32) when given. Returns the output array.
 #[pyfunction]
-pub fn normalize_frame<'py>(py: Python<'py>, frame: PyReadonlyArray3<'py, u8>) -> Bound<'py, PyArray3<f32>> {
+#[pyo3(signature = (frame, out=None))]
+pub fn normalize_frame<'py>(
+    py: Python<'py>,
+    frame: PyReadonlyArray3<'py, u8>,
+    out: Option<Bound<'py, PyAny>>,
+) -> PyResult<Bound<'py, PyArray3<f32>>> {
     let arr = frame.as_array();
-    let out = arr.mapv(|v| v as f32 / 255.0);
-    out.into_pyarray_bound(py)
+    let (h, w, c) = arr.dim();
+
+    let out = out_or_zeros::<f32, _>(py, out, Ix3(h, w, c))?;
+    {
+        let mut dst = borrow_out(&out)?;
+        let mut view = dst.as_array_mut();
+        py.allow_threads(|| {
+            Zip::from(&mut view)
+                .and(&arr)
+                .par_for_each(|o, &v| *o = v as f32 / 255.0);
+        });
+    }
+    Ok(out)
+}
+
+/// Letterbox a (H, W, 3) uint8 image straight into a caller-provided
+/// (1, 3, S, S) float32 tensor.
+///
+/// Resize (bilinear, half-pixel centers), padding with `pad_value`, scaling to
+/// [0, 1] and HWC -> NCHW all happen in one parallel pass over the output rows,
+/// so no intermediate image is allocated. With `swap_rb` the source is read
+/// as BGR and written as RGB planes in the same pass. Returns the letterbox
+/// params (r, dw, dh) needed to map boxes back to the source frame.
+#[pyfunction]
+#[pyo3(signature = (frame, out, pad_value=114, swap_rb=false))]
+pub fn letterbox_normalize<'py>(
+    py: Python<'py>,
+    frame: PyReadonlyArray3<'py, u8>,
+    mut out: PyReadwriteArray4<'py, f32>,
+    pad_value: u8,
+    swap_rb: bool,
+) -> PyResult<(f64, usize, usize)> {
+    let src = frame.as_array();
+    let (h0, w0, c) = src.dim();
+    if c != 3 || h0 == 0 || w0 == 0 {
+        return Err(PyValueError::new_err("frame must be a non-empty (H, W, 3) uint8 array"));
+    }
+
+    let mut dst = out.as_array_mut();
+    let (b, oc, oh, ow) = dst.dim();
+    if b != 1 || oc != 3 {
+        return Err(PyValueError::new_err("out must be a (1, 3, H, W) float32 array"));
+    }
+
+    let r = (oh as f64 / h0 as f64).min(ow as f64 / w0 as f64);
+    let new_w = ((w0 as f64 * r).round() as usize).clamp(1, ow);
+    let new_h = ((h0 as f64 * r).round() as usize).clamp(1, oh);
+    let dw = (ow - new_w) / 2;
+    let dh = (oh - new_h) / 2;
+
+    let plane = oh * ow;
+    let data = dst
+        .as_slice_mut()
+        .ok_or_else(|| PyValueError::new_err("out must be C-contiguous"))?;
+
+    py.allow_threads(|| {
+        // Horizontal taps are identical for every row: compute them once.
+        let sx = w0 as f32 / new_w as f32;
+        let xtaps: Vec<(usize, usize, f32)> = (0..new_w)
+            .map(|j| {
+                let x = ((j as f32 + 0.5) * sx - 0.5).max(0.0);
+                let x0 = (x as usize).min(w0 - 1);
+                let x1 = (x0 + 1).min(w0 - 1);
+                (x0, x1, x - x0 as f32)
+            })
+            .collect();
+        let sy = h0 as f32 / new_h as f32;
+        let pad = pad_value as f32 / 255.0;
+        let scale = 1.0f32 / 255.0;
+        // Source channel feeding output plane k.
+        let chan: [usize; 3] = if swap_rb { [2, 1, 0] } else { [0, 1, 2] };
+
+        let (p0, rest) = data.split_at_mut(plane);
+        let (p1, p2) = rest.split_at_mut(plane);
+
+        p0.par_chunks_mut(ow)
+            .zip(p1.par_chunks_mut(ow))
+            .zip(p2.par_chunks_mut(ow))
+            .enumerate()
+            .for_each(|(i, ((r0, r1), r2))| {
+                let mut rows = [r0, r1, r2];
+
+                if i < dh || i >= dh + new_h {
+                    for row in rows.iter_mut() {
+                        row.fill(pad);
+                    }
+                    return;
+                }
+
+                let y = (((i - dh) as f32 + 0.5) * sy - 0.5).max(0.0);
+                let y0 = (y as usize).min(h0 - 1);
+                let y1 = (y0 + 1).min(h0 - 1);
+                let fy = y - y0 as f32;
+
+                for row in rows.iter_mut() {
+                    row[..dw].fill(pad);
+                    row[dw + new_w..].fill(pad);
+                }
+
+                for (j, &(x0, x1, fx)) in xtaps.iter().enumerate() {
+                    for k in 0..3 {
+                        let sc = chan[k];
+                        let tl = src[[y0, x0, sc]] as f32;
+                        let tr = src[[y0, x1, sc]] as f32;
+                        let bl = src[[y1, x0, sc]] as f32;
+                        let br = src[[y1, x1, sc]] as f32;
+
+                        let top = tl + (tr - tl) * fx;
+                        let bot = bl + (br - bl) * fx;
+                        rows[k][dw + j] = (top + (bot - top) * fy) * scale;
+                    }
+                }
+            });
+    });
+
+    Ok((r, dw, dh))
 }
@@ -1,8 +1,12 @@
+mod buffers;
 mod image_ops;
 mod nms;
 mod depth;
 mod drawing;
 mod frame;
+mod yolo;
+mod motion;
+mod resize;
 
 use pyo3::prelude::*;
 
@@ -12,20 +16,41 @@ fn _rust_core(m: &Bound<'_, PyModule>) -> PyResult<()> {
     // image_ops
     m.add_function(wrap_pyfunction!(image_ops::bgr_to_rgb, m)?)?;
     m.add_function(wrap_pyfunction!(image_ops::rgb_to_bgr, m)?)?;
+    m.add_function(wrap_pyfunction!(image_ops::swap_rb_inplace, m)?)?;
     m.add_function(wrap_pyfunction!(image_ops::resize_bilinear, m)?)?;
     m.add_function(wrap_pyfunction!(image_ops::normalize_frame, m)?)?;
+    m.add_function(wrap_pyfunction!(image_ops::letterbox_normalize, m)?)?;
+
+    // resize
+    m.add_function(wrap_pyfunction!(resize::resize_u8, m)?)?;
+    m.add_function(wrap_pyfunction!(resize::resize_f32, m)?)?;
 
     // nms
     m.add_function(wrap_pyfunction!(nms::nms_boxes, m)?)?;
+    m.add_function(wrap_pyfunction!(nms::batched_nms, m)?)?;
     m.add_function(wrap_pyfunction!(nms::filter_detections_by_score, m)?)?;
+    m.add_function(wrap_pyfunction!(nms::iou_matrix, m)?)?;
+    m.add_function(wrap_pyfunction!(nms::greedy_match, m)?)?;
+
+    // yolo
+    m.add_function(wrap_pyfunction!(yolo::decode_yolo_seg, m)?)?;
+
+    // motion
+    m.add_function(wrap_pyfunction!(motion::downsample_luma, m)?)?;
+    m.add_function(wrap_pyfunction!(motion::luma_sad, m)?)?;
 
     // depth
     m.add_function(wrap_pyfunction!(depth::normalize_depth_map, m)?)?;
     m.add_function(wrap_pyfunction!(depth::depth_to_colormap_jet, m)?)?;
+    m.add_function(wrap_pyfunction!(depth::depth_histogram, m)?)?;
+    m.add_function(wrap_pyfunction!(depth::colorize_depth, m)?)?;
     m.add_function(wrap_pyfunction!(depth::depth_to_pointcloud, m)?)?;
 
     // drawing
     m.add_function(wrap_pyfunction!(drawing::draw_bboxes_on_frame, m)?)?;
+    m.add_function(wrap_pyfunction!(drawing::draw_bboxes_inplace, m)?)?;
+    m.add_function(wrap_pyfunction!(drawing::composite_detections, m)?)?;
+    m.add_function(wrap_pyfunction!(drawing::draw_text, m)?)?;
 
     // frame
     m.add_function(wrap_pyfunction!(frame::generate_dummy_frame, m)?)?;
@@ -0,0 +1,120 @@
+use numpy::ndarray::{Array2, Axis};
+use numpy::{IntoPyArray, PyArray2, PyReadonlyArray2, PyReadonlyArray3};
+use pyo3::exceptions::PyValueError;
+use pyo3::prelude::*;
+use rayon::prelude::*;
+
+/// Downsample a (H, W, 3) uint8 frame to (H / factor, W / factor) uint8 luma.
+///
+/// Each output pixel is the box average of a `factor` x `factor` block, using
+/// integer BT.601 weights (77, 150, 29) >> 8. Channel order only changes the
+/// weighting slightly, which does not matter for change detection.
+#[pyfunction]
+#[pyo3(signature = (frame, factor=4))]
+pub fn downsample_luma<'py>(
+    py: Python<'py>,
+    frame: PyReadonlyArray3<'py, u8>,
+    factor: usize,
+) -> PyResult<Bound<'py, PyArray2<u8>>> {
+    let arr = frame.as_array();
+    let (h, w, c) = arr.dim();
+    if c != 3 {
+        return Err(PyValueError::new_err("frame must be (H, W, 3) uint8"));
+    }
+    let f = factor.max(1);
+    let (oh, ow) = (h / f, w / f);
+    let norm = (f * f) as u32;
+
+    let out = py.allow_threads(|| {
+        let mut out = Array2::<u8>::zeros((oh, ow));
+        out.axis_iter_mut(Axis(0))
+            .into_par_iter()
+            .enumerate()
+            .for_each(|(i, mut row)| {
+                for j in 0..ow {
+                    let mut acc = 0u32;
+                    for y in i * f..(i + 1) * f {
+                        for x in j * f..(j + 1) * f {
+                            acc += 77 * arr[[y, x, 0]] as u32
+                                + 150 * arr[[y, x, 1]] as u32
+                                + 29 * arr[[y, x, 2]] as u32;
+                        }
+                    }
+                    row[j] = ((acc >> 8) / norm) as u8;
+                }
+            });
+        out
+    });
+
+    Ok(out.into_pyarray_bound(py))
+}
+
+/// Mean absolute difference between two (h, w) uint8 luma images.
+///
+/// With `tile > 0` also returns a (ceil(h / tile), ceil(w / tile)) float32 map
+/// of per-tile mean absolute differences; otherwise the map is (0, 0).
+/// Returns (mean_abs_diff, tile_map).
+#[pyfunction]
+#[pyo3(signature = (cur, reference, tile=0))]
+pub fn luma_sad<'py>(
+    py: Python<'py>,
+    cur: PyReadonlyArray2<'py, u8>,
+    reference: PyReadonlyArray2<'py, u8>,
+    tile: usize,
+) -> PyResult<(f32, Bound<'py, PyArray2<f32>>)> {
+    let a = cur.as_array();
+    let b = reference.as_array();
+    if a.dim() != b.dim() {
+        return Err(PyValueError::new_err("cur and reference must have the same shape"));
+    }
+    let (h, w) = a.dim();
+    if h == 0 || w == 0 {
+        return Ok((0.0, Array2::<f32>::zeros((0, 0)).into_pyarray_bound(py)));
+    }
+
+    let (mean, tiles) = py.allow_threads(|| {
+        if tile == 0 {
+            let total: u64 = (0..h)
+                .into_par_iter()
+                .map(|i| {
+                    let mut acc = 0u64;
+                    for j in 0..w {
+                        acc += (a[[i, j]] as i32 - b[[i, j]] as i32).unsigned_abs() as u64;
+                    }
+                    acc
+                })
+                .sum();
+            return (total as f32 / (h * w) as f32, Array2::<f32>::zeros((0, 0)));
+        }
+
+        let (th, tw) = ((h + tile - 1) / tile, (w + tile - 1) / tile);
+        let mut tiles = Array2::<f32>::zeros((th, tw));
+        let totals: Vec<u64> = tiles
+            .axis_iter_mut(Axis(0))
+            .into_par_iter()
+            .enumerate()
+            .map(|(ti, mut trow)| {
+                let y0 = ti * tile;
+                let y1 = (y0 + tile).min(h);
+                let mut band = 0u64;
+                for tj in 0..tw {
+                    let x0 = tj * tile;
+                    let x1 = (x0 + tile).min(w);
+                    let mut acc = 0u64;
+                    for i in y0..y1 {
+                        for j in x0..x1 {
+                            acc += (a[[i, j]] as i32 - b[[i, j]] as i32).unsigned_abs() as u64;
+                        }
+                    }
+                    trow[tj] = acc as f32 / ((y1 - y0) * (x1 - x0)) as f32;
+                    band += acc;
+                }
+                band
+            })
+            .collect();
+
+        (totals.iter().sum::<u64>() as f32 / (h * w) as f32, tiles)
+    });
+
+    Ok((mean, tiles.into_pyarray_bound(py)))
+}
@@ -1,6 +1,86 @@
-use numpy::ndarray::Array1;
-use numpy::{IntoPyArray, PyArray1, PyReadonlyArray1, PyReadonlyArray2};
+use std::cmp::Ordering;
+
+use numpy::ndarray::{Array1, Array2, ArrayView1, ArrayView2, Axis};
+use numpy::{IntoPyArray, PyArray1, PyArray2, PyReadonlyArray1, PyReadonlyArray2};
+use pyo3::exceptions::PyValueError;
 use pyo3::prelude::*;
+use rayon::prelude::*;
+
+/// IoU of boxes `i` and `j` given precomputed areas.
+#[inline]
+fn iou(b: &ArrayView2<f32>, areas: &[f32], i: usize, j: usize) -> f32 {
+    let xx1 = b[[i, 0]].max(b[[j, 0]]);
+    let yy1 = b[[i, 1]].max(b[[j, 1]]);
+    let xx2 = b[[i, 2]].min(b[[j, 2]]);
+    let yy2 = b[[i, 3]].min(b[[j, 3]]);
+
+    let inter = (xx2 - xx1).max(0.0) * (yy2 - yy1).max(0.0);
+    inter / (areas[i] + areas[j] - inter + 1e-9)
+}
+
+/// Sort candidate indices by score (descending), keeping only the best
+/// `top_k` (0 = keep all). Partial selection runs before the full sort.
+fn sort_top_k(idx: &mut Vec<usize>, s: &ArrayView1<f32>, top_k: usize) {
+    let cmp = |a: &usize, b: &usize| s[*b].partial_cmp(&s[*a]).unwrap_or(Ordering::Equal);
+    if top_k > 0 && idx.len() > top_k {
+        idx.select_nth_unstable_by(top_k - 1, &cmp);
+        idx.truncate(top_k);
+    }
+    idx.sort_by(&cmp);
+}
+
+/// Greedy NMS over `order` (sorted by score, descending).
+///
+/// Each kept box only scans the candidates ranked below it. With `classes`,
+/// boxes of different classes never suppress each other. Stops as soon as
+/// `max_det` boxes are kept (0 = no limit).
+fn greedy_nms(
+    b: &ArrayView2<f32>,
+    areas: &[f32],
+    order: &[usize],
+    classes: Option<&ArrayView1<i32>>,
+    iou_threshold: f32,
+    max_det: usize,
+) -> Vec<usize> {
+    let m = order.len();
+    let limit = if max_det == 0 { m } else { max_det.min(m) };
+    let mut suppressed = vec![false; m];
+    let mut keep = Vec::with_capacity(limit);
+
+    for pi in 0..m {
+        if suppressed[pi] {
+            continue;
+        }
+        let i = order[pi];
+        keep.push(i);
+        if keep.len() >= limit {
+            break;
+        }
+
+        for pj in (pi + 1)..m {
+            if suppressed[pj] {
+                continue;
+            }
+            let j = order[pj];
+            if let Some(c) = classes {
+                if c[i] != c[j] {
+                    continue;
+                }
+            }
+            if iou(b, areas, i, j) > iou_threshold {
+                suppressed[pj] = true;
+            }
+        }
+    }
+
+    keep
+}
+
+fn box_areas(b: &ArrayView2<f32>) -> Vec<f32> {
+    (0..b.nrows())
+        .map(|i| (b[[i, 2]] - b[[i, 0]]).max(0.0) * (b[[i, 3]] - b[[i, 1]]).max(0.0))
+        .collect()
+}
 
 /// Non-maximum suppression. Returns indices of kept boxes.
 ///
@@ -22,43 +102,104 @@ pub fn nms_boxes<'py>(
         return Array1::<i64>::zeros(0).into_pyarray_bound(py);
     }
 
-    // Sort by score descending
-    let mut order: Vec<usize> = (0..n).collect();
-    order.sort_by(|&a, &b_idx| s[b_idx].partial_cmp(&s[a]).unwrap_or(std::cmp::Ordering::Equal));
-
-    // Pre-compute areas
-    let areas: Vec<f32> = (0..n)
-        .map(|i| (b[[i, 2]] - b[[i, 0]]) * (b[[i, 3]] - b[[i, 1]]))
-        .collect();
+    let keep = py.allow_threads(|| {
+        let areas = box_areas(&b);
+        let mut order: Vec<usize> = (0..n).collect();
+        sort_top_k(&mut order, &s, 0);
 
-    let mut suppressed = vec![false; n];
-    let mut keep = Vec::with_capacity(n);
+        greedy_nms(&b, &areas, &order, None, iou_threshold, 0)
+            .into_iter()
+            .map(|i| i as i64)
+            .collect::<Vec<i64>>()
+    });
 
-    for &i in &order {
-        if suppressed[i] {
-            continue;
-        }
-        keep.push(i as i64);
+    Array1::from_vec(keep).into_pyarray_bound(py)
+}
 
-        for &j in &order {
-            if suppressed[j] || j == i {
-                continue;
-            }
-            let xx1 = b[[i, 0]].max(b[[j, 0]]);
-            let yy1 = b[[i, 1]].max(b[[j, 1]]);
-            let xx2 = b[[i, 2]].min(b[[j, 2]]);
-            let yy2 = b[[i, 3]].min(b[[j, 3]]);
+/// Class-aware, batched non-maximum suppression. Returns indices of kept boxes.
+///
+/// boxes: (N, 4) float32 [x1, y1, x2, y2]
+/// scores: (N,) float32
+/// class_ids: optional (N,) int32 — boxes only suppress boxes of the same class
+///            unless `agnostic` is true
+/// batch_idx: optional (N,) int32 image index; images are suppressed
+///            independently (in parallel)
+/// top_k: keep only the best `top_k` candidates per image before the IoU loop
+///        (0 = all)
+/// max_det: stop once `max_det` boxes are kept per image (0 = no limit)
+///
+/// Kept indices are grouped by image (ascending) and sorted by score within
+/// each image.
+#[pyfunction]
+#[pyo3(signature = (
+    boxes,
+    scores,
+    class_ids=None,
+    batch_idx=None,
+    iou_threshold=0.45,
+    max_det=300,
+    top_k=0,
+    agnostic=false
+))]
+#[allow(clippy::too_many_arguments)]
+pub fn batched_nms<'py>(
+    py: Python<'py>,
+    boxes: PyReadonlyArray2<'py, f32>,
+    scores: PyReadonlyArray1<'py, f32>,
+    class_ids: Option<PyReadonlyArray1<'py, i32>>,
+    batch_idx: Option<PyReadonlyArray1<'py, i32>>,
+    iou_threshold: f32,
+    max_det: usize,
+    top_k: usize,
+    agnostic: bool,
+) -> PyResult<Bound<'py, PyArray1<i64>>> {
+    let b = boxes.as_array();
+    let s = scores.as_array();
+    let n = b.nrows();
 
-            let inter = (xx2 - xx1).max(0.0) * (yy2 - yy1).max(0.0);
-            let iou = inter / (areas[i] + areas[j] - inter + 1e-9);
+    if b.ncols() != 4 || s.len() != n {
+        return Err(PyValueError::new_err("boxes must be (N, 4) and scores (N,)"));
+    }
+    let c = class_ids.as_ref().map(|a| a.as_array());
+    if c.as_ref().is_some_and(|a| a.len() != n) {
+        return Err(PyValueError::new_err("class_ids must have the same length as scores"));
+    }
+    let bi = batch_idx.as_ref().map(|a| a.as_array());
 
-            if iou > iou_threshold {
-                suppressed[j] = true;
+    let groups: Vec<Vec<usize>> = match bi {
+        None => vec![(0..n).collect()],
+        Some(bi) => {
+            if bi.len() != n {
+                return Err(PyValueError::new_err("batch_idx must have the same length as scores"));
+            }
+            if bi.iter().any(|&v| v < 0) {
+                return Err(PyValueError::new_err("batch_idx must be non-negative"));
             }
+            let nb = bi.iter().map(|&v| v as usize + 1).max().unwrap_or(0);
+            let mut groups = vec![Vec::new(); nb];
+            for (i, &v) in bi.iter().enumerate() {
+                groups[v as usize].push(i);
+            }
+            groups
         }
-    }
+    };
 
-    Array1::from_vec(keep).into_pyarray_bound(py)
+    let keep = py.allow_threads(|| {
+        let areas = box_areas(&b);
+        let classes = if agnostic { None } else { c };
+
+        let kept: Vec<Vec<usize>> = groups
+            .into_par_iter()
+            .map(|mut idx| {
+                sort_top_k(&mut idx, &s, top_k);
+                greedy_nms(&b, &areas, &idx, classes.as_ref(), iou_threshold, max_det)
+            })
+            .collect();
+
+        kept.into_iter().flatten().map(|i| i as i64).collect::<Vec<i64>>()
+    });
+
+    Ok(Array1::from_vec(keep).into_pyarray_bound(py))
 }
 
 /// Keep only detections with score >= min_score.
@@ -80,20 +221,23 @@ pub fn filter_detections_by_score<'py>(
     let s = scores.as_array();
     let c = class_ids.as_array();
 
-    let mask: Vec<usize> = (0..s.len()).filter(|&i| s[i] >= min_score).collect();
-    let k = mask.len();
+    let (out_b, out_s, out_c) = py.allow_threads(|| {
+        let mask: Vec<usize> = (0..s.len()).filter(|&i| s[i] >= min_score).collect();
+        let k = mask.len();
 
-    let mut out_b = numpy::ndarray::Array2::<f32>::zeros((k, 4));
-    let mut out_s = Array1::<f32>::zeros(k);
-    let mut out_c = Array1::<i32>::zeros(k);
+        let mut out_b = numpy::ndarray::Array2::<f32>::zeros((k, 4));
+        let mut out_s = Array1::<f32>::zeros(k);
+        let mut out_c = Array1::<i32>::zeros(k);
 
-    for (idx, &i) in mask.iter().enumerate() {
-        for j in 0..4 {
-            out_b[[idx, j]] = b[[i, j]];
+        for (idx, &i) in mask.iter().enumerate() {
+            for j in 0..4 {
+                out_b[[idx, j]] = b[[i, j]];
+            }
+            out_s[idx] = s[i];
+            out_c[idx] = c[i];
         }
-        out_s[idx] = s[i];
-        out_c[idx] = c[i];
-    }
+        (out_b, out_s, out_c)
+    });
 
     Ok((
         out_b.into_pyarray_bound(py),
@@ -101,3 +245,85 @@ pub fn filter_detections_by_score<'py>(
         out_c.into_pyarray_bound(py),
     ))
 }
+
+/// Pairwise IoU between (N, 4) boxes `a` and (M, 4) boxes `b` → (N, M) float32.
+#[pyfunction]
+pub fn iou_matrix<'py>(
+    py: Python<'py>,
+    a: PyReadonlyArray2<'py, f32>,
+    b: PyReadonlyArray2<'py, f32>,
+) -> Bound<'py, PyArray2<f32>> {
+    let a = a.as_array();
+    let b = b.as_array();
+    let (n, m) = (a.nrows(), b.nrows());
+    let out = py.allow_threads(|| {
+        let areas_a = box_areas(&a);
+        let areas_b = box_areas(&b);
+
+        let mut out = Array2::<f32>::zeros((n, m));
+        out.axis_iter_mut(Axis(0))
+            .into_par_iter()
+            .enumerate()
+            .for_each(|(i, mut row)| {
+                for j in 0..m {
+                    let xx1 = a[[i, 0]].max(b[[j, 0]]);
+                    let yy1 = a[[i, 1]].max(b[[j, 1]]);
+                    let xx2 = a[[i, 2]].min(b[[j, 2]]);
+                    let yy2 = a[[i, 3]].min(b[[j, 3]]);
+                    let inter = (xx2 - xx1).max(0.0) * (yy2 - yy1).max(0.0);
+                    row[j] = inter / (areas_a[i] + areas_b[j] - inter + 1e-9);
+                }
+            });
+        out
+    });
+
+    out.into_pyarray_bound(py)
+}
+
+/// Greedy one-to-one assignment on an (N, M) affinity matrix.
+///
+/// Pairs with affinity >= `threshold` are taken in descending order, skipping
+/// rows or columns that are already assigned. Returns (rows, cols).
+#[pyfunction]
+#[pyo3(signature = (affinity, threshold=0.3))]
+pub fn greedy_match<'py>(
+    py: Python<'py>,
+    affinity: PyReadonlyArray2<'py, f32>,
+    threshold: f32,
+) -> (Bound<'py, PyArray1<i64>>, Bound<'py, PyArray1<i64>>) {
+    let a = affinity.as_array();
+    let (n, m) = a.dim();
+
+    let (rows, cols) = py.allow_threads(|| {
+        let mut pairs: Vec<(f32, usize, usize)> = Vec::new();
+        for i in 0..n {
+            for j in 0..m {
+                let v = a[[i, j]];
+                if v >= threshold {
+                    pairs.push((v, i, j));
+                }
+            }
+        }
+        pairs.sort_by(|x, y| y.0.partial_cmp(&x.0).unwrap_or(Ordering::Equal));
+
+        let mut row_used = vec![false; n];
+        let mut col_used = vec![false; m];
+        let mut rows = Vec::new();
+        let mut cols = Vec::new();
+        for (_, i, j) in pairs {
+            if row_used[i] || col_used[j] {
+                continue;
+            }
+            row_used[i] = true;
+            col_used[j] = true;
+            rows.push(i as i64);
+            cols.push(j as i64);
+        }
+        (rows, cols)
+    });
+
+    (
+        Array1::from_vec(rows).into_pyarray_bound(py),
+        Array1::from_vec(cols).into_pyarray_bound(py),
+    )
+}
@@ -0,0 +1,374 @@
+use std::collections::HashMap;
+use std::sync::{Arc, Mutex, OnceLock};
+
+use numpy::ndarray::IxDyn;
+use numpy::{Element, PyArrayDyn, PyReadonlyArrayDyn, PyUntypedArrayMethods};
+use pyo3::exceptions::PyValueError;
+use pyo3::prelude::*;
+use rayon::prelude::*;
+
+use crate::buffers::{borrow_out, out_or_zeros};
+
+/// Fixed-point precision of the uint8 path: each axis' weights sum to 1 << 11,
+/// so a two-axis sum of 255-valued pixels stays well inside i32.
+const FIX_BITS: u32 = 11;
+
+#[derive(Clone, Copy, PartialEq, Eq, Hash)]
+pub enum Filter {
+    /// Two taps at half-pixel centers (OpenCV's INTER_LINEAR).
+    Bilinear,
+    /// Box filter averaging every source pixel an output pixel covers (like
+    /// OpenCV's INTER_AREA when downscaling); falls back to bilinear on an
+    /// axis that is upscaled.
+    Area,
+}
+
+impl Filter {
+    pub fn parse(mode: &str) -> PyResult<Self> {
+        match mode {
+            "bilinear" => Ok(Filter::Bilinear),
+            "area" => Ok(Filter::Area),
+            _ => Err(PyValueError::new_err(format!(
+                "Unknown resize mode '{mode}'. Choose one of: bilinear, area"
+            ))),
+        }
+    }
+}
+
+/// Resampling coefficients along one axis: output index i reads the `taps`
+/// source samples starting at `start[i]`, weighted by `w[i * taps..]` (f32) or
+/// `wq[i * taps..]` (fixed point, summing to exactly 1 << FIX_BITS).
+pub struct AxisTable {
+    start: Vec<usize>,
+    taps: usize,
+    w: Vec<f32>,
+    wq: Vec<i32>,
+}
+
+impl AxisTable {
+    /// Table mapping `dst` outputs onto the source span [lo, hi) of an axis
+    /// with `src` samples (pixel edges; [0, src) is a plain resize).
+    fn new(src: usize, dst: usize, lo: f64, hi: f64, filter: Filter) -> Self {
+        let scale = (hi - lo) / dst as f64;
+        let last = (src - 1) as f64;
+
+        let contribs: Vec<Vec<(usize, f64)>> = (0..dst)
+            .map(|i| {
+                if filter == Filter::Area && scale > 1.0 {
+                    let a = (lo + i as f64 * scale).clamp(0.0, src as f64);
+                    let b = (lo + (i + 1) as f64 * scale).clamp(0.0, src as f64);
+                    let mut c = Vec::new();
+                    let mut j = a.floor() as usize;
+                    while j < src && (j as f64) < b {
+                        let overlap = b.min(j as f64 + 1.0) - a.max(j as f64);
+                        if overlap > 0.0 {
+                            c.push((j, overlap));
+                        }
+                        j += 1;
+                    }
+                    if c.is_empty() {
+                        c.push(((a as usize).min(src - 1), 1.0));
+                    }
+                    c
+                } else {
+                    let x = (lo + (i as f64 + 0.5) * scale - 0.5).clamp(0.0, last);
+                    let x0 = x.floor() as usize;
+                    let f = x - x0 as f64;
+                    if f > 0.0 && x0 + 1 < src {
+                        vec![(x0, 1.0 - f), (x0 + 1, f)]
+                    } else {
+                        vec![(x0, 1.0)]
+                    }
+                }
+            })
+            .collect();
+
+        let taps = contribs
+            .iter()
+            .map(|c| c[c.len() - 1].0 - c[0].0 + 1)
+            .max()
+            .unwrap_or(1);
+        let one = 1i32 << FIX_BITS;
+        let mut start = Vec::with_capacity(dst);
+        let mut w = vec![0f32; dst * taps];
+        let mut wq = vec![0i32; dst * taps];
+
+        for (i, c) in contribs.iter().enumerate() {
+            let s = c[0].0.min(src - taps);
+            let total: f64 = c.iter().map(|&(_, v)| v).sum();
+            let ws = &mut w[i * taps..(i + 1) * taps];
+            let qs = &mut wq[i * taps..(i + 1) * taps];
+            for &(j, v) in c {
+                ws[j - s] = (v / total) as f32;
+                qs[j - s] = (v / total * one as f64).round() as i32;
+            }
+            // Give the rounding error to the largest tap so flat areas stay flat.
+            let err = one - qs.iter().sum::<i32>();
+            let k = (0..taps).fold(0, |k, j| if qs[j] > qs[k] { j } else { k });
+            qs[k] += err;
+            start.push(s);
+        }
+
+        AxisTable { start, taps, w, wq }
+    }
+}
+
+/// Coefficient table for one axis. Tables for whole-axis resizes are cached
+/// per (src, dst, filter), since the same shapes come back every frame.
+fn axis_table(
+    src: usize,
+    dst: usize,
+    span: Option<(f64, f64)>,
+    filter: Filter,
+) -> Arc<AxisTable> {
+    type Key = (usize, usize, Filter);
+    static CACHE: OnceLock<Mutex<HashMap<Key, Arc<AxisTable>>>> = OnceLock::new();
+
+    let (lo, hi) = match span {
+        // Crops (e.g. one mask's box) rarely repeat; don't cache them.
+        Some((lo, hi)) => return Arc::new(AxisTable::new(src, dst, lo, hi, filter)),
+        None => (0.0, src as f64),
+    };
+    let key = (src, dst, filter);
+    let cache = CACHE.get_or_init(Default::default);
+    if let Some(t) = cache.lock().unwrap().get(&key) {
+        return t.clone();
+    }
+    let table = Arc::new(AxisTable::new(src, dst, lo, hi, filter));
+    let mut cache = cache.lock().unwrap();
+    if cache.len() >= 256 {
+        cache.clear();
+    }
+    cache.insert(key, table.clone());
+    table
+}
+
+/// Element types the engine resamples: the row kernel for one output row.
+pub trait Resample: Element + Copy + Send + Sync {
+    type Acc: Copy + Default + Send;
+
+    /// Compute output row `y` of one plane ((h, w, c) samples, row-major) into
+    /// `dst` (new_w * c samples). `acc` is per-thread scratch.
+    #[allow(clippy::too_many_arguments)]
+    fn resample_row(
+        plane: &[Self],
+        w: usize,
+        c: usize,
+        y: usize,
+        yt: &AxisTable,
+        xt: &AxisTable,
+        acc: &mut Vec<Self::Acc>,
+        dst: &mut [Self],
+    );
+}
+
+impl Resample for u8 {
+    type Acc = i32;
+
+    #[allow(clippy::too_many_arguments)]
+    fn resample_row(
+        plane: &[u8],
+        w: usize,
+        c: usize,
+        y: usize,
+        yt: &AxisTable,
+        xt: &AxisTable,
+        acc: &mut Vec<i32>,
+        dst: &mut [u8],
+    ) {
+        acc.clear();
+        acc.resize(dst.len(), 0);
+        let y0 = yt.start[y];
+        for (ky, &wy) in yt.wq[y * yt.taps..(y + 1) * yt.taps].iter().enumerate() {
+            if wy == 0 {
+                continue;
+            }
+            let src = &plane[(y0 + ky) * w * c..(y0 + ky + 1) * w * c];
+            for (j, a) in acc.chunks_exact_mut(c).enumerate() {
+                let x0 = xt.start[j];
+                let wx = &xt.wq[j * xt.taps..(j + 1) * xt.taps];
+                for (ch, a) in a.iter_mut().enumerate() {
+                    let mut h = 0i32;
+                    for (kx, &wv) in wx.iter().enumerate() {
+                        h += src[(x0 + kx) * c + ch] as i32 * wv;
+                    }
+                    *a += h * wy;
+                }
+            }
+        }
+        let half = 1i32 << (2 * FIX_BITS - 1);
+        for (d, &a) in dst.iter_mut().zip(acc.iter()) {
+            *d = ((a + half) >> (2 * FIX_BITS)).clamp(0, 255) as u8;
+        }
+    }
+}
+
+impl Resample for f32 {
+    type Acc = f32;
+
+    #[allow(clippy::too_many_arguments)]
+    fn resample_row(
+        plane: &[f32],
+        w: usize,
+        c: usize,
+        y: usize,
+        yt: &AxisTable,
+        xt: &AxisTable,
+        acc: &mut Vec<f32>,
+        dst: &mut [f32],
+    ) {
+        acc.clear();
+        acc.resize(dst.len(), 0.0);
+        let y0 = yt.start[y];
+        for (ky, &wy) in yt.w[y * yt.taps..(y + 1) * yt.taps].iter().enumerate() {
+            if wy == 0.0 {
+                continue;
+            }
+            let src = &plane[(y0 + ky) * w * c..(y0 + ky + 1) * w * c];
+            for (j, a) in acc.chunks_exact_mut(c).enumerate() {
+                let x0 = xt.start[j];
+                let wx = &xt.w[j * xt.taps..(j + 1) * xt.taps];
+                for (ch, a) in a.iter_mut().enumerate() {
+                    let mut h = 0f32;
+                    for (kx, &wv) in wx.iter().enumerate() {
+                        h += src[(x0 + kx) * c + ch] * wv;
+                    }
+                    *a += h * wy;
+                }
+            }
+        }
+        dst.copy_from_slice(acc);
+    }
+}
+
+/// Resize `n` contiguous (h, w, c) planes of `src` into (new_h, new_w, c)
+/// planes of `dst`, one parallel task per output row.
+pub fn resize_planes_into<T: Resample>(
+    src: &[T],
+    dims: (usize, usize, usize, usize),
+    dst: &mut [T],
+    yt: &AxisTable,
+    xt: &AxisTable,
+) {
+    let (_n, h, w, c) = dims;
+    let new_h = yt.start.len();
+    let row = xt.start.len() * c;
+    if row == 0 || new_h == 0 {
+        return;
+    }
+    dst.par_chunks_mut(row)
+        .enumerate()
+        .for_each_init(Vec::new, |acc, (r, out_row)| {
+            let (p, y) = (r / new_h, r % new_h);
+            let plane = &src[p * h * w * c..(p + 1) * h * w * c];
+            T::resample_row(plane, w, c, y, yt, xt, acc, out_row);
+        });
+}
+
+/// Shared body of `resize_u8` / `resize_f32`.
+#[allow(clippy::too_many_arguments)]
+fn resize_impl<'py, T: Resample>(
+    py: Python<'py>,
+    image: PyReadonlyArrayDyn<'py, T>,
+    new_h: usize,
+    new_w: usize,
+    mode: &str,
+    roi: Option<(f64, f64, f64, f64)>,
+    planar: bool,
+    out: Option<Bound<'py, PyAny>>,
+) -> PyResult<Bound<'py, PyArrayDyn<T>>> {
+    let filter = Filter::parse(mode)?;
+    let shape = image.shape().to_vec();
+    // (planes, rows, cols, channels) and the output shape.
+    let (dims, out_shape) = match (shape.as_slice(), planar) {
+        (&[h, w], _) => ((1, h, w, 1), vec![new_h, new_w]),
+        (&[h, w, c], false) => ((1, h, w, c), vec![new_h, new_w, c]),
+        (&[n, h, w], true) => ((n, h, w, 1), vec![n, new_h, new_w]),
+        _ => {
+            return Err(PyValueError::new_err(
+                "image must be (H, W), (H, W, C) or, with planar=True, (N, H, W)",
+            ))
+        }
+    };
+    let (_n, h, w, _c) = dims;
+    if h == 0 || w == 0 {
+        return Err(PyValueError::new_err("image must not be empty"));
+    }
+
+    let arr = image.as_array();
+    let out = out_or_zeros::<T, _>(py, out, IxDyn(&out_shape))?;
+    {
+        let mut dst = borrow_out(&out)?;
+        let mut view = dst.as_array_mut();
+        let data = view
+            .as_slice_mut()
+            .ok_or_else(|| PyValueError::new_err("out must be C-contiguous"))?;
+
+        py.allow_threads(|| {
+            let (ys, xs) = match roi {
+                Some((y0, x0, y1, x1)) => (Some((y0, y1)), Some((x0, x1))),
+                None => (None, None),
+            };
+            let yt = axis_table(h, new_h, ys, filter);
+            let xt = axis_table(w, new_w, xs, filter);
+            let src = arr.as_standard_layout();
+            let src = src.as_slice().expect("standard layout is contiguous");
+            resize_planes_into(src, dims, data, &yt, &xt);
+        });
+    }
+    Ok(out)
+}
+
+/// Resize a uint8 image: (H, W), (H, W, C) or, with `planar`, (N, H, W).
+///
+/// `mode` is "bilinear" (half-pixel centers, like OpenCV INTER_LINEAR) or
+/// "area" (box filter for downscaling; bilinear on upscaled axes). Coefficient tables are
+/// precomputed per axis and cached per shape; uint8 math is 11-bit fixed point.
+/// `roi` = (y0, x0, y1, x1) resamples that source rectangle (pixel edges,
+/// fractional allowed) instead of the whole image. All planes and rows are
+/// processed in one parallel pass.
+///
+/// Writes into `out` (C-contiguous, output shape) when given. Returns the output array.
+#[pyfunction]
+#[pyo3(signature = (image, new_h, new_w, mode="bilinear", roi=None, planar=false, out=None))]
+#[allow(clippy::too_many_arguments)]
+pub fn resize_u8<'py>(
+    py: Python<'py>,
+    image: PyReadonlyArrayDyn<'py, u8>,
+    new_h: usize,
+    new_w: usize,
+    mode: &str,
+    roi: Option<(f64, f64, f64, f64)>,
+    planar: bool,
+    out: Option<Bound<'py, PyAny>>,
+) -> PyResult<Bound<'py, PyArrayDyn<u8>>> {
+    resize_impl(py, image, new_h, new_w, mode, roi, planar, out)
+}
+
+/// Resize a float32 image or stack of planes; see `resize_u8`.
+#[pyfunction]
+#[pyo3(signature = (image, new_h, new_w, mode="bilinear", roi=None, planar=false, out=None))]
+#[allow(clippy::too_many_arguments)]
+pub fn resize_f32<'py>(
+    py: Python<'py>,
+    image: PyReadonlyArrayDyn<'py, f32>,
+    new_h: usize,
+    new_w: usize,
+    mode: &str,
+    roi: Option<(f64, f64, f64, f64)>,
+    planar: bool,
+    out: Option<Bound<'py, PyAny>>,
+) -> PyResult<Bound<'py, PyArrayDyn<f32>>> {
+    resize_impl(py, image, new_h, new_w, mode, roi, planar, out)
+}
+
+/// Tables for a plain whole-image resize (used by `image_ops::resize_bilinear`).
+pub fn tables(
+    h: usize,
+    w: usize,
+    new_h: usize,
+    new_w: usize,
+    filter: Filter,
+) -> (Arc<AxisTable>, Arc<AxisTable>) {
+    (axis_table(h, new_h, None, filter), axis_table(w, new_w, None, filter))
+}
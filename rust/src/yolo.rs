@@ -0,0 +1,96 @@
+use numpy::ndarray::{Array1, Array2};
+use numpy::{IntoPyArray, PyArray1, PyArray2, PyReadonlyArray2};
+use pyo3::exceptions::PyValueError;
+use pyo3::prelude::*;
+use rayon::prelude::*;
+
+/// Anchors handled per task. Class rows are scanned block-wise so reads stay
+/// contiguous in the native (D, N) layout.
+const ANCHOR_BLOCK: usize = 256;
+
+/// Decode a raw YOLOv8-seg output in its native (D, N) layout.
+///
+/// pred: (4 + C + M, N) float32 — rows [x, y, w, h, cls.., mask coeffs..], columns anchors
+/// num_masks: M, number of mask coefficients
+/// conf_thres: minimum best-class score
+///
+/// Class max/argmax, thresholding and xywh -> xyxy run in one parallel pass;
+/// only surviving anchors are written to the outputs.
+/// Returns (boxes (K, 4), scores (K,), class_ids (K,), mask_coeffs (K, M)).
+#[pyfunction]
+#[pyo3(signature = (pred, num_masks, conf_thres=0.25))]
+pub fn decode_yolo_seg<'py>(
+    py: Python<'py>,
+    pred: PyReadonlyArray2<'py, f32>,
+    num_masks: usize,
+    conf_thres: f32,
+) -> PyResult<(
+    Bound<'py, PyArray2<f32>>,
+    Bound<'py, PyArray1<f32>>,
+    Bound<'py, PyArray1<i32>>,
+    Bound<'py, PyArray2<f32>>,
+)> {
+    let p = pred.as_array();
+    let (d, n) = p.dim();
+    if d <= 4 + num_masks {
+        return Err(PyValueError::new_err("pred has no class rows for the given num_masks"));
+    }
+    let nc = d - 4 - num_masks;
+
+    let (boxes, scores, class_ids, coeffs) = py.allow_threads(|| {
+        let n_blocks = (n + ANCHOR_BLOCK - 1) / ANCHOR_BLOCK;
+        let hits: Vec<(usize, f32, i32)> = (0..n_blocks)
+            .into_par_iter()
+            .flat_map_iter(|blk| {
+                let a0 = blk * ANCHOR_BLOCK;
+                let a1 = (a0 + ANCHOR_BLOCK).min(n);
+                let mut best = vec![f32::NEG_INFINITY; a1 - a0];
+                let mut arg = vec![0i32; a1 - a0];
+
+                for c in 0..nc {
+                    let row = p.row(4 + c);
+                    for a in a0..a1 {
+                        let v = row[a];
+                        if v > best[a - a0] {
+                            best[a - a0] = v;
+                            arg[a - a0] = c as i32;
+                        }
+                    }
+                }
+
+                (a0..a1)
+                    .filter(|&a| best[a - a0] >= conf_thres)
+                    .map(|a| (a, best[a - a0], arg[a - a0]))
+                    .collect::<Vec<_>>()
+            })
+            .collect();
+
+        let k = hits.len();
+        let mut boxes = Array2::<f32>::zeros((k, 4));
+        let mut scores = Array1::<f32>::zeros(k);
+        let mut class_ids = Array1::<i32>::zeros(k);
+        let mut coeffs = Array2::<f32>::zeros((k, num_masks));
+
+        for (i, &(a, score, cls)) in hits.iter().enumerate() {
+            let (x, y, w, h) = (p[[0, a]], p[[1, a]], p[[2, a]], p[[3, a]]);
+            boxes[[i, 0]] = x - w / 2.0;
+            boxes[[i, 1]] = y - h / 2.0;
+            boxes[[i, 2]] = x + w / 2.0;
+            boxes[[i, 3]] = y + h / 2.0;
+            scores[i] = score;
+            class_ids[i] = cls;
+            for m in 0..num_masks {
+                coeffs[[i, m]] = p[[4 + nc + m, a]];
+            }
+        }
+
+        (boxes, scores, class_ids, coeffs)
+    });
+
+    Ok((
+        boxes.into_pyarray_bound(py),
+        scores.into_pyarray_bound(py),
+        class_ids.into_pyarray_bound(py),
+        coeffs.into_pyarray_bound(py),
+    ))
+}
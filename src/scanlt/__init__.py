@@ -1,5 +1,16 @@
-from .api import Detection, Result, WebcamSource, demo_webcam, run
+from .api import Cadence, Detection, Result, WebcamSource, demo_webcam, run
 from .backends import choose_backend
+from .multi import run_many
 from ._accel import RUST_AVAILABLE
 
-__all__ = ["run", "demo_webcam", "choose_backend", "WebcamSource", "Detection", "Result", "RUST_AVAILABLE"]
+__all__ = [
+    "run",
+    "run_many",
+    "demo_webcam",
+    "choose_backend",
+    "WebcamSource",
+    "Cadence",
+    "Detection",
+    "Result",
+    "RUST_AVAILABLE",
+]
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import functools
+
 import numpy as np
 
 # ---------------------------------------------------------------------------
@@ -13,14 +15,29 @@ try:
     from ._rust_core import (  # type: ignore[import-not-found]
         bgr_to_rgb as _rs_bgr_to_rgb,
         rgb_to_bgr as _rs_rgb_to_bgr,
+        swap_rb_inplace as _rs_swap_rb_inplace,
         resize_bilinear as _rs_resize_bilinear,
+        resize_u8 as _rs_resize_u8,
+        resize_f32 as _rs_resize_f32,
         normalize_frame as _rs_normalize_frame,
+        letterbox_normalize as _rs_letterbox_normalize,
         nms_boxes as _rs_nms_boxes,
+        batched_nms as _rs_batched_nms,
+        iou_matrix as _rs_iou_matrix,
+        greedy_match as _rs_greedy_match,
+        decode_yolo_seg as _rs_decode_yolo_seg,
+        downsample_luma as _rs_downsample_luma,
+        luma_sad as _rs_luma_sad,
         filter_detections_by_score as _rs_filter_detections_by_score,
         normalize_depth_map as _rs_normalize_depth_map,
         depth_to_colormap_jet as _rs_depth_to_colormap_jet,
+        depth_histogram as _rs_depth_histogram,
+        colorize_depth as _rs_colorize_depth,
         depth_to_pointcloud as _rs_depth_to_pointcloud,
         draw_bboxes_on_frame as _rs_draw_bboxes_on_frame,
+        draw_bboxes_inplace as _rs_draw_bboxes_inplace,
+        composite_detections as _rs_composite_detections,
+        draw_text as _rs_draw_text,
         generate_dummy_frame as _rs_generate_dummy_frame,
     )
 
@@ -33,60 +50,311 @@ except ImportError:
 # ---------------------------------------------------------------------------
 RUST_AVAILABLE: bool = _RUST_AVAILABLE
 
+
+def _check_out(out: np.ndarray, shape: tuple[int, ...], dtype: type) -> np.ndarray:
+    """Validate a caller-supplied output buffer (mirrors the Rust kernels)."""
+    if out.shape != tuple(shape) or out.dtype != dtype:
+        raise ValueError(
+            f"out must be a {np.dtype(dtype).name} array of shape {tuple(shape)}, "
+            f"got {out.dtype.name} {out.shape}"
+        )
+    return out
+
 # ===== Image Ops ==========================================================
 
 
-def bgr_to_rgb(frame: np.ndarray) -> np.ndarray:
-    """Convert a (H, W, 3) BGR uint8 image to RGB."""
+def bgr_to_rgb(frame: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    """Convert a (H, W, 3) BGR uint8 image to RGB.
+
+    Writes into ``out`` (same shape, not ``frame`` itself) when given; use
+    :func:`swap_rb_inplace` to convert a frame you own without a second buffer.
+    The result is a plain array: a ``channel_order`` tag on ``frame`` is not
+    carried over (see :mod:`scanlt.frames`).
+    """
     if _RUST_AVAILABLE:
-        return _rs_bgr_to_rgb(frame)
-    return frame[:, :, ::-1].copy()
+        return _rs_bgr_to_rgb(frame, out)
+    # Plain ndarray, like the Rust kernel (a Frame subclass would keep its old tag).
+    frame = np.asarray(frame)
+    if out is None:
+        return frame[:, :, ::-1].copy()
+    np.copyto(_check_out(out, frame.shape, np.uint8), frame[:, :, ::-1])
+    return out
 
 
-def rgb_to_bgr(frame: np.ndarray) -> np.ndarray:
-    """Convert a (H, W, 3) RGB uint8 image to BGR."""
+def rgb_to_bgr(frame: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    """Convert a (H, W, 3) RGB uint8 image to BGR (see :func:`bgr_to_rgb`)."""
     if _RUST_AVAILABLE:
-        return _rs_rgb_to_bgr(frame)
-    return frame[:, :, ::-1].copy()
+        return _rs_rgb_to_bgr(frame, out)
+    return bgr_to_rgb(frame, out)
 
 
-def resize_bilinear(frame: np.ndarray, new_h: int, new_w: int) -> np.ndarray:
-    """Resize (H, W, 3) uint8 image using bilinear interpolation."""
+def swap_rb_inplace(frame: np.ndarray) -> np.ndarray:
+    """Swap channels 0 and 2 of a (H, W, 3) uint8 image in place (RGB <-> BGR).
+
+    Returns ``frame``.
+    """
     if _RUST_AVAILABLE:
-        return _rs_resize_bilinear(frame, new_h, new_w)
+        _rs_swap_rb_inplace(frame)
+        return frame
+    r = frame[:, :, 0].copy()
+    frame[:, :, 0] = frame[:, :, 2]
+    frame[:, :, 2] = r
+    return frame
 
-    h, w = frame.shape[:2]
-    if h == new_h and w == new_w:
-        return frame.copy()
 
-    row_ratio = h / new_h
-    col_ratio = w / new_w
+def resize_bilinear(
+    frame: np.ndarray, new_h: int, new_w: int, out: np.ndarray | None = None
+) -> np.ndarray:
+    """Resize (H, W, C) uint8 image using bilinear interpolation.
 
-    row_idx = np.arange(new_h) * row_ratio
-    col_idx = np.arange(new_w) * col_ratio
+    Same as ``resize(frame, new_h, new_w)``. Writes into ``out``
+    ((new_h, new_w, C) uint8) when given.
+    """
+    if _RUST_AVAILABLE:
+        return _rs_resize_bilinear(frame, new_h, new_w, out)
+
+    if out is not None:
+        _check_out(out, (new_h, new_w, *frame.shape[2:]), np.uint8)
+    if frame.shape[:2] == (new_h, new_w):
+        if out is None:
+            return frame.copy()
+        np.copyto(out, frame)
+        return out
+    return resize(frame, new_h, new_w, out=out)
 
-    row_floor = np.clip(np.floor(row_idx).astype(np.intp), 0, h - 2)
-    col_floor = np.clip(np.floor(col_idx).astype(np.intp), 0, w - 2)
 
-    row_frac = (row_idx - row_floor).reshape(-1, 1, 1).astype(np.float32)
-    col_frac = (col_idx - col_floor).reshape(1, -1, 1).astype(np.float32)
+def normalize_frame(frame: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    """Normalize (H, W, 3) uint8 → float32 in [0, 1].
 
-    top_left = frame[np.ix_(row_floor, col_floor)]
-    top_right = frame[np.ix_(row_floor, col_floor + 1)]
-    bot_left = frame[np.ix_(row_floor + 1, col_floor)]
-    bot_right = frame[np.ix_(row_floor + 1, col_floor + 1)]
+    Writes into ``out`` (same shape, float32) when given.
+    """
+    if _RUST_AVAILABLE:
+        return _rs_normalize_frame(frame, out)
+    if out is None:
+        return frame.astype(np.float32) / 255.0
+    _check_out(out, frame.shape, np.float32)
+    return np.divide(frame, np.float32(255.0), out=out, dtype=np.float32)
 
-    top = top_left * (1 - col_frac) + top_right * col_frac
-    bot = bot_left * (1 - col_frac) + bot_right * col_frac
-    result = top * (1 - row_frac) + bot * row_frac
-    return np.clip(result, 0, 255).astype(np.uint8)
 
+def letterbox_normalize(
+    frame: np.ndarray,
+    size: int,
+    out: np.ndarray | None = None,
+    pad_value: int = 114,
+    swap_rb: bool = False,
+) -> tuple[np.ndarray, float, int, int]:
+    """Letterbox (H, W, 3) uint8 into a (1, 3, S, S) float32 tensor in [0, 1].
+
+    Resize, pad, normalize and HWC→NCHW are fused; pass a preallocated ``out``
+    to reuse the same input tensor across frames. ``out`` may be any
+    (1, 3, H, W) shape (e.g. a stride-aligned rectangle), in which case ``size``
+    is ignored and the frame is fitted into ``out``. With ``swap_rb=True`` a BGR
+    frame is read directly and the tensor planes come out in RGB order.
+
+    Returns ``(tensor, r, dw, dh)`` where ``r`` is the resize ratio and
+    ``dw, dh`` the left/top padding in pixels.
+    """
+    if out is None:
+        out = np.empty((1, 3, size, size), dtype=np.float32)
+    elif out.dtype != np.float32 or out.ndim != 4 or out.shape[:2] != (1, 3):
+        raise ValueError(
+            f"out must be a float32 array of shape (1, 3, H, W), got {out.dtype.name} {out.shape}"
+        )
 
-def normalize_frame(frame: np.ndarray) -> np.ndarray:
-    """Normalize (H, W, 3) uint8 → float32 in [0, 1]."""
     if _RUST_AVAILABLE:
-        return _rs_normalize_frame(frame)
-    return frame.astype(np.float32) / 255.0
+        r, dw, dh = _rs_letterbox_normalize(frame, out, pad_value, swap_rb)
+        return out, r, dw, dh
+
+    h0, w0 = frame.shape[:2]
+    out_h, out_w = out.shape[2:]
+    r = min(out_h / h0, out_w / w0)
+    new_w = min(max(int(round(w0 * r)), 1), out_w)
+    new_h = min(max(int(round(h0 * r)), 1), out_h)
+    dw = (out_w - new_w) // 2
+    dh = (out_h - new_h) // 2
+
+    try:
+        import cv2  # type: ignore
+
+        resized = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    except Exception:
+        # Same half-pixel sampling as cv2 (within 1 LSB), only much slower in NumPy.
+        resized = resize_bilinear(frame, new_h, new_w)
+
+    if swap_rb:
+        resized = resized[:, :, ::-1]
+    out.fill(pad_value / 255.0)
+    np.multiply(
+        resized.transpose(2, 0, 1),
+        np.float32(1.0 / 255.0),
+        out=out[0, :, dh : dh + new_h, dw : dw + new_w],
+    )
+    return out, r, dw, dh
+
+
+# ===== Resize ==============================================================
+
+RESIZE_MODES = ("bilinear", "area")
+
+# Fixed-point precision of the uint8 path (same as the Rust engine).
+_FIX_BITS = 11
+
+
+def _axis_table(
+    src: int, dst: int, lo: float, hi: float, mode: str
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Resampling coefficients along one axis: ``(start, w, wq)``.
+
+    Output ``i`` reads ``src[start[i] : start[i] + taps]`` weighted by ``w[i]``
+    (float32) or ``wq[i]`` (int32 summing to ``1 << _FIX_BITS``); ``[lo, hi)``
+    is the source span in pixel edges. Mirrors the Rust tables exactly.
+    """
+    if dst == 0:
+        return np.empty(0, np.intp), np.zeros((0, 1), np.float32), np.zeros((0, 1), np.int32)
+    scale = (hi - lo) / dst
+    one = 1 << _FIX_BITS
+    if mode != "area" or scale <= 1.0:
+        # Bilinear: at most two neighbouring taps, so build the table directly
+        # (crop tables are rebuilt for every mask).
+        x = np.clip(lo + (np.arange(dst) + 0.5) * scale - 0.5, 0.0, src - 1)
+        x0 = np.floor(x).astype(np.intp)
+        f = x - x0
+        two = (f > 0.0) & (x0 + 1 < src)
+        taps = 2 if two.any() else 1
+        start = np.minimum(x0, src - taps)
+        wv = np.stack([np.where(two, 1.0 - f, 1.0), np.where(two, f, 0.0)], axis=1)
+        wv /= wv.sum(axis=1, keepdims=True)
+        # A single tap sits in the second column when it was pulled back from the edge.
+        shift = (x0 - start)[:, None]
+        cols = np.arange(taps)[None, :]
+        w64 = np.where(cols == shift, wv[:, :1], 0.0)
+        if taps == 2:
+            w64 += np.where(cols == shift + 1, wv[:, 1:], 0.0)
+        wq = np.floor(w64 * one + 0.5).astype(np.int32)
+        # Give the rounding error to the (first) largest tap.
+        wq[np.arange(dst), np.argmax(wq, axis=1)] += one - wq.sum(axis=1, dtype=np.int32)
+        return start, w64.astype(np.float32), wq
+
+    # Area: every source pixel the output pixel's span overlaps, by overlap.
+    contribs = []
+    for i in range(dst):
+        a = min(max(lo + i * scale, 0.0), float(src))
+        b = min(max(lo + (i + 1) * scale, 0.0), float(src))
+        c = []
+        j = int(np.floor(a))
+        while j < src and j < b:
+            overlap = min(b, j + 1.0) - max(a, float(j))
+            if overlap > 0.0:
+                c.append((j, overlap))
+            j += 1
+        contribs.append(c or [(min(int(a), src - 1), 1.0)])
+
+    taps = max(c[-1][0] - c[0][0] + 1 for c in contribs)
+    start = np.empty(dst, dtype=np.intp)
+    w = np.zeros((dst, taps), dtype=np.float32)
+    wq = np.zeros((dst, taps), dtype=np.int32)
+    for i, c in enumerate(contribs):
+        s = min(c[0][0], src - taps)
+        total = sum(v for _, v in c)
+        for j, v in c:
+            w[i, j - s] = v / total
+            wq[i, j - s] = int(np.floor(v / total * one + 0.5))
+        # Give the rounding error to the (first) largest tap.
+        wq[i, int(np.argmax(wq[i]))] += one - int(wq[i].sum())
+        start[i] = s
+    return start, w, wq
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_axis_table(
+    src: int, dst: int, mode: str
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    return _axis_table(src, dst, 0.0, float(src), mode)
+
+
+def _resize_numpy(
+    planes: np.ndarray,
+    ytab: tuple[np.ndarray, np.ndarray, np.ndarray],
+    xtab: tuple[np.ndarray, np.ndarray, np.ndarray],
+) -> np.ndarray:
+    """Separable resample of (N, H, W, C) planes, accumulating one tap at a time."""
+    fixed = planes.dtype == np.uint8
+    (ys, yw, yq), (xs, xw, xq) = ytab, xtab
+    acc_t = np.int32 if fixed else np.float32
+    src = planes.astype(acc_t, copy=False)
+
+    rows = np.zeros((src.shape[0], src.shape[1], len(xs), src.shape[3]), dtype=acc_t)
+    for k in range(xw.shape[1]):
+        weights = (xq if fixed else xw)[:, k]
+        rows += src[:, :, xs + k] * weights[None, None, :, None]
+    acc = np.zeros((src.shape[0], len(ys), len(xs), src.shape[3]), dtype=acc_t)
+    for k in range(yw.shape[1]):
+        weights = (yq if fixed else yw)[:, k]
+        acc += rows[:, ys + k] * weights[None, :, None, None]
+    if not fixed:
+        return acc
+    acc += 1 << (2 * _FIX_BITS - 1)
+    acc >>= 2 * _FIX_BITS
+    return np.clip(acc, 0, 255).astype(np.uint8)
+
+
+def resize(
+    image: np.ndarray,
+    new_h: int,
+    new_w: int,
+    mode: str = "bilinear",
+    *,
+    roi: tuple[float, float, float, float] | None = None,
+    planar: bool = False,
+    out: np.ndarray | None = None,
+) -> np.ndarray:
+    """Resize a uint8 or float32 image: (H, W), (H, W, C) or, with ``planar``, (N, H, W).
+
+    ``mode`` is "bilinear" (half-pixel centers, like OpenCV's INTER_LINEAR) or
+    "area" (box filter averaging every covered pixel, for large downscales;
+    falls back to bilinear along an axis that is upscaled). Per-axis
+    coefficient tables are cached per shape, and uint8 uses 11-bit fixed-point
+    math. ``roi=(y0, x0, y1, x1)`` resamples that source rectangle (pixel
+    edges, may be fractional) instead of the whole image. Every plane, row and
+    channel goes through one call (parallel in the Rust build).
+
+    Other dtypes are converted to float32. Writes into ``out`` (C-contiguous,
+    output shape and dtype) when given.
+    """
+    if mode not in RESIZE_MODES:
+        raise ValueError(f"Unknown resize mode '{mode}'. Choose one of: {', '.join(RESIZE_MODES)}")
+    if image.dtype != np.uint8:
+        image = np.asarray(image, dtype=np.float32)
+    if _RUST_AVAILABLE:
+        fn = _rs_resize_u8 if image.dtype == np.uint8 else _rs_resize_f32
+        return fn(image, new_h, new_w, mode, roi, planar, out)
+
+    if image.ndim == 2:
+        planes, out_shape = image[None, :, :, None], (new_h, new_w)
+    elif image.ndim == 3 and not planar:
+        planes, out_shape = image[None], (new_h, new_w, image.shape[2])
+    elif image.ndim == 3:
+        planes, out_shape = image[..., None], (image.shape[0], new_h, new_w)
+    else:
+        raise ValueError("image must be (H, W), (H, W, C) or, with planar=True, (N, H, W)")
+    h, w = planes.shape[1:3]
+    if h == 0 or w == 0:
+        raise ValueError("image must not be empty")
+    if out is not None:
+        _check_out(out, out_shape, image.dtype)
+
+    if roi is None:
+        ytab = _cached_axis_table(h, new_h, mode)
+        xtab = _cached_axis_table(w, new_w, mode)
+    else:
+        y0, x0, y1, x1 = (float(v) for v in roi)
+        ytab = _axis_table(h, new_h, y0, y1, mode)
+        xtab = _axis_table(w, new_w, x0, x1, mode)
+    result = _resize_numpy(planes, ytab, xtab).reshape(out_shape)
+    if out is None:
+        return result
+    np.copyto(out, result)
+    return out
 
 
 # ===== NMS =================================================================
@@ -141,6 +409,132 @@ def nms_boxes(
     return np.array(keep, dtype=np.intp)
 
 
+def batched_nms(
+    boxes: np.ndarray,
+    scores: np.ndarray,
+    class_ids: np.ndarray | None = None,
+    batch_idx: np.ndarray | None = None,
+    iou_threshold: float = 0.45,
+    max_det: int = 300,
+    top_k: int = 0,
+    agnostic: bool = False,
+) -> np.ndarray:
+    """Class-aware, batched non-maximum suppression. Returns indices of kept boxes.
+
+    Parameters
+    ----------
+    boxes : (N, 4) float32 array of [x1, y1, x2, y2]
+    scores : (N,) float32 array
+    class_ids : optional (N,) int array; boxes only suppress boxes of the same
+        class unless ``agnostic`` is True
+    batch_idx : optional (N,) int array of image indices; each image is
+        suppressed independently
+    iou_threshold : IoU threshold for suppression
+    max_det : maximum boxes kept per image (0 = no limit)
+    top_k : only the best ``top_k`` candidates per image enter the IoU loop (0 = all)
+
+    Kept indices are grouped by image and sorted by descending score within each.
+    """
+    boxes = np.ascontiguousarray(boxes, dtype=np.float32)
+    scores = np.ascontiguousarray(scores, dtype=np.float32)
+    if class_ids is not None:
+        class_ids = np.ascontiguousarray(class_ids, dtype=np.int32)
+    if batch_idx is not None:
+        batch_idx = np.ascontiguousarray(batch_idx, dtype=np.int32)
+
+    if _RUST_AVAILABLE:
+        return _rs_batched_nms(
+            boxes, scores, class_ids, batch_idx, iou_threshold, max_det, top_k, agnostic
+        )
+
+    if len(boxes) == 0:
+        return np.empty(0, dtype=np.intp)
+
+    x1 = boxes[:, 0]
+    y1 = boxes[:, 1]
+    x2 = boxes[:, 2]
+    y2 = boxes[:, 3]
+    areas = (x2 - x1).clip(min=0) * (y2 - y1).clip(min=0)
+    cls = None if agnostic or class_ids is None else class_ids
+
+    if batch_idx is None:
+        images = [np.arange(len(boxes))]
+    else:
+        images = [np.flatnonzero(batch_idx == b) for b in range(int(batch_idx.max()) + 1)]
+
+    keep: list[int] = []
+    for idx in images:
+        if top_k > 0 and idx.size > top_k:
+            idx = idx[np.argpartition(-scores[idx], top_k - 1)[:top_k]]
+        order = idx[np.argsort(-scores[idx], kind="stable")]
+
+        n_kept = 0
+        while order.size > 0:
+            i = order[0]
+            keep.append(int(i))
+            n_kept += 1
+            if order.size == 1 or (max_det > 0 and n_kept >= max_det):
+                break
+
+            rest = order[1:]
+            xx1 = np.maximum(x1[i], x1[rest])
+            yy1 = np.maximum(y1[i], y1[rest])
+            xx2 = np.minimum(x2[i], x2[rest])
+            yy2 = np.minimum(y2[i], y2[rest])
+
+            inter = np.maximum(0.0, xx2 - xx1) * np.maximum(0.0, yy2 - yy1)
+            iou = inter / (areas[i] + areas[rest] - inter + 1e-9)
+
+            survive = iou <= iou_threshold
+            if cls is not None:
+                survive |= cls[rest] != cls[i]
+            order = rest[survive]
+
+    return np.array(keep, dtype=np.intp)
+
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU of (N, 4) and (M, 4) [x1, y1, x2, y2] boxes → (N, M) float32."""
+    a = np.ascontiguousarray(a, dtype=np.float32).reshape(-1, 4)
+    b = np.ascontiguousarray(b, dtype=np.float32).reshape(-1, 4)
+    if _RUST_AVAILABLE:
+        return _rs_iou_matrix(a, b)
+
+    area_a = (a[:, 2] - a[:, 0]).clip(min=0) * (a[:, 3] - a[:, 1]).clip(min=0)
+    area_b = (b[:, 2] - b[:, 0]).clip(min=0) * (b[:, 3] - b[:, 1]).clip(min=0)
+    lt = np.maximum(a[:, None, :2], b[None, :, :2])
+    rb = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    wh = (rb - lt).clip(min=0)
+    inter = wh[..., 0] * wh[..., 1]
+    return (inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)).astype(np.float32)
+
+
+def greedy_match(affinity: np.ndarray, threshold: float = 0.3) -> tuple[np.ndarray, np.ndarray]:
+    """Greedy one-to-one assignment on an (N, M) affinity matrix.
+
+    Pairs with ``affinity >= threshold`` are accepted in descending order, skipping
+    rows/columns already taken. Returns ``(rows, cols)`` int64 index arrays.
+    """
+    affinity = np.ascontiguousarray(affinity, dtype=np.float32)
+    if _RUST_AVAILABLE:
+        return _rs_greedy_match(affinity, threshold)
+
+    r, c = np.nonzero(affinity >= threshold)
+    order = np.argsort(-affinity[r, c], kind="stable")
+    row_used = np.zeros(affinity.shape[0], dtype=bool)
+    col_used = np.zeros(affinity.shape[1], dtype=bool)
+    rows: list[int] = []
+    cols: list[int] = []
+    # Only candidate pairs above the threshold are visited, not the full N x M grid.
+    for i, j in zip(r[order].tolist(), c[order].tolist()):
+        if row_used[i] or col_used[j]:
+            continue
+        row_used[i] = col_used[j] = True
+        rows.append(i)
+        cols.append(j)
+    return np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64)
+
+
 def filter_detections_by_score(
     boxes: np.ndarray,
     scores: np.ndarray,
@@ -155,64 +549,265 @@ def filter_detections_by_score(
     return boxes[mask], scores[mask], class_ids[mask]
 
 
+# ===== YOLO decode =========================================================
+
+
+def decode_yolo_seg(
+    pred: np.ndarray,
+    num_masks: int,
+    conf_thres: float = 0.25,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Decode a raw YOLOv8-seg output in its native (D, N) layout.
+
+    Rows are ``[x, y, w, h, cls0..clsC-1, mask0..maskM-1]``, columns are anchors.
+    Only anchors whose best class score is ``>= conf_thres`` are emitted.
+
+    Returns
+    -------
+    boxes : (K, 4) float32 xyxy
+    scores : (K,) float32
+    class_ids : (K,) int32
+    mask_coeffs : (K, num_masks) float32
+    """
+    if _RUST_AVAILABLE:
+        return _rs_decode_yolo_seg(pred, num_masks, conf_thres)
+
+    nc = pred.shape[0] - 4 - num_masks
+    cls_scores = pred[4 : 4 + nc]
+    conf = cls_scores.max(axis=0)
+    keep = np.flatnonzero(conf >= conf_thres)
+
+    class_ids = cls_scores[:, keep].argmax(axis=0).astype(np.int32)
+    x, y, w, h = pred[:4, keep].astype(np.float32, copy=False)
+    boxes = np.stack([x - w / 2, y - h / 2, x + w / 2, y + h / 2], axis=1)
+    coeffs = np.ascontiguousarray(pred[4 + nc :, keep].T, dtype=np.float32)
+    return boxes, conf[keep].astype(np.float32, copy=False), class_ids, coeffs
+
+
+# ===== Motion ==============================================================
+
+
+def downsample_luma(frame: np.ndarray, factor: int = 4) -> np.ndarray:
+    """Box-downsample (H, W, 3) uint8 to (H // factor, W // factor) uint8 luma."""
+    if _RUST_AVAILABLE:
+        return _rs_downsample_luma(frame, factor)
+
+    f = max(1, int(factor))
+    h, w = frame.shape[0] // f, frame.shape[1] // f
+    # Sum rows then columns of each block (two cheap contiguous reductions).
+    rows = frame[: h * f, : w * f].reshape(h, f, w * f, 3).sum(axis=1, dtype=np.uint16)
+    blocks = rows.reshape(h, w, f, 3).sum(axis=2, dtype=np.uint32)
+    acc = blocks[..., 0] * 77 + blocks[..., 1] * 150 + blocks[..., 2] * 29
+    return ((acc >> 8) // (f * f)).astype(np.uint8)
+
+
+def luma_sad(
+    cur: np.ndarray,
+    reference: np.ndarray,
+    tile: int = 0,
+) -> tuple[float, np.ndarray]:
+    """Mean absolute difference of two uint8 luma images.
+
+    With ``tile > 0`` also returns a per-tile mean absolute difference map of
+    shape ``(ceil(h / tile), ceil(w / tile))``; otherwise an empty (0, 0) map.
+    """
+    if _RUST_AVAILABLE:
+        return _rs_luma_sad(cur, reference, tile)
+
+    diff = np.abs(cur.astype(np.int16) - reference.astype(np.int16))
+    if diff.size == 0:
+        return 0.0, np.zeros((0, 0), dtype=np.float32)
+    mean = float(diff.mean())
+    if tile <= 0:
+        return mean, np.zeros((0, 0), dtype=np.float32)
+
+    h, w = diff.shape
+    th, tw = -(-h // tile), -(-w // tile)
+    padded = np.zeros((th * tile, tw * tile), dtype=np.uint32)
+    padded[:h, :w] = diff
+    sums = padded.reshape(th, tile, tw, tile).sum(axis=(1, 3))
+    rows = np.minimum(tile, h - np.arange(th) * tile)
+    cols = np.minimum(tile, w - np.arange(tw) * tile)
+    return mean, (sums / np.outer(rows, cols)).astype(np.float32)
+
+
 # ===== Depth ===============================================================
 
 
-def normalize_depth_map(depth: np.ndarray) -> np.ndarray:
-    """Normalize a float32 depth map to uint8 [0, 255]."""
+def normalize_depth_map(depth: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    """Normalize a float32 depth map to uint8 [0, 255].
+
+    Writes into ``out`` (same shape, uint8) when given.
+    """
     if _RUST_AVAILABLE:
-        return _rs_normalize_depth_map(depth)
+        return _rs_normalize_depth_map(depth, out)
 
     d = depth.astype(np.float32, copy=False)
+    if out is not None:
+        _check_out(out, d.shape, np.uint8)
     d_min = d.min()
     d_max = d.max()
     if d_max - d_min < 1e-9:
-        return np.zeros(d.shape, dtype=np.uint8)
+        if out is None:
+            return np.zeros(d.shape, dtype=np.uint8)
+        out.fill(0)
+        return out
     d_norm = (d - d_min) / (d_max - d_min) * 255.0
-    return d_norm.astype(np.uint8)
+    if out is None:
+        return d_norm.astype(np.uint8)
+    np.copyto(out, d_norm, casting="unsafe")
+    return out
 
 
-def depth_to_colormap_jet(depth_u8: np.ndarray) -> np.ndarray:
-    """Apply JET colormap to a single-channel uint8 image → (H, W, 3) BGR uint8."""
+COLORMAPS = ("jet", "turbo", "inferno")
+
+
+def _jet(t: np.ndarray) -> np.ndarray:
+    r = np.interp(t, [0.0, 0.375, 0.625, 0.875, 1.0], [0.0, 0.0, 1.0, 1.0, 0.5])
+    g = np.interp(t, [0.0, 0.125, 0.375, 0.625, 0.875, 1.0], [0.0, 0.0, 1.0, 1.0, 0.0, 0.0])
+    b = np.interp(t, [0.0, 0.125, 0.375, 0.625, 1.0], [0.5, 1.0, 1.0, 0.0, 0.0])
+    return np.stack([r, g, b], axis=-1)
+
+
+def _turbo(t: np.ndarray) -> np.ndarray:
+    # Published polynomial approximation of Turbo, coefficients by ascending power.
+    coeffs = np.array(
+        [
+            [0.13572138, 4.61539260, -42.66032258, 132.13108234, -152.94239396, 59.28637943],
+            [0.09140261, 2.19418839, 4.84296658, -14.18503333, 4.27729857, 2.82956604],
+            [0.10667330, 12.64194608, -60.58204836, 110.36276771, -89.90310912, 27.34824973],
+        ]
+    )
+    return np.stack([np.polynomial.polynomial.polyval(t, c) for c in coeffs], axis=-1)
+
+
+def _inferno(t: np.ndarray) -> np.ndarray:
+    # Degree-6 polynomial fit of matplotlib's inferno, coefficients by ascending power.
+    coeffs = np.array(
+        [
+            [0.0002189403691192265, 0.001651004631001012, -0.01948089843709184],
+            [0.1065134194856116, 0.5639564367884091, 3.932712388889277],
+            [11.60249308247187, -3.972853965665698, -15.9423941062914],
+            [-41.70399613139459, 17.43639888205313, 44.35414519872813],
+            [77.162935699427, -33.40235894210092, -81.80730925738993],
+            [-71.31942824499214, 32.62606426397723, 73.20951985803202],
+            [25.13112622477341, -12.24266895238567, -23.07032500287172],
+        ]
+    )
+    return np.stack([np.polynomial.polynomial.polyval(t, c) for c in coeffs.T], axis=-1)
+
+
+@functools.lru_cache(maxsize=None)
+def colormap_lut(name: str = "jet") -> np.ndarray:
+    """(256, 3) BGR uint8 lookup table of a colormap ("jet", "turbo" or "inferno").
+
+    Built once per process; the returned array is read-only.
+    """
+    if name not in COLORMAPS:
+        raise ValueError(f"Unknown colormap '{name}'. Choose one of: {', '.join(COLORMAPS)}")
+    t = np.arange(256) / 255.0
+    rgb = np.clip({"jet": _jet, "turbo": _turbo, "inferno": _inferno}[name](t), 0.0, 1.0)
+    # JET truncates like the Rust table it mirrors; the others round.
+    scaled = rgb * 255.0 if name == "jet" else np.round(rgb * 255.0)
+    lut = np.ascontiguousarray(scaled[:, ::-1].astype(np.uint8))  # BGR
+    lut.flags.writeable = False
+    return lut
+
+
+def depth_to_colormap_jet(depth_u8: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    """Apply JET colormap to a single-channel uint8 image → (H, W, 3) BGR uint8.
+
+    Writes into ``out`` ((H, W, 3) uint8) when given.
+    """
+    if _RUST_AVAILABLE:
+        return _rs_depth_to_colormap_jet(depth_u8, out)
+
+    lut = colormap_lut("jet")
+    if out is None:
+        return lut[depth_u8]
+    _check_out(out, (*depth_u8.shape, 3), np.uint8)
+    return np.take(lut, depth_u8, axis=0, out=out)
+
+
+def _depth_range(
+    d: np.ndarray, lo: float | None, hi: float | None
+) -> tuple[float, float]:
+    if lo is not None and hi is not None:
+        return float(lo), float(hi)
+    if not np.any(~np.isnan(d)):
+        return 0.0, 0.0
+    d_min, d_max = float(np.nanmin(d)), float(np.nanmax(d))
+    return (d_min if lo is None else float(lo)), (d_max if hi is None else float(hi))
+
+
+def _depth_index(d: np.ndarray, lo: float, hi: float) -> np.ndarray:
+    if hi - lo < 1e-9:
+        return np.zeros(d.shape, dtype=np.uint8)
+    t = (d - np.float32(lo)) / np.float32(hi - lo) * np.float32(255.0)
+    np.clip(t, 0.0, 255.0, out=t)
+    return np.nan_to_num(t, copy=False, nan=0.0).astype(np.uint8)
+
+
+def _depth_stats(
+    d: np.ndarray, idx: np.ndarray, lo: float, hi: float
+) -> tuple[float, float, np.ndarray]:
+    valid = ~np.isnan(d)
+    if not valid.any():
+        return float("inf"), float("-inf"), np.zeros(258, dtype=np.uint64)
+    below, above = d < lo, d > hi
+    hist = np.zeros(258, dtype=np.uint64)
+    hist[0], hist[257] = np.count_nonzero(below), np.count_nonzero(above)
+    hist[1:257] = np.bincount(idx[valid & ~below & ~above], minlength=256)
+    return float(np.nanmin(d)), float(np.nanmax(d)), hist
+
+
+def depth_histogram(
+    depth: np.ndarray, lo: float | None = None, hi: float | None = None
+) -> tuple[float, float, np.ndarray]:
+    """Min, max and a 258-bin histogram of a float32 depth map.
+
+    Bin 0 counts values below ``lo``, bins 1..256 the colormap index each value
+    in ``[lo, hi]`` gets from :func:`colorize_depth`, bin 257 values above
+    ``hi``. ``lo`` / ``hi`` default to the map's min / max. NaN values are not
+    counted. Returns ``(min, max, hist)``.
+    """
+    d = np.asarray(depth, dtype=np.float32)
+    if _RUST_AVAILABLE:
+        return _rs_depth_histogram(d, lo, hi)
+
+    lo, hi = _depth_range(d, lo, hi)
+    return _depth_stats(d, _depth_index(d, lo, hi), lo, hi)
+
+
+def colorize_depth(
+    depth: np.ndarray,
+    lo: float | None = None,
+    hi: float | None = None,
+    colormap: str = "jet",
+    out: np.ndarray | None = None,
+) -> tuple[np.ndarray, float, float, np.ndarray]:
+    """Map a float32 depth map through a colormap → (H, W, 3) BGR uint8.
+
+    Normalization, lookup and the statistics of :func:`depth_histogram` happen
+    in one pass. Values in ``[lo, hi]`` are spread over the colormap (the same
+    mapping as ``normalize_depth_map`` for the map's min / max, the default)
+    and clipped outside. ``colormap`` is one of :data:`COLORMAPS`.
+
+    Writes into ``out`` ((H, W, 3) uint8) when given.
+    Returns ``(image, min, max, hist)``.
+    """
+    d = np.asarray(depth, dtype=np.float32)
     if _RUST_AVAILABLE:
-        return _rs_depth_to_colormap_jet(depth_u8)
-
-    # Build a compact 256-entry JET LUT (BGR order, matching OpenCV convention).
-    lut = np.zeros((256, 3), dtype=np.uint8)
-    for i in range(256):
-        t = i / 255.0
-        # Red channel
-        if t < 0.375:
-            r = 0.0
-        elif t < 0.625:
-            r = (t - 0.375) / 0.25
-        elif t < 0.875:
-            r = 1.0
-        else:
-            r = 1.0 - (t - 0.875) / 0.25
-        # Green channel
-        if t < 0.125:
-            g = 0.0
-        elif t < 0.375:
-            g = (t - 0.125) / 0.25
-        elif t < 0.625:
-            g = 1.0
-        elif t < 0.875:
-            g = 1.0 - (t - 0.625) / 0.25
-        else:
-            g = 0.0
-        # Blue channel
-        if t < 0.125:
-            b = 0.5 + t / 0.125 * 0.5
-        elif t < 0.375:
-            b = 1.0
-        elif t < 0.625:
-            b = 1.0 - (t - 0.375) / 0.25
-        else:
-            b = 0.0
-        lut[i] = [int(b * 255), int(g * 255), int(r * 255)]  # BGR
-
-    return lut[depth_u8]
+        return _rs_colorize_depth(d, lo, hi, colormap, out)
+
+    lut = colormap_lut(colormap)
+    lo, hi = _depth_range(d, lo, hi)
+    idx = _depth_index(d, lo, hi)
+    if out is None:
+        img = lut[idx]
+    else:
+        img = np.take(lut, idx, axis=0, out=_check_out(out, (*d.shape, 3), np.uint8))
+    return (img, *_depth_stats(d, idx, lo, hi))
 
 
 def depth_to_pointcloud(
@@ -248,11 +843,29 @@ def depth_to_pointcloud(
 # ===== Drawing =============================================================
 
 
+def _draw_bboxes_numpy(
+    out: np.ndarray, boxes: np.ndarray, color: tuple[int, int, int], thickness: int
+) -> None:
+    h, w = out.shape[:2]
+    for box in boxes:
+        x1 = int(max(0, min(w - 1, box[0])))
+        y1 = int(max(0, min(h - 1, box[1])))
+        x2 = int(max(0, min(w - 1, box[2])))
+        y2 = int(max(0, min(h - 1, box[3])))
+        # Top / bottom horizontal lines
+        out[y1 : y1 + thickness, x1 : x2 + 1] = color
+        out[max(0, y2 - thickness + 1) : y2 + 1, x1 : x2 + 1] = color
+        # Left / right vertical lines
+        out[y1 : y2 + 1, x1 : x1 + thickness] = color
+        out[y1 : y2 + 1, max(0, x2 - thickness + 1) : x2 + 1] = color
+
+
 def draw_bboxes_on_frame(
     frame: np.ndarray,
     boxes: np.ndarray,
     color: tuple[int, int, int] = (0, 255, 0),
     thickness: int = 2,
+    out: np.ndarray | None = None,
 ) -> np.ndarray:
     """Draw rectangles on a (H, W, 3) uint8 image. Returns a copy.
 
@@ -261,37 +874,251 @@ def draw_bboxes_on_frame(
     boxes : (N, 4) int or float array of [x1, y1, x2, y2]
     color : RGB tuple
     thickness : line thickness in pixels
+    out : optional (H, W, 3) uint8 array that receives the result instead of a
+        new copy. To draw onto ``frame`` itself use :func:`draw_bboxes_inplace`.
     """
     if _RUST_AVAILABLE:
-        return _rs_draw_bboxes_on_frame(frame, boxes, color, thickness)
-
-    out = frame.copy()
-    h, w = out.shape[:2]
-    for box in boxes:
-        x1 = int(max(0, min(w - 1, box[0])))
-        y1 = int(max(0, min(h - 1, box[1])))
-        x2 = int(max(0, min(w - 1, box[2])))
-        y2 = int(max(0, min(h - 1, box[3])))
-        # Top / bottom horizontal lines
-        out[y1 : y1 + thickness, x1 : x2 + 1] = color
-        out[max(0, y2 - thickness + 1) : y2 + 1, x1 : x2 + 1] = color
-        # Left / right vertical lines
-        out[y1 : y2 + 1, x1 : x1 + thickness] = color
-        out[y1 : y2 + 1, max(0, x2 - thickness + 1) : x2 + 1] = color
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        return _rs_draw_bboxes_on_frame(frame, boxes, color, thickness, out)
+
+    if out is None:
+        out = frame.copy()
+    else:
+        np.copyto(_check_out(out, frame.shape, np.uint8), frame)
+    _draw_bboxes_numpy(out, boxes, color, thickness)
     return out
 
 
+def draw_bboxes_inplace(
+    frame: np.ndarray,
+    boxes: np.ndarray,
+    color: tuple[int, int, int] = (0, 255, 0),
+    thickness: int = 2,
+) -> np.ndarray:
+    """Draw rectangles directly onto a (H, W, 3) uint8 image. Returns ``frame``."""
+    if _RUST_AVAILABLE:
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        _rs_draw_bboxes_inplace(frame, boxes, color, thickness)
+        return frame
+    _draw_bboxes_numpy(frame, boxes, color, thickness)
+    return frame
+
+
+# 5x7 bitmap font for printable ASCII (0x20..0x7E), same table as the Rust
+# kernels: five column bytes per glyph, bit 0 is the top row.
+_FONT_5X7 = np.frombuffer(
+    bytes.fromhex(
+        "000000000000005f00000007000700147f147f14242a7f2a12231308646236495522500005030000"
+        "001c2241000041221c00082a1c2a0808083e08080050300000080808080800606000002010080402"
+        "3e5149453e00427f400042615149462141454b311814127f1027454545393c4a4949300171090503"
+        "3649494936064949291e003636000000563600000814224100141414141400412214080201510906"
+        "324979413e7e1111117e7f494949363e414141227f4141221c7f494949417f090909013e4149497a"
+        "7f0808087f00417f41002040413f017f081422417f404040407f020c027f7f0408107f3e4141413e"
+        "7f090909063e4151215e7f09192946464949493101017f01013f4040403f1f2040201f3f4038403f"
+        "631408146307087008076151494543007f41410002040810200041417f0004020102044040404040"
+        "000102040020545454787f484444383844444420384444487f3854545418087e0901020c5252523e"
+        "7f0804047800447d40002040443d007f1028440000417f40007c041804787c080404783844444438"
+        "7c14141408081414187c7c080404084854545420043f4440203c4040207c1c2040201c3c4030403c"
+        "44281028440c5050503c4464544c44000836410000007f000000413608000804081008"
+    ),
+    dtype=np.uint8,
+).reshape(95, 5)
+
+
+def _text_ink(text: str, scale: int) -> np.ndarray:
+    """(9 * s, (6 * len + 1) * s) bool mask of a label tag: True where text is drawn."""
+    s = max(1, int(scale))
+    codes = np.frombuffer(text.encode("utf-8"), dtype=np.uint8).astype(np.intp)
+    codes = np.where((codes >= 0x20) & (codes <= 0x7E), codes, ord("?")) - 0x20
+    bits = (_FONT_5X7[codes][:, None, :] >> np.arange(7)[None, :, None]) & 1  # (n, 7, 5)
+    ink = np.zeros((9, 6 * len(codes) + 1), dtype=bool)
+    ink[1:8, 1:] = np.pad(bits, ((0, 0), (0, 0), (0, 1))).transpose(1, 0, 2).reshape(7, -1)
+    return ink.repeat(s, axis=0).repeat(s, axis=1)
+
+
+def _text_color(bg: np.ndarray) -> np.ndarray:
+    # Symmetric in channels 0 and 2, so RGB and BGR colors agree.
+    luma = (int(bg[0]) + 2 * int(bg[1]) + int(bg[2])) // 4
+    return np.zeros(3, np.uint8) if luma > 140 else np.full(3, 255, np.uint8)
+
+
+def _paste_text(
+    frame: np.ndarray,
+    ink: np.ndarray,
+    x: int,
+    y: int,
+    color: np.ndarray,
+    background: np.ndarray | None,
+) -> None:
+    h, w = frame.shape[:2]
+    fx0, fy0 = max(0, x), max(0, y)
+    fx1, fy1 = min(w, x + ink.shape[1]), min(h, y + ink.shape[0])
+    if fx1 <= fx0 or fy1 <= fy0:
+        return
+    region = frame[fy0:fy1, fx0:fx1]
+    sel = ink[fy0 - y : fy1 - y, fx0 - x : fx1 - x]
+    if background is not None:
+        region[...] = background
+    region[sel] = color
+
+
+def _composite_numpy(
+    frame: np.ndarray,
+    boxes: np.ndarray,
+    class_ids: np.ndarray,
+    palette: np.ndarray,
+    masks: list[np.ndarray | None] | None,
+    mask_origins: np.ndarray | None,
+    labels: list[str] | None,
+    alpha: float,
+    thickness: int,
+    text_scale: int,
+) -> None:
+    h, w = frame.shape[:2]
+    if h == 0 or w == 0:
+        return
+    a = np.uint32(round(min(max(alpha, 0.0), 1.0) * 256))
+    s = max(1, int(text_scale))
+    for i, box in enumerate(boxes):
+        color = palette[int(class_ids[i]) % len(palette)]
+
+        m = masks[i] if masks is not None else None
+        if m is not None:
+            ox, oy = (int(v) for v in (mask_origins[i] if mask_origins is not None else box[:2]))
+            mh, mw = m.shape
+            fx0, fy0 = max(0, ox), max(0, oy)
+            fx1, fy1 = min(w, ox + mw), min(h, oy + mh)
+            if fx1 > fx0 and fy1 > fy0:
+                region = frame[fy0:fy1, fx0:fx1]
+                sel = m[fy0 - oy : fy1 - oy, fx0 - ox : fx1 - ox] != 0
+                px = region[sel].astype(np.uint32)
+                region[sel] = ((px * (256 - a) + color.astype(np.uint32) * a + 128) >> 8).astype(
+                    np.uint8
+                )
+
+        x1 = min(max(int(box[0]), 0), w - 1)
+        y1 = min(max(int(box[1]), 0), h - 1)
+        x2 = min(max(int(box[2]), 0), w - 1)
+        y2 = min(max(int(box[3]), 0), h - 1)
+        if x2 > x1 and y2 > y1:
+            ty, tx = min(thickness, y2 - y1), min(thickness, x2 - x1)
+            frame[y1 : y1 + ty, x1 : x2 + 1] = color
+            frame[y2 + 1 - ty : y2 + 1, x1 : x2 + 1] = color
+            frame[y1 : y2 + 1, x1 : x1 + tx] = color
+            frame[y1 : y2 + 1, x2 + 1 - tx : x2 + 1] = color
+
+        if labels is not None and labels[i]:
+            ink = _text_ink(labels[i], s)
+            ly = y1 - ink.shape[0] if y1 >= ink.shape[0] else y1
+            _paste_text(frame, ink, x1, ly, _text_color(color), color)
+
+
+def composite_detections(
+    frame: np.ndarray,
+    boxes: np.ndarray,
+    class_ids: np.ndarray,
+    palette: np.ndarray,
+    masks: list[np.ndarray | None] | None = None,
+    mask_origins: np.ndarray | None = None,
+    labels: list[str] | None = None,
+    alpha: float = 0.45,
+    thickness: int = 2,
+    text_scale: int = 1,
+) -> np.ndarray:
+    """Draw detections onto a (H, W, 3) uint8 image in place. Returns ``frame``.
+
+    Each detection gets, in this order, its mask blended in at ``alpha``
+    (8-bit fixed point), its box outline and a filled label tag above the box,
+    all in ``palette[class_ids[i] % K]``. Later detections cover earlier ones.
+
+    Parameters
+    ----------
+    boxes : (N, 4) array of [x1, y1, x2, y2]
+    class_ids : (N,) int array selecting each detection's palette color
+    palette : (K, 3) uint8 colors, in the frame's channel order
+    masks : optional list of N box-relative (h, w) masks (nonzero = inside) or
+        None entries
+    mask_origins : optional (N, 2) int array with each mask's (x, y) in the
+        frame; defaults to the box's top-left corner
+    labels : optional list of N strings ("" = no label), drawn with a built-in
+        5x7 font scaled by ``text_scale``
+    """
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    class_ids = np.asarray(class_ids, dtype=np.int32).reshape(-1)
+    palette = np.asarray(palette, dtype=np.uint8).reshape(-1, 3)
+    if masks is not None:
+        masks = [None if m is None else np.asarray(m, dtype=np.uint8) for m in masks]
+    if mask_origins is not None:
+        mask_origins = np.asarray(mask_origins, dtype=np.int32).reshape(-1, 2)
+    if _RUST_AVAILABLE:
+        _rs_composite_detections(
+            frame, boxes, class_ids, palette, masks, mask_origins, labels, alpha, thickness,
+            text_scale,
+        )
+        return frame
+
+    n = len(boxes)
+    if frame.ndim != 3 or frame.shape[2] != 3:
+        raise ValueError("frame must be (H, W, 3) uint8")
+    if len(class_ids) != n:
+        raise ValueError("boxes must be (N, 4) and class_ids (N,)")
+    if len(palette) == 0:
+        raise ValueError("palette must be a non-empty (K, 3) uint8 array")
+    if masks is not None and len(masks) != n:
+        raise ValueError("masks must have one entry per box")
+    if labels is not None and len(labels) != n:
+        raise ValueError("labels must have one entry per box")
+    if mask_origins is not None and len(mask_origins) != n:
+        raise ValueError("mask_origins must be (N, 2) int32")
+    _composite_numpy(
+        frame, boxes, class_ids, palette, masks, mask_origins, labels, alpha, thickness, text_scale
+    )
+    return frame
+
+
+def draw_text(
+    frame: np.ndarray,
+    text: str,
+    x: int,
+    y: int,
+    color: tuple[int, int, int] = (255, 255, 255),
+    scale: int = 1,
+    background: tuple[int, int, int] | None = None,
+) -> np.ndarray:
+    """Draw ``text`` with the built-in 5x7 font onto ``frame`` in place. Returns ``frame``.
+
+    ``(x, y)`` is the top-left corner of the text's tag, which adds ``scale``
+    pixels of padding around the glyphs and is filled with ``background`` when
+    given (otherwise only the glyph pixels are drawn).
+    """
+    if _RUST_AVAILABLE:
+        _rs_draw_text(frame, text, x, y, color, scale, background)
+        return frame
+    if frame.ndim != 3 or frame.shape[2] != 3:
+        raise ValueError("frame must be (H, W, 3) uint8")
+    bg = None if background is None else np.asarray(background, dtype=np.uint8)
+    _paste_text(frame, _text_ink(text, scale), x, y, np.asarray(color, dtype=np.uint8), bg)
+    return frame
+
+
 # ===== Dummy Frame =========================================================
 
 
-def generate_dummy_frame(h: int, w: int, t: float) -> np.ndarray:
-    """Generate a (H, W, 3) uint8 test frame with a moving green square."""
+def generate_dummy_frame(h: int, w: int, t: float, out: np.ndarray | None = None) -> np.ndarray:
+    """Generate a (H, W, 3) uint8 test frame with a moving green square.
+
+    Draws into ``out`` ((H, W, 3) uint8) when given.
+    """
     if _RUST_AVAILABLE:
-        return _rs_generate_dummy_frame(h, w, t)
+        return _rs_generate_dummy_frame(h, w, t, out)
 
     import math
 
-    frame = np.zeros((h, w, 3), dtype=np.uint8)
+    if out is None:
+        frame = np.zeros((h, w, 3), dtype=np.uint8)
+    else:
+        frame = _check_out(out, (h, w, 3), np.uint8)
+        frame.fill(0)
     x = int((math.sin(t) * 0.4 + 0.5) * (w - 80))
     y = int((math.cos(t) * 0.4 + 0.5) * (h - 80))
     frame[y : y + 80, x : x + 80, 1] = 255
@@ -0,0 +1,227 @@
+"""Adaptive quality control: trade detector quality for latency at runtime.
+
+:class:`AdaptiveController` is itself a detector. It owns a ladder of
+:class:`QualityLevel` settings, ordered from best to cheapest, watches the
+measured per-frame latency and moves along the ladder to stay within a budget:
+
+- it steps down after ``down_after`` consecutive frames whose smoothed latency is
+  over budget;
+- it steps up after ``up_after`` consecutive frames under ``headroom`` x budget;
+- if a step up is undone before ``up_after`` frames have passed, the wait before
+  trying that level again doubles (up to ``max_backoff`` x), so it does not flap
+  between two levels on a machine that sits right at the boundary.
+
+Detectors are created once and kept: one per model profile when they can be
+reconfigured, else one per level. Returning to a level never reloads a model.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+
+from .api import Detection, Detector
+
+
+@dataclass(frozen=True)
+class QualityLevel:
+    """One rung of the quality ladder.
+
+    - ``profile``: ``model_zoo`` profile (fast / balanced / quality)
+    - ``img_size``: detector input size (``YoloSegConfig.img_size``)
+    - ``masks``: whether instance masks are attached
+    """
+
+    profile: str = "fast"
+    img_size: int = 640
+    masks: bool = True
+
+
+DEFAULT_LEVELS: tuple[QualityLevel, ...] = (
+    QualityLevel("quality", 640, True),
+    QualityLevel("balanced", 640, True),
+    QualityLevel("fast", 640, True),
+    QualityLevel("fast", 480, True),
+    QualityLevel("fast", 320, True),
+    QualityLevel("fast", 320, False),
+)
+
+
+def _zoo_factory(backend: str) -> Callable[[QualityLevel], Detector]:
+    def make(level: QualityLevel) -> Detector:
+        from .model_zoo import ensure_model, get_default_yolo_seg_specs
+        from .onnx_yolo_seg import OnnxYoloSegDetector
+
+        specs = get_default_yolo_seg_specs()
+        if level.profile not in specs:
+            raise ValueError(
+                f"Unknown profile '{level.profile}'. Choose one of: {', '.join(specs.keys())}"
+            )
+        # Built at the model's default size; the controller reconfigures it per level.
+        return OnnxYoloSegDetector(str(ensure_model(specs[level.profile])), backend=backend)
+
+    return make
+
+
+class AdaptiveController:
+    """Detector that switches quality levels to meet a latency budget.
+
+    - ``levels``: quality ladder, best first (default: :data:`DEFAULT_LEVELS`)
+    - ``budget_ms``: per-frame latency budget; defaults to ``1000 / target_fps``
+      of the ``run()`` it is passed to
+    - ``start``: index of the initial level
+    - ``factory``: ``factory(level) -> Detector``; defaults to the ``model_zoo``
+      YOLO-seg models. Detectors with a ``reconfigure(img_size=, masks=)`` method
+      are reused across levels of the same profile; others are kept per level.
+    - ``smoothing``: EMA weight of each new latency sample
+
+    Pass it to ``scanlt.run(controller=...)``; it is used as the detector and
+    fed the measured latency of every frame. ``level``, ``latency_ms`` and
+    ``switches`` expose the current state.
+    """
+
+    def __init__(
+        self,
+        levels: Sequence[QualityLevel] = DEFAULT_LEVELS,
+        *,
+        budget_ms: Optional[float] = None,
+        start: int = 0,
+        factory: Optional[Callable[[QualityLevel], Detector]] = None,
+        backend: str = "auto",
+        smoothing: float = 0.1,
+        headroom: float = 0.7,
+        down_after: int = 10,
+        up_after: int = 60,
+        max_backoff: int = 8,
+    ):
+        if not levels:
+            raise ValueError("AdaptiveController needs at least one QualityLevel")
+        self.levels = tuple(levels)
+        self.budget_s = budget_ms / 1000.0 if budget_ms is not None else None
+        self.smoothing = smoothing
+        self.headroom = headroom
+        self.down_after = down_after
+        self.up_after = up_after
+        self.max_backoff = max_backoff
+
+        self._factory = factory or _zoo_factory(backend)
+        # Reconfigurable detectors by profile, the others by level.
+        self._detectors: dict[str, Detector] = {}
+        self._fixed: dict[QualityLevel, Detector] = {}
+        self._unsupported: set[int] = set()
+        self._backoff = [1] * len(self.levels)
+        # (frame index, from level, to level) for every switch.
+        self.switches: list[tuple[int, int, int]] = []
+
+        self._frames = 0
+        self._ema: Optional[float] = None
+        self._over = 0
+        self._under = 0
+        self._since_switch = 0
+        self._entered_up = False
+        # Samples ignored after a switch (first runs of a session are slow).
+        self._warmup = 0
+
+        self._index = -1
+        self._detector: Optional[Detector] = None
+        self._switch_to(max(0, min(start, len(self.levels) - 1)), step=1)
+
+    @property
+    def level(self) -> QualityLevel:
+        return self.levels[self._index]
+
+    @property
+    def level_index(self) -> int:
+        return self._index
+
+    @property
+    def latency_ms(self) -> Optional[float]:
+        return None if self._ema is None else self._ema * 1000.0
+
+    def attach(self, target_fps: float) -> None:
+        """Use ``1 / target_fps`` as the budget unless ``budget_ms`` was given."""
+        if self.budget_s is None:
+            self.budget_s = 1.0 / max(target_fps, 1e-6)
+
+    def predict(self, frame: np.ndarray) -> list[Detection]:
+        assert self._detector is not None
+        return self._detector.predict(frame)
+
+    def _detector_for(self, level: QualityLevel) -> Optional[Detector]:
+        """Detector set up for ``level``, or None if its model cannot be set up that way.
+
+        Errors from the factory (unknown profile, bad model) propagate.
+        """
+        det = self._fixed.get(level)
+        if det is not None:
+            return det
+        det = self._detectors.get(level.profile)
+        if det is None:
+            det = self._factory(level)
+        reconfigure = getattr(det, "reconfigure", None)
+        if reconfigure is None:
+            self._fixed[level] = det
+            return det
+        self._detectors[level.profile] = det
+        try:
+            reconfigure(img_size=level.img_size, masks=level.masks)
+        except ValueError:
+            # e.g. a fixed-size model asked for another img_size.
+            return None
+        return det
+
+    def _switch_to(self, index: int, *, step: int) -> bool:
+        """Move to ``index`` or the next supported level in direction ``step``."""
+        while 0 <= index < len(self.levels):
+            if index not in self._unsupported:
+                det = self._detector_for(self.levels[index])
+                if det is None:
+                    self._unsupported.add(index)
+                else:
+                    self._detector = det
+                    if self._index >= 0:
+                        self.switches.append((self._frames, self._index, index))
+                    self._entered_up = index < self._index
+                    self._index = index
+                    self._ema = None
+                    self._over = self._under = self._since_switch = 0
+                    self._warmup = 2
+                    return True
+            index += step
+        if self._detector is None:
+            raise ValueError("None of the quality levels can be used with this model")
+        return False
+
+    def observe(self, latency_s: float) -> None:
+        """Feed the latency of one frame; may switch the active level."""
+        self._frames += 1
+        self._since_switch += 1
+        if self._warmup > 0:
+            self._warmup -= 1
+            return
+
+        a = self.smoothing
+        self._ema = latency_s if self._ema is None else (1.0 - a) * self._ema + a * latency_s
+
+        budget = self.budget_s
+        if budget is None:
+            return
+        if self._ema > budget:
+            self._over += 1
+            self._under = 0
+        elif self._ema < self.headroom * budget:
+            self._under += 1
+            self._over = 0
+        else:
+            self._over = self._under = 0
+
+        i = self._index
+        if self._over >= self.down_after and i < len(self.levels) - 1:
+            if self._entered_up:
+                quick = self._since_switch < self.up_after
+                self._backoff[i] = min(self._backoff[i] * 2, self.max_backoff) if quick else 1
+            self._switch_to(i + 1, step=1)
+        elif i > 0 and self._under >= self.up_after * self._backoff[i - 1]:
+            self._switch_to(i - 1, step=-1)
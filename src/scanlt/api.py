@@ -1,18 +1,24 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Callable, Optional, Protocol, Iterator
+from typing import TYPE_CHECKING, Callable, Optional, Protocol, Iterator
 
 import numpy as np
 
+from .buffers import BufferPool
+from .frames import BGR, RGB, Frame, as_frame
+from .masks import InstanceMask
+from .motion import MotionGate
 from ._accel import (
-    bgr_to_rgb,
-    rgb_to_bgr,
+    swap_rb_inplace,
     generate_dummy_frame,
     draw_bboxes_on_frame,
-    normalize_depth_map,
-    depth_to_colormap_jet,
 )
+from .render import DepthColorizer, render_result
+
+if TYPE_CHECKING:
+    from .adaptive import AdaptiveController
+    from .tracking import SortTracker
 
 
 @dataclass(frozen=True)
@@ -20,7 +26,10 @@ class Detection:
     xyxy: tuple[float, float, float, float]
     score: float
     class_id: int
-    mask: Optional[np.ndarray] = None
+    # Either a box-relative InstanceMask or a full-frame (H, W) array.
+    mask: Optional[InstanceMask | np.ndarray] = None
+    # Set by a tracker; stable across frames for the same object.
+    track_id: Optional[int] = None
 
 
 @dataclass(frozen=True)
@@ -29,6 +38,33 @@ class Result:
     detections: list[Detection]
     depth: Optional[np.ndarray]
     fps: float
+    frame_id: int = 0
+    # False when the stage was skipped by its cadence and the output is reused.
+    detections_fresh: bool = True
+    depth_fresh: bool = True
+    # Which source produced the frame (set by `run_many`).
+    source_id: Optional[int | str] = None
+
+
+@dataclass(frozen=True)
+class Cadence:
+    """How often a pipeline stage runs.
+
+    - `every`: run on every N-th frame (1 = every frame).
+    - `hz`: run at most this many times per second (takes precedence over `every`).
+
+    The first frame always runs every stage.
+    """
+
+    every: int = 1
+    hz: Optional[float] = None
+
+    def due(self, frame_id: int, now: float, last_id: Optional[int], last_t: float) -> bool:
+        if last_id is None:
+            return True
+        if self.hz is not None and self.hz > 0:
+            return now - last_t >= 1.0 / self.hz
+        return frame_id - last_id >= max(1, self.every)
 
 
 class Detector(Protocol):
@@ -44,19 +80,39 @@ class FrameSource(Protocol):
 
 
 class WebcamSource:
+    """OpenCV webcam frame source.
+
+    With ``latest_only=True`` a background thread reads the camera continuously
+    and keeps only the newest frame, so a slow consumer always gets a fresh frame
+    instead of one queued by the driver. Frames overwritten before being consumed
+    are counted in ``dropped_frames``.
+
+    Frames are read into buffers from ``pool`` (a private
+    :class:`~scanlt.buffers.BufferPool` by default), so a frame's memory is
+    reused once nothing refers to it anymore. With ``convert_bgr_to_rgb=True``
+    they are converted to RGB in place; with ``False`` they stay BGR and are
+    tagged as such (:class:`~scanlt.frames.Frame`), which saves the conversion
+    both here and in the preview. scanlt's detectors read either order.
+    """
+
     def __init__(
         self,
         device_id: int = 0,
         width: int = 640,
         height: int = 480,
         convert_bgr_to_rgb: bool = True,
+        latest_only: bool = False,
+        pool: Optional[BufferPool] = None,
     ):
         self.device_id = device_id
         self.width = width
         self.height = height
         self.convert_bgr_to_rgb = convert_bgr_to_rgb
+        self.latest_only = latest_only
+        self.dropped_frames = 0
+        self.pool = pool if pool is not None else BufferPool()
 
-    def __iter__(self) -> Iterator[np.ndarray]:
+    def _open(self):
         try:
             import cv2  # type: ignore
         except Exception as e:
@@ -71,20 +127,84 @@ class WebcamSource:
         if not cap.isOpened():
             cap.release()
             raise RuntimeError(f"Cannot open webcam device_id={self.device_id}")
+        return cap
 
-        try:
-            while True:
-                ok, frame = cap.read()
-                if not ok:
-                    raise RuntimeError("Failed to read frame from webcam")
+    def _read(self, cap, shape: Optional[tuple[int, ...]]) -> np.ndarray:
+        # OpenCV decodes straight into the pooled buffer when its shape matches.
+        ok, frame = cap.read(self.pool.get(shape) if shape is not None else None)
+        if not ok:
+            raise RuntimeError("Failed to read frame from webcam")
+        return frame
 
-                if self.convert_bgr_to_rgb:
-                    frame = bgr_to_rgb(frame)
+    def _tag(self, frame: np.ndarray) -> Frame:
+        if self.convert_bgr_to_rgb:
+            swap_rb_inplace(frame)
+            return as_frame(frame, RGB)
+        return as_frame(frame, BGR)
 
-                yield frame
+    def __iter__(self) -> Iterator[np.ndarray]:
+        if self.latest_only:
+            yield from self._iter_latest()
+            return
+
+        cap = self._open()
+        shape: Optional[tuple[int, ...]] = None
+        try:
+            while True:
+                frame = self._read(cap, shape)
+                shape = frame.shape
+                yield self._tag(frame)
         finally:
             cap.release()
 
+    def _iter_latest(self) -> Iterator[np.ndarray]:
+        import threading
+
+        cap = self._open()
+        cond = threading.Condition()
+        stop = threading.Event()
+        # One-slot buffer holding the newest grabbed frame not yet consumed.
+        slot: list[Optional[np.ndarray]] = [None]
+        error: list[BaseException] = []
+
+        def _grab() -> None:
+            shape: Optional[tuple[int, ...]] = None
+            try:
+                while not stop.is_set():
+                    frame = self._read(cap, shape)
+                    shape = frame.shape
+                    with cond:
+                        if slot[0] is not None:
+                            self.dropped_frames += 1
+                        slot[0] = frame
+                        cond.notify()
+            except BaseException as e:  # noqa: BLE001 - re-raised in the consumer
+                with cond:
+                    error.append(e)
+                    cond.notify()
+            finally:
+                # Released here, never while a read may still be in progress on this
+                # thread (a stalled camera can block cap.read() for seconds).
+                cap.release()
+
+        grabber = threading.Thread(target=_grab, name="scanlt-webcam-grabber", daemon=True)
+        grabber.start()
+        try:
+            while True:
+                with cond:
+                    while slot[0] is None and not error:
+                        cond.wait()
+                    if error:
+                        raise error[0]
+                    frame = slot[0]
+                    slot[0] = None
+
+                yield self._tag(frame)
+        finally:
+            stop.set()
+            # The grabber releases cap once its current read returns.
+            grabber.join(timeout=1.0)
+
 
 def demo_webcam(
     *,
@@ -99,6 +219,7 @@ def demo_webcam(
 
     - Downloads a YOLOv8-seg ONNX model (profile: fast/balanced/quality) on first run and caches it.
     - Requires OpenCV for webcam + preview.
+    - Frames stay BGR from capture to display; the detector swaps channels while letterboxing.
     """
 
     from .model_zoo import ensure_model, get_default_yolo_seg_specs
@@ -111,7 +232,13 @@ def demo_webcam(
     model_path = ensure_model(specs[profile])
     det = OnnxYoloSegDetector(str(model_path), backend=backend)
 
-    src = WebcamSource(device_id=device_id, width=width, height=height, convert_bgr_to_rgb=True)
+    src = WebcamSource(
+        device_id=device_id,
+        width=width,
+        height=height,
+        convert_bgr_to_rgb=False,
+        latest_only=True,
+    )
 
     run(
         source=src,
@@ -131,14 +258,15 @@ def _now_s() -> float:
 
 
 class _DummyCamera:
-    def __init__(self, size: tuple[int, int] = (480, 640)):
+    def __init__(self, size: tuple[int, int] = (480, 640), pool: Optional[BufferPool] = None):
         self.h, self.w = size
+        self.pool = pool if pool is not None else BufferPool()
 
     def __iter__(self):
         t0 = _now_s()
         while True:
             t = _now_s() - t0
-            yield generate_dummy_frame(self.h, self.w, t)
+            yield generate_dummy_frame(self.h, self.w, t, out=self.pool.get((self.h, self.w, 3)))
 
 
 class _NoopDetector:
@@ -146,6 +274,134 @@ class _NoopDetector:
         return []
 
 
+class _StageRunner:
+    """Runs the detector and depth stages for one frame, honouring their cadences.
+
+    A skipped stage reuses its latest output and reports it as stale. Detection and
+    depth keep separate state so the pipelined loop can drive them from two threads.
+    With a tracker, skipped detector frames get the tracker's extrapolated boxes
+    instead of the previous detections.
+    """
+
+    def __init__(
+        self,
+        detector: Detector,
+        depth: Optional[DepthEstimator],
+        detect_cadence: Optional[Cadence] = None,
+        depth_cadence: Optional[Cadence] = None,
+        motion_gate: Optional[MotionGate] = None,
+        tracker: Optional[SortTracker] = None,
+    ):
+        self.detector = detector
+        self.depth = depth
+        self.motion_gate = motion_gate
+        self.tracker = tracker
+        self.detect_cadence = detect_cadence or Cadence()
+        self.depth_cadence = depth_cadence or Cadence()
+
+        self._det_last_id: Optional[int] = None
+        self._det_last_t = 0.0
+        self._dets: list[Detection] = []
+
+        self._depth_last_id: Optional[int] = None
+        self._depth_last_t = 0.0
+        self._depth_map: Optional[np.ndarray] = None
+
+    def detect(self, frame: np.ndarray, frame_id: int) -> tuple[list[Detection], bool]:
+        now = _now_s()
+        due = self.detect_cadence.due(frame_id, now, self._det_last_id, self._det_last_t)
+        gate = self.motion_gate
+        if due and gate is not None and not gate.should_run(frame):
+            due = False
+        if not due:
+            if self.tracker is not None:
+                self._dets = self.tracker.predict()
+            return self._dets, False
+
+        self._dets = self.detector.predict(frame)
+        if self.tracker is not None:
+            self._dets = self.tracker.update(self._dets)
+        if gate is not None:
+            gate.commit()
+        self._det_last_id = frame_id
+        self._det_last_t = now
+        return self._dets, True
+
+    def estimate_depth(
+        self, frame: np.ndarray, dets: list[Detection], frame_id: int
+    ) -> tuple[Optional[np.ndarray], bool]:
+        if self.depth is None:
+            return None, False
+
+        now = _now_s()
+        if not self.depth_cadence.due(frame_id, now, self._depth_last_id, self._depth_last_t):
+            return self._depth_map, False
+
+        self._depth_map = self.depth.predict(frame, dets)
+        self._depth_last_id = frame_id
+        self._depth_last_t = now
+        return self._depth_map, True
+
+
+class _Preview:
+    """OpenCV preview window shared by the sequential and pipelined loops.
+
+    Frames are drawn by :func:`scanlt.render.render_result`; OpenCV only shows
+    them. Disabled (every call is a no-op) when OpenCV is not installed.
+    """
+
+    def __init__(
+        self,
+        window_name: str,
+        *,
+        show_depth: bool,
+        detector_hint: bool,
+        pool: Optional[BufferPool] = None,
+    ):
+        self.window_name = window_name
+        self.show_depth = show_depth
+        self.detector_hint = detector_hint
+        self._pool = pool if pool is not None else BufferPool()
+        # Carries the depth range across frames so the panel does not flicker.
+        self._depth_colorizer = DepthColorizer()
+
+        self._cv2 = None
+        try:
+            import cv2  # type: ignore
+
+            self._cv2 = cv2
+        except Exception:
+            self._cv2 = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._cv2 is not None
+
+    def show(self, res: Result) -> bool:
+        """Render one result. Returns False when the user asked to quit."""
+        if self._cv2 is None:
+            return True
+
+        vis = render_result(
+            res,
+            show_depth=self.show_depth,
+            detector_hint=self.detector_hint,
+            pool=self._pool,
+            depth_colorizer=self._depth_colorizer,
+        )
+        self._cv2.imshow(self.window_name, vis)
+        key = self._cv2.waitKey(1) & 0xFF
+        return key != ord("q")
+
+    def close(self) -> None:
+        if self._cv2 is None:
+            return
+        try:
+            self._cv2.destroyWindow(self.window_name)
+        except Exception:
+            pass
+
+
 def run(
     *,
     source: Optional[FrameSource] = None,
@@ -157,6 +413,14 @@ def run(
     show_preview: bool = True,
     window_name: str = "scanlt",
     show_depth: bool = False,
+    pipeline: bool = False,
+    queue_size: int = 2,
+    backpressure: str = "drop_oldest",
+    detect_cadence: Optional[Cadence] = None,
+    depth_cadence: Optional[Cadence] = None,
+    motion_gate: Optional[MotionGate] = None,
+    tracker: Optional[SortTracker] = None,
+    controller: Optional[AdaptiveController] = None,
 ) -> None:
     """Run the realtime loop.
 
@@ -164,93 +428,82 @@ def run(
     - If `source` is None, a dummy source is used (never fails).
     - If `detector` is None, a noop detector is used (no detections).
     - If `depth` is None, depth is disabled (no fake depth panel).
+    - If `pipeline` is True, capture, detection, depth and output run on separate
+      threads connected by bounded queues of `queue_size` frames. `backpressure`
+      selects what a full queue does: "drop_oldest", "drop_newest" or "block".
+      Results are always delivered in capture order.
+    - `detect_cadence` / `depth_cadence` decimate a stage, e.g.
+      `depth_cadence=Cadence(every=3)` or `Cadence(hz=10)`. Frames where a stage
+      is skipped reuse its latest output; `Result.detections_fresh` /
+      `Result.depth_fresh` tell whether the field was computed for this frame.
+    - `motion_gate` (a `scanlt.motion.MotionGate`) skips the detector while the
+      scene is static and reuses the previous detections.
+    - `tracker` (a `scanlt.tracking.SortTracker`) assigns `Detection.track_id` and
+      moves boxes along their predicted motion on frames where the detector is
+      skipped, instead of repeating the last detections.
+    - `controller` (a `scanlt.adaptive.AdaptiveController`) replaces `detector`
+      and switches model profile, input size and masks to keep the per-frame
+      latency within its budget (default: `1 / target_fps`). The sequential loop
+      reports the whole frame's processing time; the pipelined loop reports the
+      detection stage's time, since that stage bounds throughput.
     """
 
+    # Frames from the built-in source and the preview's scratch images are
+    # drawn from one pool, so the steady-state loop does not allocate them.
+    pool = BufferPool()
     if source is None:
-        source = _DummyCamera()
+        source = _DummyCamera(pool=pool)
+    if controller is not None:
+        if detector is not None and detector is not controller:
+            raise ValueError("Pass either detector or controller, not both")
+        controller.attach(target_fps)
+        detector = controller
     if detector is None:
         detector = _NoopDetector()
 
-    frame_interval = 1.0 / max(target_fps, 1e-6)
+    preview = None
+    if show_preview:
+        preview = _Preview(
+            window_name,
+            show_depth=show_depth,
+            detector_hint=isinstance(detector, _NoopDetector),
+            pool=pool,
+        )
+        if not preview.enabled:
+            preview = None
 
-    t_last = _now_s()
-    fps = 0.0
-    n = 0
+    stages = _StageRunner(detector, depth, detect_cadence, depth_cadence, motion_gate, tracker)
 
-    preview_cv2 = None
-    if show_preview:
-        try:
-            import cv2  # type: ignore
+    if pipeline:
+        from .pipeline import run_pipelined
 
-            preview_cv2 = cv2
-        except Exception:
-            preview_cv2 = None
-
-    def _overlay_mask_rgb(out: np.ndarray, mask01: np.ndarray, color: tuple[int, int, int]) -> None:
-        # out: RGB uint8
-        if mask01.dtype != np.float32:
-            m = mask01.astype(np.float32, copy=False)
-        else:
-            m = mask01
-        if m.max() > 1.0:
-            m = m / 255.0
-        m = np.clip(m, 0.0, 1.0)
-        if m.ndim == 3:
-            m = m[..., 0]
-
-        alpha = 0.45
-        for c, col in enumerate(color):
-            out[..., c] = (out[..., c] * (1.0 - alpha * m) + col * (alpha * m)).astype(np.uint8)
-
-    def _draw_detections_rgb(img: np.ndarray, detections: list[Detection]) -> np.ndarray:
-        if preview_cv2 is None:
-            return img
-
-        cv2 = preview_cv2
-        out = img.copy()
-        h, w = out.shape[:2]
-
-        # Show a clear hint if no detector configured
-        if detector is None or isinstance(detector, _NoopDetector):
-            cv2.putText(
-                out,
-                "No detector configured (pass detector=...)",
-                (10, 60),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.7,
-                (255, 255, 0),
-                2,
+        try:
+            run_pipelined(
+                source=source,
+                stages=stages,
+                on_result=on_result,
+                preview=preview,
+                target_fps=target_fps,
+                max_frames=max_frames,
+                queue_size=queue_size,
+                backpressure=backpressure,
+                controller=controller,
             )
+        finally:
+            if preview is not None:
+                preview.close()
+        return
 
-        for det in detections:
-            x1, y1, x2, y2 = det.xyxy
-            x1i = int(max(0, min(w - 1, x1)))
-            y1i = int(max(0, min(h - 1, y1)))
-            x2i = int(max(0, min(w - 1, x2)))
-            y2i = int(max(0, min(h - 1, y2)))
-
-            # If detector attached a mask
-            mask = det.mask
-            if mask is not None:
-                _overlay_mask_rgb(out, mask, (0, 255, 0))
-
-            cv2.rectangle(out, (x1i, y1i), (x2i, y2i), (0, 255, 0), 2)
-            label = f"{det.class_id}:{det.score:.2f}"
-            cv2.putText(
-                out,
-                label,
-                (x1i, max(0, y1i - 6)),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.5,
-                (0, 255, 0),
-                1,
-            )
-        return out
+    frame_interval = 1.0 / max(target_fps, 1e-6)
+
+    t_last = _now_s()
+    fps = 0.0
+    n = 0
 
     for frame in source:
         t0 = _now_s()
-        dets = detector.predict(frame) if detector is not None else []
-        depth_map = depth.predict(frame, dets) if depth is not None else None
+        dets, dets_fresh = stages.detect(frame, n)
+        depth_map, depth_fresh = stages.estimate_depth(frame, dets, n)
 
         t1 = _now_s()
         dt = max(t1 - t_last, 1e-9)
@@ -258,50 +511,33 @@ def run(
         fps = inst_fps if fps == 0.0 else (0.9 * fps + 0.1 * inst_fps)
         t_last = t1
 
-        res = Result(frame=frame, detections=dets, depth=depth_map, fps=fps)
+        res = Result(
+            frame=frame,
+            detections=dets,
+            depth=depth_map,
+            fps=fps,
+            frame_id=n,
+            detections_fresh=dets_fresh,
+            depth_fresh=depth_fresh,
+        )
         if on_result is not None:
             on_result(res)
 
-        if preview_cv2 is not None:
-            cv2 = preview_cv2
-            vis_rgb = _draw_detections_rgb(frame, dets)
-            cv2.putText(
-                vis_rgb,
-                f"FPS: {fps:.1f}",
-                (10, 30),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.8,
-                (255, 0, 0),
-                2,
-            )
-
-            panels = [rgb_to_bgr(vis_rgb)]
-
-            if show_depth and depth_map is not None:
-                d_u8 = normalize_depth_map(depth_map)
-                d_color = depth_to_colormap_jet(d_u8)
-                panels.append(d_color)
-
-            vis = panels[0] if len(panels) == 1 else cv2.hconcat(panels)
-
-            cv2.imshow(window_name, vis)
-            key = cv2.waitKey(1) & 0xFF
-            if key == ord("q"):
-                break
+        if preview is not None and not preview.show(res):
+            break
 
         n += 1
+        elapsed = _now_s() - t0
+        if controller is not None:
+            controller.observe(elapsed)
         if max_frames is not None and n >= max_frames:
             break
 
-        elapsed = _now_s() - t0
         sleep_s = frame_interval - elapsed
         if sleep_s > 0:
             import time
 
             time.sleep(sleep_s)
 
-    if preview_cv2 is not None:
-        try:
-            preview_cv2.destroyWindow(window_name)
-        except Exception:
-            pass
+    if preview is not None:
+        preview.close()
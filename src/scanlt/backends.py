@@ -1,8 +1,14 @@
 from __future__ import annotations
 
+import json
+import os
+import pathlib
+import sys
+import threading
 from dataclasses import dataclass
+from typing import Optional
 
-from .hw import get_hardware_info
+from .hw import HardwareInfo, get_hardware_info
 
 
 @dataclass(frozen=True)
@@ -11,7 +17,95 @@ class BackendChoice:
     reason: str
 
 
-def choose_backend(preferred: str = "auto") -> BackendChoice:
+_RUNTIMES = (None, "onnx", "torch")
+
+_memo: dict[tuple[str, Optional[str]], BackendChoice] = {}
+_memo_lock = threading.Lock()
+
+
+def _dist_version(dist: str) -> str:
+    """Installed version of a distribution, read from metadata (never imports it)."""
+    try:
+        from importlib.metadata import version
+
+        return version(dist)
+    except Exception:
+        return "-"
+
+
+def _probe_cache_key(preferred: str, runtime: Optional[str]) -> str:
+    # Any interpreter / runtime upgrade changes the key and invalidates old entries.
+    ort_versions = ",".join(
+        _dist_version(d)
+        for d in ("onnxruntime", "onnxruntime-gpu", "onnxruntime-directml", "onnxruntime-silicon")
+    )
+    parts = [
+        sys.executable,
+        sys.version.split()[0],
+        _dist_version("scanlt3d"),
+        ort_versions,
+        _dist_version("torch") if runtime != "onnx" else "-",
+        preferred,
+        runtime or "any",
+    ]
+    return "|".join(parts)
+
+
+def _probe_cache_file() -> pathlib.Path:
+    from .model_zoo import _default_cache_dir
+
+    return _default_cache_dir() / "backend_probe.json"
+
+
+def _load_persisted(key: str) -> Optional[BackendChoice]:
+    try:
+        with open(_probe_cache_file(), "r", encoding="utf-8") as f:
+            entry = json.load(f).get(key)
+        if entry is not None:
+            return BackendChoice(str(entry["name"]), str(entry["reason"]))
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        pass
+    return None
+
+
+def _store_persisted(key: str, choice: BackendChoice) -> None:
+    path = _probe_cache_file()
+    try:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if not isinstance(data, dict):
+                data = {}
+        except (OSError, ValueError):
+            data = {}
+        data[key] = {"name": choice.name, "reason": choice.reason}
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.part")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def clear_backend_cache(*, persisted: bool = False) -> None:
+    """Forget memoized probe results (and the on-disk cache with ``persisted=True``)."""
+    with _memo_lock:
+        _memo.clear()
+    if persisted:
+        try:
+            _probe_cache_file().unlink()
+        except OSError:
+            pass
+
+
+def choose_backend(
+    preferred: str = "auto",
+    *,
+    runtime: Optional[str] = None,
+    persist: Optional[bool] = None,
+) -> BackendChoice:
     """Pick best available backend by environment.
 
     This does NOT import heavyweight deps unless needed.
@@ -24,8 +118,18 @@ def choose_backend(preferred: str = "auto") -> BackendChoice:
     - coreml (not implemented yet; reserved)
 
     Users can override with env var SCANLT_BACKEND.
+
+    ``runtime`` limits probing to the runtime the caller will use: "onnx" never
+    imports torch, "torch" never imports onnxruntime; None probes both.
+
+    Results are memoized per process. With ``persist=True`` (or env var
+    SCANLT_BACKEND_CACHE=1) they are also stored in the cache directory, keyed by
+    interpreter and runtime versions, so later processes skip probing entirely.
     """
 
+    if runtime not in _RUNTIMES:
+        raise ValueError(f"Unknown runtime '{runtime}'. Choose one of: onnx, torch (or None)")
+
     hw = get_hardware_info()
     forced = (hw.env_force_backend or "").strip().lower() or None
     if forced is not None:
@@ -33,6 +137,35 @@ def choose_backend(preferred: str = "auto") -> BackendChoice:
 
     preferred = preferred.lower().strip()
 
+    memo_key = (preferred, runtime)
+    with _memo_lock:
+        cached = _memo.get(memo_key)
+    if cached is not None:
+        return cached
+
+    if persist is None:
+        persist = os.environ.get("SCANLT_BACKEND_CACHE", "").strip().lower() in {"1", "true", "yes"}
+
+    choice = None
+    key = ""
+    if persist:
+        key = _probe_cache_key(preferred, runtime)
+        choice = _load_persisted(key)
+
+    if choice is None:
+        choice = _probe(preferred, hw, runtime)
+        if persist:
+            _store_persisted(key, choice)
+
+    with _memo_lock:
+        _memo[memo_key] = choice
+    return choice
+
+
+def _probe(preferred: str, hw: HardwareInfo, runtime: Optional[str]) -> BackendChoice:
+    use_onnx = runtime in (None, "onnx")
+    use_torch = runtime in (None, "torch")
+
     if preferred not in {"auto", "cpu", "cuda", "dml", "mps", "coreml"}:
         return BackendChoice("cpu", f"unknown preferred backend '{preferred}', falling back to cpu")
 
@@ -40,7 +173,7 @@ def choose_backend(preferred: str = "auto") -> BackendChoice:
         return BackendChoice("cpu", "user selected cpu")
 
     # macOS Apple Silicon: MPS is the most realistic default for torch-based users.
-    if preferred in {"auto", "mps"} and hw.is_apple_silicon:
+    if use_torch and preferred in {"auto", "mps"} and hw.is_apple_silicon:
         try:
             import torch  # type: ignore
 
@@ -50,13 +183,16 @@ def choose_backend(preferred: str = "auto") -> BackendChoice:
             if preferred == "mps":
                 return BackendChoice("cpu", "torch MPS not available; falling back to cpu")
 
+    if preferred == "mps" and not use_torch:
+        return BackendChoice("cpu", f"mps requires torch (runtime={runtime}); falling back to cpu")
+
     # Windows DirectML: best shot for AMD/Intel GPUs without CUDA.
-    if preferred in {"auto", "dml"} and hw.is_windows:
+    if use_onnx and preferred in {"auto", "dml"} and hw.is_windows:
         try:
             import onnxruntime as ort  # type: ignore
 
             providers = [p.lower() for p in ort.get_available_providers()]
-            if any("directml" in p for p in providers):
+            if any("directml" in p or p.startswith("dml") for p in providers):
                 return BackendChoice("dml", "onnxruntime DirectML provider available")
         except Exception:
             if preferred == "dml":
@@ -65,24 +201,26 @@ def choose_backend(preferred: str = "auto") -> BackendChoice:
     # CUDA (NVIDIA)
     if preferred in {"auto", "cuda"}:
         # Try ORT CUDA EP first
-        try:
-            import onnxruntime as ort  # type: ignore
+        if use_onnx:
+            try:
+                import onnxruntime as ort  # type: ignore
 
-            providers = [p.lower() for p in ort.get_available_providers()]
-            if any("cuda" in p for p in providers):
-                return BackendChoice("cuda", "onnxruntime CUDA provider available")
-        except Exception:
-            pass
+                providers = [p.lower() for p in ort.get_available_providers()]
+                if any("cuda" in p for p in providers):
+                    return BackendChoice("cuda", "onnxruntime CUDA provider available")
+            except Exception:
+                pass
 
         # Then torch cuda
-        try:
-            import torch  # type: ignore
-
-            if torch.cuda.is_available():
-                return BackendChoice("cuda", "torch CUDA available")
-        except Exception:
-            if preferred == "cuda":
-                return BackendChoice("cpu", "CUDA not available; falling back to cpu")
+        if use_torch:
+            try:
+                import torch  # type: ignore
+
+                if torch.cuda.is_available():
+                    return BackendChoice("cuda", "torch CUDA available")
+            except Exception:
+                if preferred == "cuda":
+                    return BackendChoice("cpu", "CUDA not available; falling back to cpu")
 
     if preferred == "coreml":
         return BackendChoice("cpu", "coreml backend reserved (not implemented); falling back to cpu")
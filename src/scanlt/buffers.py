@@ -0,0 +1,89 @@
+"""Reusable frame buffers.
+
+Capture, colour conversion and preview each produce a full frame per call; at
+30 FPS over several cameras that is a steady stream of multi-megabyte
+allocations. :class:`BufferPool` keeps the arrays around and hands them out
+again once they are no longer used, so a steady-state loop allocates nothing.
+
+Buffers are never given back explicitly. The pool remembers every array it
+handed out and treats one as free again when the pool holds the only reference
+to it (CPython reference counting). A frame still held anywhere else — a
+pipeline queue, a ``Result`` kept by ``on_result``, a view into the frame — is
+therefore never overwritten; the pool just allocates another buffer.
+
+That test relies on CPython with the GIL: reference counts are exact and no
+other thread can take a reference while ``get`` checks one. On other
+interpreters and on free-threaded builds (where counts can be deferred or
+split per thread, and an undercount would hand out a frame still in use) the
+pool does not reuse anything and ``get`` simply allocates.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+from typing import Any, Sequence
+
+import numpy as np
+
+
+def _refcount(bufs: list[np.ndarray], i: int) -> int:
+    return sys.getrefcount(bufs[i])
+
+
+# References of a buffer only the pool knows about, measured the same way
+# get() measures them (the count differs between interpreter versions).
+_IDLE_REFS = _refcount([np.empty(0)], 0)
+
+# Whether reference counts can tell that a buffer is free (see module docstring).
+_CAN_REUSE = sys.implementation.name == "cpython" and (
+    not hasattr(sys, "_is_gil_enabled") or sys._is_gil_enabled()
+)
+
+
+class BufferPool:
+    """Arrays keyed by ``(shape, dtype)``, reused once nothing else refers to them.
+
+    ``get`` returns an uninitialized array (its previous contents, or garbage
+    for a new one); callers are expected to overwrite it entirely, e.g. by
+    passing it as ``out=`` to the ``scanlt._accel`` kernels. At most
+    ``max_per_key`` arrays are kept per key; beyond that ``get`` allocates
+    arrays the pool does not track. Thread-safe.
+
+    Reuse needs CPython with the GIL enabled; elsewhere ``reuse`` is False and
+    every ``get`` allocates a new array.
+    """
+
+    def __init__(self, max_per_key: int = 8):
+        self.max_per_key = max(1, int(max_per_key))
+        self._bufs: dict[tuple[tuple[int, ...], np.dtype], list[np.ndarray]] = {}
+        self._lock = threading.Lock()
+        # Number of arrays allocated so far; constant once the loop is warm.
+        self.allocations = 0
+        self.reuse = _CAN_REUSE
+
+    def get(self, shape: Sequence[int], dtype: Any = np.uint8) -> np.ndarray:
+        key = (tuple(int(d) for d in shape), np.dtype(dtype))
+        if not self.reuse:
+            with self._lock:
+                self.allocations += 1
+            return np.empty(key[0], dtype=key[1])
+        with self._lock:
+            bufs = self._bufs.setdefault(key, [])
+            for i in range(len(bufs)):
+                if _refcount(bufs, i) <= _IDLE_REFS:
+                    return bufs[i]
+            buf = np.empty(key[0], dtype=key[1])
+            self.allocations += 1
+            if len(bufs) < self.max_per_key:
+                bufs.append(buf)
+            return buf
+
+    def clear(self) -> None:
+        """Forget all pooled arrays (arrays still in use stay valid)."""
+        with self._lock:
+            self._bufs.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(b) for b in self._bufs.values())
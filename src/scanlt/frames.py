@@ -0,0 +1,76 @@
+"""Frames that know their channel order.
+
+OpenCV captures and displays BGR while models want RGB. Converting at the
+source and converting back for the preview costs two full-frame passes per
+frame spent only on channel order. Instead a source can tag its frames with
+:class:`Frame`, a plain ``ndarray`` subclass with a ``channel_order``
+attribute, and leave the pixels alone. Consumers read the order with
+:func:`channel_order` (untagged arrays are RGB, the library-wide default):
+the ONNX detector swaps channels inside its letterbox pass and the preview
+only converts frames that are not already BGR.
+
+Slices and views of a :class:`Frame` (e.g. tiles) keep the tag. That includes
+views that reverse the channel axis: ``frame[..., ::-1]`` of a BGR frame is
+still tagged "bgr" although its pixels are RGB, and so is an in-place
+:func:`~scanlt._accel.swap_rb_inplace`. Convert with :func:`to_rgb` /
+:func:`to_bgr`, which set the tag, or retag the result with :func:`as_frame`.
+``scanlt._accel.bgr_to_rgb`` / ``rgb_to_bgr`` return untagged (RGB by
+default) arrays.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+
+from ._accel import bgr_to_rgb, rgb_to_bgr
+
+RGB = "rgb"
+BGR = "bgr"
+_ORDERS = (RGB, BGR)
+
+
+class Frame(np.ndarray):
+    """(H, W, 3) uint8 image tagged with its ``channel_order`` ("rgb" or "bgr")."""
+
+    channel_order: str
+
+    def __array_finalize__(self, obj: Any) -> None:
+        self.channel_order = getattr(obj, "channel_order", RGB)
+
+    def __reduce__(self):
+        fn, args, state = super().__reduce__()
+        return fn, args, (state, self.channel_order)
+
+    def __setstate__(self, state: Any) -> None:
+        base, self.channel_order = state
+        super().__setstate__(base)
+
+
+def as_frame(image: np.ndarray, order: str) -> Frame:
+    """Tag ``image`` with a channel order (a view; no pixels are copied)."""
+    if order not in _ORDERS:
+        raise ValueError(f"Unknown channel order '{order}'. Choose one of: {', '.join(_ORDERS)}")
+    frame = image.view(Frame)
+    frame.channel_order = order
+    return frame
+
+
+def channel_order(image: np.ndarray) -> str:
+    """Channel order of ``image``: its tag, or "rgb" for untagged arrays."""
+    return getattr(image, "channel_order", RGB)
+
+
+def to_rgb(image: np.ndarray) -> np.ndarray:
+    """Return ``image`` in RGB order, converting (into a new array) only if needed."""
+    if channel_order(image) == RGB:
+        return image
+    return as_frame(bgr_to_rgb(np.asarray(image)), RGB)
+
+
+def to_bgr(image: np.ndarray) -> np.ndarray:
+    """Return ``image`` in BGR order, converting (into a new array) only if needed."""
+    if channel_order(image) == BGR:
+        return image
+    return as_frame(rgb_to_bgr(np.asarray(image)), BGR)
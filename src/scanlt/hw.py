@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import functools
 import os
 import platform
 from dataclasses import dataclass
@@ -17,10 +18,14 @@ class HardwareInfo:
     env_force_backend: str | None
 
 
+@functools.lru_cache(maxsize=1)
+def _platform_ids() -> tuple[str, str, str]:
+    # platform.processor() may shell out (uname -p); the values never change in-process.
+    return platform.system().lower(), platform.machine().lower(), platform.processor().lower()
+
+
 def get_hardware_info() -> HardwareInfo:
-    sysname = platform.system().lower()
-    machine = platform.machine().lower()
-    processor = platform.processor().lower()
+    sysname, machine, processor = _platform_ids()
 
     is_mac = sysname == "darwin"
     is_windows = sysname == "windows"
@@ -0,0 +1,172 @@
+"""Compact, lazily materialized instance masks.
+
+Detectors attach an :class:`InstanceMask` to each ``Detection``. The mask only
+covers the detection box and is stored as ``uint8`` (0/1). When it comes from a
+segmentation prototype it is not computed at all until a consumer reads it, so
+pipelines that only use boxes never pay for the prototype matmul or resampling.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+
+from ._accel import resize
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+class _ProtoSource:
+    """Everything needed to render one YOLO-seg mask inside its box.
+
+    ``proto`` is shared by all detections of a frame; only the coefficient
+    vector is per detection.
+    """
+
+    __slots__ = ("coeffs", "proto", "r", "dw", "dh", "in_h", "in_w", "ox", "oy")
+
+    def __init__(
+        self,
+        coeffs: np.ndarray,
+        proto: np.ndarray,
+        r: float,
+        dw: float,
+        dh: float,
+        in_h: int,
+        in_w: int,
+        ox: int = 0,
+        oy: int = 0,
+    ):
+        self.coeffs = coeffs
+        self.proto = proto
+        self.r = r
+        self.dw = dw
+        self.dh = dh
+        self.in_h = in_h
+        self.in_w = in_w
+        # Position of the detector's input frame inside the frame masks refer to.
+        self.ox = ox
+        self.oy = oy
+
+    def moved(self, dx: int, dy: int) -> "_ProtoSource":
+        return _ProtoSource(
+            self.coeffs, self.proto, self.r, self.dw, self.dh, self.in_h, self.in_w,
+            self.ox + dx, self.oy + dy,
+        )
+
+    def render(self, box: tuple[int, int, int, int]) -> np.ndarray:
+        x0, y0, x1, y1 = box
+        nm, hp, wp = self.proto.shape
+        sy = hp / self.in_h
+        sx = wp / self.in_w
+
+        # Box edges and pixel centres in proto coordinates.
+        top = ((y0 - self.oy) * self.r + self.dh) * sy
+        bottom = ((y1 - self.oy) * self.r + self.dh) * sy
+        left = ((x0 - self.ox) * self.r + self.dw) * sx
+        right = ((x1 - self.ox) * self.r + self.dw) * sx
+        cy0, cy1 = top + 0.5 * self.r * sy - 0.5, bottom - 0.5 * self.r * sy - 0.5
+        cx0, cx1 = left + 0.5 * self.r * sx - 0.5, right - 0.5 * self.r * sx - 0.5
+
+        # Only the proto window under the box (plus one tap of margin) is evaluated.
+        py0 = int(max(0, np.floor(cy0)))
+        py1 = int(min(hp, np.floor(cy1) + 2))
+        px0 = int(max(0, np.floor(cx0)))
+        px1 = int(min(wp, np.floor(cx1) + 2))
+        if py1 <= py0 or px1 <= px0:
+            return np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+
+        win = self.proto[:, py0:py1, px0:px1]
+        m = _sigmoid(self.coeffs @ win.reshape(nm, -1)).reshape(py1 - py0, px1 - px0)
+
+        # Bilinear upsampling of the window onto the box's pixels.
+        roi = (top - py0, left - px0, bottom - py0, right - px0)
+        prob = resize(m.astype(np.float32, copy=False), y1 - y0, x1 - x0, roi=roi)
+        return (prob > 0.5).astype(np.uint8)
+
+
+class InstanceMask:
+    """Binary instance mask stored relative to its detection box.
+
+    - ``box``: ``(x0, y0, x1, y1)`` integer pixel bounds in the frame (end exclusive).
+    - ``data``: ``(y1 - y0, x1 - x0)`` uint8 array of 0/1, computed on first access.
+    - ``to_full()`` / ``np.asarray(mask)`` materialize a full-frame ``(H, W)`` uint8 mask.
+    """
+
+    __slots__ = ("box", "frame_shape", "_data", "_source")
+
+    def __init__(
+        self,
+        box: tuple[int, int, int, int],
+        frame_shape: tuple[int, int],
+        data: Optional[np.ndarray] = None,
+        *,
+        source: Optional[_ProtoSource] = None,
+    ):
+        if data is None and source is None:
+            raise ValueError("InstanceMask needs either data or a source to render from")
+        self.box = box
+        self.frame_shape = frame_shape
+        self._data = data
+        self._source = source
+
+    @property
+    def data(self) -> np.ndarray:
+        if self._data is None:
+            assert self._source is not None
+            self._data = self._source.render(self.box)
+            self._source = None
+        return self._data
+
+    @property
+    def is_materialized(self) -> bool:
+        return self._data is not None
+
+    def to_full(self) -> np.ndarray:
+        """Return the mask pasted into a zeroed ``(H, W)`` uint8 frame."""
+        h, w = self.frame_shape
+        full = np.zeros((h, w), dtype=np.uint8)
+        x0, y0, x1, y1 = self.box
+        full[y0:y1, x0:x1] = self.data
+        return full
+
+    def translated(self, dx: int, dy: int) -> "InstanceMask":
+        """Return a copy moved by ``(dx, dy)`` pixels, cropped to the frame."""
+        h, w = self.frame_shape
+        x0, y0, x1, y1 = self.box
+        nx0, ny0 = max(0, min(w, x0 + dx)), max(0, min(h, y0 + dy))
+        nx1, ny1 = max(nx0, min(w, x1 + dx)), max(ny0, min(h, y1 + dy))
+        data = self.data[ny0 - (y0 + dy) : ny1 - (y0 + dy), nx0 - (x0 + dx) : nx1 - (x0 + dx)]
+        return InstanceMask((nx0, ny0, nx1, ny1), self.frame_shape, data)
+
+    def moved(self, dx: int, dy: int, frame_shape: tuple[int, int]) -> "InstanceMask":
+        """Return the same mask placed at ``(dx, dy)`` inside a larger frame.
+
+        Used to map masks from a crop (e.g. an inference tile) back into the full
+        frame; a lazy mask stays lazy.
+        """
+        x0, y0, x1, y1 = self.box
+        box = (x0 + dx, y0 + dy, x1 + dx, y1 + dy)
+        if self._data is None:
+            assert self._source is not None
+            return InstanceMask(box, frame_shape, source=self._source.moved(dx, dy))
+        return InstanceMask(box, frame_shape, self._data)
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        full = self.to_full()
+        return full if dtype is None else full.astype(dtype, copy=False)
+
+    def __getstate__(self):
+        # Pickled masks are always materialized so the shared prototype is not copied.
+        return (self.box, self.frame_shape, self.data)
+
+    def __setstate__(self, state) -> None:
+        self.box, self.frame_shape, self._data = state
+        self._source = None
+
+    def __repr__(self) -> str:
+        state = "materialized" if self.is_materialized else "lazy"
+        return f"InstanceMask(box={self.box}, frame_shape={self.frame_shape}, {state})"
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import hashlib
+import json
 import os
 import pathlib
 import urllib.request
@@ -31,7 +32,85 @@ def _sha256_file(path: pathlib.Path) -> str:
     return h.hexdigest()
 
 
-def _download(url: str, dst: pathlib.Path) -> None:
+def _stamp_path(path: pathlib.Path, stamp_dir: Optional[pathlib.Path] = None) -> pathlib.Path:
+    if stamp_dir is None:
+        return path.with_name(path.name + ".verified.json")
+    # Outside the file's directory: key by the resolved path so names don't collide.
+    key = hashlib.sha256(str(path.resolve()).encode()).hexdigest()[:16]
+    return stamp_dir / f"{path.name}-{key}.verified.json"
+
+
+def _file_identity(path: pathlib.Path) -> dict[str, int]:
+    st = path.stat()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "inode": st.st_ino}
+
+
+def _read_stamp(path: pathlib.Path, stamp_dir: Optional[pathlib.Path] = None) -> Optional[str]:
+    """Return the stamped sha256 if the file is unchanged since it was verified."""
+    try:
+        stamp = json.loads(_stamp_path(path, stamp_dir).read_text())
+        if {k: stamp.get(k) for k in ("size", "mtime_ns", "inode")} == _file_identity(path):
+            return str(stamp["sha256"])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+def _write_stamp(
+    path: pathlib.Path, sha256: str, stamp_dir: Optional[pathlib.Path] = None
+) -> None:
+    stamp = dict(_file_identity(path), sha256=sha256)
+    try:
+        dst = _stamp_path(path, stamp_dir)
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dst.with_suffix(".part")
+        tmp.write_text(json.dumps(stamp))
+        tmp.replace(dst)
+    except OSError:
+        pass
+
+
+def _remove(path: pathlib.Path) -> None:
+    for p in (path, _stamp_path(path)):
+        try:
+            p.unlink()
+        except Exception:
+            pass
+
+
+def file_sha256(
+    path: str | os.PathLike[str],
+    *,
+    verify: str = "fast",
+    stamp_dir: str | os.PathLike[str] | None = None,
+) -> str:
+    """sha256 of a file, trusted from its verification stamp when unchanged.
+
+    ``verify="fast"`` reuses the sidecar stamp (size, mtime, inode, hash) and
+    only rehashes when the file changed; ``verify="full"`` always rehashes.
+    The stamp sits next to the file unless ``stamp_dir`` is given; pass one for
+    files scanlt does not own, so nothing is written beside them.
+    """
+    if verify not in ("fast", "full"):
+        raise ValueError(f"Unknown verify mode '{verify}'. Choose one of: fast, full")
+
+    p = pathlib.Path(path)
+    sd = pathlib.Path(stamp_dir) if stamp_dir is not None else None
+    if verify == "fast":
+        got = _read_stamp(p, sd)
+        if got is not None:
+            return got
+
+    got = _sha256_file(p)
+    _write_stamp(p, got, sd)
+    return got
+
+
+def _download(url: str, dst: pathlib.Path) -> str:
+    """Download ``url`` to ``dst`` (resuming a partial download). Returns the sha256.
+
+    The hash is updated while streaming, so the file is never re-read afterwards.
+    """
     dst.parent.mkdir(parents=True, exist_ok=True)
     tmp = dst.with_suffix(dst.suffix + ".part")
 
@@ -39,36 +118,59 @@ def _download(url: str, dst: pathlib.Path) -> None:
     if tmp.exists():
         headers["Range"] = f"bytes={tmp.stat().st_size}-"
 
+    h = hashlib.sha256()
     req = urllib.request.Request(url, headers=headers)
     with urllib.request.urlopen(req) as r:
-        mode = "ab" if headers else "wb"
+        # Servers that ignore Range answer 200 with the full body: start over.
+        resume = bool(headers) and getattr(r, "status", None) == 206
+        if resume:
+            with tmp.open("rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    h.update(chunk)
+
+        mode = "ab" if resume else "wb"
         with tmp.open(mode) as f:
             while True:
                 chunk = r.read(1024 * 256)
                 if not chunk:
                     break
+                h.update(chunk)
                 f.write(chunk)
 
     tmp.replace(dst)
+    return h.hexdigest()
 
 
-def ensure_model(spec: ModelSpec, *, cache_dir: Optional[str | os.PathLike[str]] = None) -> pathlib.Path:
+def ensure_model(
+    spec: ModelSpec,
+    *,
+    cache_dir: Optional[str | os.PathLike[str]] = None,
+    verify: str = "fast",
+) -> pathlib.Path:
+    """Return the cached model path, downloading and verifying it if needed.
+
+    ``verify="fast"`` trusts an unchanged cached file via its verification stamp;
+    ``verify="full"`` rehashes the whole file.
+    """
+    if verify not in ("fast", "full"):
+        raise ValueError(f"Unknown verify mode '{verify}'. Choose one of: fast, full")
+
     cache = pathlib.Path(cache_dir) if cache_dir is not None else _default_cache_dir()
     path = cache / "models" / spec.filename
 
     if path.exists():
-        got = _sha256_file(path)
-        if got.lower() == spec.sha256.lower() and spec.sha256:
+        if not spec.sha256:
+            # No checksum to compare against: a completed download is trusted as-is.
             return path
-        try:
-            path.unlink()
-        except Exception:
-            pass
+        got = file_sha256(path, verify=verify)
+        if got.lower() == spec.sha256.lower():
+            return path
+        _remove(path)
 
-    _download(spec.url, path)
+    got = _download(spec.url, path)
+    _write_stamp(path, got)
 
     if spec.sha256:
-        got = _sha256_file(path)
         if got.lower() != spec.sha256.lower():
             raise RuntimeError(
                 f"Downloaded model checksum mismatch for {spec.name}. Expected {spec.sha256}, got {got}"
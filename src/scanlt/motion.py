@@ -0,0 +1,84 @@
+"""Cheap change detection used to skip the detector on static scenes."""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+
+from ._accel import downsample_luma, luma_sad
+
+
+class MotionGate:
+    """Decides whether a frame changed enough since the last detector run.
+
+    The frame is reduced to a small luma image (``factor``x downsampled) and
+    compared with the luma of the frame the detector last ran on:
+
+    - ``threshold``: mean absolute difference (0-255 levels) over the whole image.
+    - ``tile`` / ``tile_threshold``: per-tile mean absolute difference, so a small
+      moving object in a large static scene still triggers a refresh.
+    - ``refresh_every``: force a detector run after this many skipped frames.
+
+    ``last_score`` and ``last_tiles`` expose the most recent measurements.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 2.0,
+        *,
+        factor: int = 4,
+        tile: int = 8,
+        tile_threshold: Optional[float] = 12.0,
+        refresh_every: int = 30,
+    ):
+        self.threshold = threshold
+        self.factor = factor
+        self.tile = tile if tile_threshold is not None else 0
+        self.tile_threshold = tile_threshold
+        self.refresh_every = refresh_every
+
+        self.last_score = 0.0
+        self.last_tiles: Optional[np.ndarray] = None
+        self.skipped = 0
+
+        self._reference: Optional[np.ndarray] = None
+        self._pending: Optional[np.ndarray] = None
+
+    def should_run(self, frame: np.ndarray) -> bool:
+        """Return True if the detector should run on ``frame``.
+
+        Call :meth:`commit` once the detector actually ran so this frame becomes
+        the new reference.
+        """
+        luma = downsample_luma(frame, self.factor)
+        self._pending = luma
+
+        ref = self._reference
+        if ref is None or ref.shape != luma.shape:
+            return True
+        if self.refresh_every > 0 and self.skipped >= self.refresh_every:
+            return True
+
+        score, tiles = luma_sad(luma, ref, self.tile)
+        self.last_score = score
+        self.last_tiles = tiles if tiles.size else None
+
+        if score >= self.threshold:
+            return True
+        if self.tile_threshold is not None and tiles.size and float(tiles.max()) >= self.tile_threshold:
+            return True
+
+        self.skipped += 1
+        return False
+
+    def commit(self) -> None:
+        """Mark the last frame passed to :meth:`should_run` as the new reference."""
+        if self._pending is not None:
+            self._reference = self._pending
+        self.skipped = 0
+
+    def reset(self) -> None:
+        self._reference = None
+        self._pending = None
+        self.skipped = 0
@@ -0,0 +1,236 @@
+"""Serve many frame sources from one detector.
+
+:func:`run_many` gives every source its own capture thread with a one-frame
+slot and runs a single scheduler on the calling thread. The scheduler collects
+ready frames round-robin into micro-batches, runs them through the shared
+detector (one ``predict_batch`` call when the detector has it), and delivers
+one :class:`~scanlt.api.Result` per frame tagged with its ``source_id``.
+
+Fairness: a batch holds at most one frame per source, and sources are visited
+starting after the last one served, so a fast camera cannot starve the others.
+Per-source FPS caps delay a source until its next frame is due.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Iterator, Mapping, Optional, Sequence
+
+import numpy as np
+
+from .api import (
+    DepthEstimator,
+    Detection,
+    Detector,
+    FrameSource,
+    Result,
+    _NoopDetector,
+    _now_s,
+)
+from .pipeline import _Stage
+
+_BACKPRESSURE = ("drop_oldest", "block")
+
+
+class _SourceSlot:
+    """One-frame hand-off between a source's capture thread and the scheduler."""
+
+    def __init__(self, source_id: Any, source: FrameSource, fps_cap: Optional[float]):
+        self.source_id = source_id
+        self.source = source
+        self.interval = 1.0 / fps_cap if fps_cap else 0.0
+
+        self.frame: Optional[np.ndarray] = None
+        self.frame_id = 0
+        self.captured = 0
+        self.done = False
+        self.dropped = 0
+
+        self.next_due = 0.0
+        self.fps = 0.0
+        self.t_last: Optional[float] = None
+
+    @property
+    def live(self) -> bool:
+        return self.frame is not None or not self.done
+
+
+def _per_source(value: Any, ids: list[Any], name: str) -> list[Optional[float]]:
+    if value is None or isinstance(value, (int, float)):
+        return [value] * len(ids)
+    if isinstance(value, Mapping):
+        return [value.get(i) for i in ids]
+    value = list(value)
+    if len(value) != len(ids):
+        raise ValueError(f"{name} has {len(value)} entries for {len(ids)} sources")
+    return value
+
+
+def run_many(
+    sources: Sequence[FrameSource] | Mapping[Any, FrameSource],
+    detector: Optional[Detector] = None,
+    *,
+    depth: Optional[DepthEstimator] = None,
+    on_result: Optional[Callable[[Result], None]] = None,
+    fps_cap: Optional[float | Sequence[Optional[float]] | Mapping[Any, float]] = None,
+    max_batch: int = 8,
+    max_wait_ms: float = 5.0,
+    backpressure: str = "drop_oldest",
+    max_frames: Optional[int] = None,
+) -> None:
+    """Run one shared detector (and optional depth estimator) over many sources.
+
+    Notes:
+    - `sources` is a list (source ids are the indices) or a mapping of
+      source id -> source. `Result.source_id` tells where a result came from;
+      `Result.frame_id` counts frames per source.
+    - `fps_cap` limits how often each source is processed: one value for all,
+      a list matching `sources`, or a mapping by source id.
+    - Up to `max_batch` frames (at most one per source) are inferred together.
+      The scheduler waits at most `max_wait_ms` for a batch to fill.
+    - `backpressure="drop_oldest"` keeps only each source's newest frame (live
+      cameras); `"block"` makes the capture thread wait instead (video files).
+    - Results are delivered on the calling thread; there is no preview window.
+    """
+    if backpressure not in _BACKPRESSURE:
+        raise ValueError(
+            f"Unknown backpressure '{backpressure}'. Choose one of: {', '.join(_BACKPRESSURE)}"
+        )
+    if isinstance(sources, Mapping):
+        ids = list(sources.keys())
+        srcs = list(sources.values())
+    else:
+        srcs = list(sources)
+        ids = list(range(len(srcs)))
+    if not srcs:
+        raise ValueError("run_many needs at least one source")
+    if detector is None:
+        detector = _NoopDetector()
+
+    caps = _per_source(fps_cap, ids, "fps_cap")
+    slots = [_SourceSlot(i, s, c) for i, s, c in zip(ids, srcs, caps)]
+    max_batch = max(1, int(max_batch))
+    max_wait_s = max(0.0, max_wait_ms / 1000.0)
+    block = backpressure == "block"
+
+    stop = threading.Event()
+    errors: list[BaseException] = []
+    cond = threading.Condition()
+
+    def _capture(slot: _SourceSlot) -> Callable[[], None]:
+        def target() -> None:
+            it: Iterator[np.ndarray] = iter(slot.source)
+            try:
+                while not stop.is_set():
+                    try:
+                        frame = next(it)
+                    except StopIteration:
+                        break
+                    with cond:
+                        while block and slot.frame is not None and not stop.is_set():
+                            cond.wait(0.05)
+                        if slot.frame is not None:
+                            slot.dropped += 1
+                        slot.frame = frame
+                        slot.frame_id = slot.captured
+                        slot.captured += 1
+                        cond.notify_all()
+            finally:
+                with cond:
+                    slot.done = True
+                    cond.notify_all()
+                close = getattr(it, "close", None)
+                if close is not None:
+                    close()
+
+        return target
+
+    workers = [
+        _Stage(f"scanlt-capture-{k}", _capture(slot), errors, stop) for k, slot in enumerate(slots)
+    ]
+    for w in workers:
+        w.start()
+
+    predict_batch = getattr(detector, "predict_batch", None)
+    rr = 0
+    n = 0
+    try:
+        while not stop.is_set():
+            # --- pick a micro-batch ------------------------------------------------
+            batch: list[tuple[_SourceSlot, np.ndarray, int]] = []
+            with cond:
+                first_ready: Optional[float] = None
+                while not stop.is_set():
+                    now = _now_s()
+                    order = slots[rr:] + slots[:rr]
+                    ready = [s for s in order if s.frame is not None and now >= s.next_due]
+                    live = sum(1 for s in slots if s.live)
+                    if live == 0:
+                        break
+                    if ready:
+                        if first_ready is None:
+                            first_ready = now
+                        deadline = first_ready + max_wait_s
+                        # Capped sources not due before the deadline cannot join this batch.
+                        due_soon = sum(1 for s in slots if s.live and s.next_due <= deadline)
+                        if len(ready) >= min(max_batch, due_soon) or now >= deadline:
+                            break
+                        timeout = deadline - now
+                    else:
+                        due = [s.next_due - now for s in slots if s.frame is not None]
+                        timeout = min(due) if due else 0.05
+                    cond.wait(max(timeout, 1e-4))
+                else:
+                    break
+                if not ready:
+                    break
+
+                for s in ready[:max_batch]:
+                    batch.append((s, s.frame, s.frame_id))
+                    s.frame = None
+                    s.next_due = now + s.interval
+                cond.notify_all()
+            rr = (slots.index(batch[-1][0]) + 1) % len(slots)
+
+            # --- infer ---------------------------------------------------------------
+            frames = [f for _, f, _ in batch]
+            if predict_batch is not None and len(frames) > 1:
+                dets_list: list[list[Detection]] = predict_batch(frames)
+            else:
+                dets_list = [detector.predict(f) for f in frames]
+
+            # --- deliver -------------------------------------------------------------
+            for (slot, frame, frame_id), dets in zip(batch, dets_list):
+                depth_map = depth.predict(frame, dets) if depth is not None else None
+
+                t1 = _now_s()
+                if slot.t_last is not None:
+                    inst_fps = 1.0 / max(t1 - slot.t_last, 1e-9)
+                    slot.fps = inst_fps if slot.fps == 0.0 else (0.9 * slot.fps + 0.1 * inst_fps)
+                slot.t_last = t1
+
+                res = Result(
+                    frame=frame,
+                    detections=dets,
+                    depth=depth_map,
+                    fps=slot.fps,
+                    frame_id=frame_id,
+                    depth_fresh=depth is not None,
+                    source_id=slot.source_id,
+                )
+                if on_result is not None:
+                    on_result(res)
+
+                n += 1
+                if max_frames is not None and n >= max_frames:
+                    stop.set()
+                    break
+    finally:
+        stop.set()
+        with cond:
+            cond.notify_all()
+        for w in workers:
+            w.join(timeout=1.0)
+
+    if errors:
+        raise errors[0]
@@ -0,0 +1,281 @@
+"""Fan one capture source out to several inference processes.
+
+Threads cannot run the NumPy-heavy decode/NMS/mask work of a detector in
+parallel (the GIL), and sending frames to a process pool pickles megabytes per
+frame. :func:`run_multiprocess` instead copies each frame once into a
+:class:`FrameRing`, a ``multiprocessing.shared_memory`` block of fixed-size
+frame slots. Only ``(sequence number, slot)`` pairs travel to the worker
+processes, each of which runs its own detector. Workers send back compact
+results (detections with box-relative masks), and the calling process puts them
+back in capture order before handing them to ``on_result``.
+"""
+
+from __future__ import annotations
+
+import heapq
+import multiprocessing as mp
+import queue
+import threading
+import traceback
+from multiprocessing import shared_memory
+from typing import Any, Callable, Iterator, Optional
+
+import numpy as np
+
+from .api import Detection, Detector, FrameSource, Result, _now_s
+from .frames import as_frame, channel_order
+
+
+class FrameRing:
+    """Fixed number of same-shape uint8 frame slots in shared memory.
+
+    Each slot has a sequence number next to it. The writer stores the frame
+    first and then the number; a reader checks the number it was handed.
+    Slot ownership (which process may touch a slot) is managed by the caller.
+    """
+
+    def __init__(
+        self,
+        slots: int,
+        frame_shape: tuple[int, ...],
+        *,
+        name: Optional[str] = None,
+        create: bool = True,
+    ):
+        self.slots = int(slots)
+        self.frame_shape = tuple(int(d) for d in frame_shape)
+        self.frame_bytes = int(np.prod(self.frame_shape))
+        header = 8 * self.slots
+        size = header + self.slots * self.frame_bytes
+        self._shm = shared_memory.SharedMemory(name=name, create=create, size=size if create else 0)
+        self._owner = create
+        self.seq = np.ndarray((self.slots,), dtype=np.int64, buffer=self._shm.buf[:header])
+        self._frames = np.ndarray(
+            (self.slots, *self.frame_shape), dtype=np.uint8, buffer=self._shm.buf[header:size]
+        )
+        if create:
+            self.seq[:] = -1
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def write(self, slot: int, frame: np.ndarray, seq: int) -> None:
+        np.copyto(self._frames[slot], frame)
+        self.seq[slot] = seq
+
+    def view(self, slot: int) -> np.ndarray:
+        """Zero-copy view of a slot; only valid while the caller owns the slot."""
+        return self._frames[slot]
+
+    def close(self) -> None:
+        # Views must go before the mapping can be closed.
+        self.seq = None  # type: ignore[assignment]
+        self._frames = None  # type: ignore[assignment]
+        self._shm.close()
+        if self._owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _worker_main(
+    ring_name: str,
+    slots: int,
+    frame_shape: tuple[int, ...],
+    order: str,
+    factory: Callable[[], Detector],
+    tasks: Any,
+    results: Any,
+) -> None:
+    ring = FrameRing(slots, frame_shape, name=ring_name, create=False)
+    try:
+        detector = factory()
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            seq, slot = task
+            if ring.seq[slot] != seq:
+                results.put(("stale", seq, slot, None))
+                continue
+            # The ring stores bare pixels; restore the source's channel-order tag.
+            dets = detector.predict(as_frame(ring.view(slot), order))
+            # Pickling materializes lazy masks, so only box-sized masks cross processes.
+            results.put(("ok", seq, slot, dets))
+    except BaseException:  # noqa: BLE001 - reported to the parent
+        results.put(("error", -1, -1, traceback.format_exc()))
+    finally:
+        ring.close()
+
+
+def run_multiprocess(
+    *,
+    source: FrameSource,
+    detector_factory: Callable[[], Detector],
+    workers: int = 4,
+    on_result: Optional[Callable[[Result], None]] = None,
+    slots: Optional[int] = None,
+    backpressure: str = "block",
+    max_frames: Optional[int] = None,
+    start_method: str = "spawn",
+) -> None:
+    """Run ``workers`` detector processes over one source.
+
+    Notes:
+    - `detector_factory` is called once in every worker process and must be
+      picklable (a module-level function or `functools.partial`), e.g.
+      `partial(OnnxYoloSegDetector, path, config=cfg)`. Give each session a
+      share of the cores (`SessionConfig(intra_op_threads=...)`) rather than
+      all of them.
+    - Frames must all have the shape and channel order of the first frame (the
+      ring slots are fixed-size). `slots` defaults to twice the number of workers.
+    - `backpressure="block"` makes capture wait for a free slot (no drops);
+      `"drop_newest"` discards frames while every slot is busy.
+    - Results are delivered on the calling thread in capture order.
+    """
+    if backpressure not in ("block", "drop_newest"):
+        raise ValueError(
+            f"Unknown backpressure '{backpressure}'. Choose one of: block, drop_newest"
+        )
+    workers = max(1, int(workers))
+    n_slots = max(workers, int(slots) if slots is not None else 2 * workers)
+
+    it: Iterator[np.ndarray] = iter(source)
+    try:
+        first = next(it)
+    except StopIteration:
+        return
+
+    ctx = mp.get_context(start_method)
+    ring = FrameRing(n_slots, first.shape)
+    tasks = ctx.Queue()
+    results = ctx.Queue()
+    procs = [
+        ctx.Process(
+            target=_worker_main,
+            args=(
+                ring.name,
+                n_slots,
+                ring.frame_shape,
+                channel_order(first),
+                detector_factory,
+                tasks,
+                results,
+            ),
+            name=f"scanlt-worker-{k}",
+            daemon=True,
+        )
+        for k in range(workers)
+    ]
+    for p in procs:
+        p.start()
+
+    stop = threading.Event()
+    errors: list[BaseException] = []
+    free: queue.Queue[int] = queue.Queue()
+    for k in range(n_slots):
+        free.put(k)
+    # Frames by sequence number until their result is delivered (the capture
+    # side keeps the original array, so delivery needs no copy from the ring).
+    pending: dict[int, np.ndarray] = {}
+    lock = threading.Lock()
+    captured = [0]
+    capture_done = threading.Event()
+
+    def _capture() -> None:
+        frame: Optional[np.ndarray] = first
+        seq = 0
+        try:
+            while frame is not None and not stop.is_set():
+                if frame.shape != ring.frame_shape:
+                    raise ValueError(
+                        f"Frame shape changed from {ring.frame_shape} to {frame.shape}; "
+                        "run_multiprocess needs fixed-size frames"
+                    )
+                slot = None
+                while slot is None and not stop.is_set():
+                    try:
+                        if backpressure == "block":
+                            slot = free.get(timeout=0.05)
+                        else:
+                            slot = free.get_nowait()
+                    except queue.Empty:
+                        if backpressure != "block":
+                            break
+                if slot is not None:
+                    ring.write(slot, frame, seq)
+                    with lock:
+                        pending[seq] = frame
+                    tasks.put((seq, slot))
+                    seq += 1
+                    captured[0] = seq
+                if max_frames is not None and seq >= max_frames:
+                    break
+                frame = next(it, None)
+        except BaseException as e:  # noqa: BLE001 - re-raised on the calling thread
+            errors.append(e)
+            stop.set()
+        finally:
+            capture_done.set()
+            close = getattr(it, "close", None)
+            if close is not None:
+                close()
+
+    capture = threading.Thread(target=_capture, name="scanlt-capture", daemon=True)
+    capture.start()
+
+    heap: list[tuple[int, list[Detection]]] = []
+    next_seq = 0
+    t_last = _now_s()
+    fps = 0.0
+    try:
+        while not stop.is_set():
+            if capture_done.is_set() and next_seq >= captured[0]:
+                break
+            try:
+                kind, seq, slot, payload = results.get(timeout=0.1)
+            except queue.Empty:
+                if not all(p.is_alive() for p in procs):
+                    raise RuntimeError("A scanlt worker process exited unexpectedly")
+                continue
+            if kind == "error":
+                raise RuntimeError(f"scanlt worker failed:\n{payload}")
+            free.put(slot)
+            heapq.heappush(heap, (seq, payload if kind == "ok" else []))
+
+            while heap and heap[0][0] == next_seq:
+                seq, dets = heapq.heappop(heap)
+                with lock:
+                    frame = pending.pop(seq)
+                next_seq += 1
+
+                t1 = _now_s()
+                inst_fps = 1.0 / max(t1 - t_last, 1e-9)
+                fps = inst_fps if fps == 0.0 else (0.9 * fps + 0.1 * inst_fps)
+                t_last = t1
+
+                res = Result(
+                    frame=frame,
+                    detections=dets,
+                    depth=None,
+                    fps=fps,
+                    frame_id=seq,
+                    depth_fresh=False,
+                )
+                if on_result is not None:
+                    on_result(res)
+    finally:
+        stop.set()
+        capture.join(timeout=1.0)
+        for _ in procs:
+            tasks.put(None)
+        for p in procs:
+            p.join(timeout=2.0)
+            if p.is_alive():
+                p.terminate()
+        ring.close()
+
+    if errors:
+        raise errors[0]
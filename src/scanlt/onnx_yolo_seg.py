@@ -1,12 +1,16 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field, replace
+from typing import Optional, Sequence
 
 import numpy as np
 
+from ._accel import batched_nms, decode_yolo_seg, letterbox_normalize
 from .api import Detection
 from .backends import choose_backend
+from .frames import BGR, channel_order
+from .masks import InstanceMask, _ProtoSource
+from .ort_session import SessionConfig, create_session, providers_for_backend
 
 
 @dataclass(frozen=True)
@@ -15,75 +19,20 @@ class YoloSegConfig:
     conf_thres: float = 0.25
     iou_thres: float = 0.45
     max_det: int = 50
-
-
-def _sigmoid(x: np.ndarray) -> np.ndarray:
-    return 1.0 / (1.0 + np.exp(-x))
-
-
-def _nms_xyxy(boxes: np.ndarray, scores: np.ndarray, iou_thres: float, max_det: int) -> list[int]:
-    # boxes: (N,4) xyxy
-    if boxes.size == 0:
-        return []
-
-    x1 = boxes[:, 0]
-    y1 = boxes[:, 1]
-    x2 = boxes[:, 2]
-    y2 = boxes[:, 3]
-
-    areas = (x2 - x1).clip(min=0) * (y2 - y1).clip(min=0)
-    order = scores.argsort()[::-1]
-
-    keep: list[int] = []
-    while order.size > 0 and len(keep) < max_det:
-        i = int(order[0])
-        keep.append(i)
-        if order.size == 1:
-            break
-
-        xx1 = np.maximum(x1[i], x1[order[1:]])
-        yy1 = np.maximum(y1[i], y1[order[1:]])
-        xx2 = np.minimum(x2[i], x2[order[1:]])
-        yy2 = np.minimum(y2[i], y2[order[1:]])
-
-        w = (xx2 - xx1).clip(min=0)
-        h = (yy2 - yy1).clip(min=0)
-        inter = w * h
-        union = areas[i] + areas[order[1:]] - inter
-        iou = np.where(union > 0, inter / union, 0)
-
-        inds = np.where(iou <= iou_thres)[0]
-        order = order[inds + 1]
-
-    return keep
-
-
-def _letterbox_rgb(img: np.ndarray, new_size: int) -> tuple[np.ndarray, float, int, int]:
-    # img: HWC RGB uint8
-    h0, w0 = img.shape[:2]
-    r = min(new_size / h0, new_size / w0)
-    new_unpad = (int(round(w0 * r)), int(round(h0 * r)))
-
-    pad_w = new_size - new_unpad[0]
-    pad_h = new_size - new_unpad[1]
-    dw = pad_w // 2
-    dh = pad_h // 2
-
-    try:
-        import cv2  # type: ignore
-
-        resized = cv2.resize(img, new_unpad, interpolation=cv2.INTER_LINEAR)
-        out = np.full((new_size, new_size, 3), 114, dtype=np.uint8)
-        out[dh : dh + new_unpad[1], dw : dw + new_unpad[0]] = resized
-        return out, r, dw, dh
-    except Exception:
-        # Fallback: resize via Pillow (always available as a dependency)
-        from PIL import Image as _PILImage
-
-        resized = np.array(_PILImage.fromarray(img).resize(new_unpad))
-        out = np.full((new_size, new_size, 3), 114, dtype=np.uint8)
-        out[dh : dh + new_unpad[1], dw : dw + new_unpad[0]] = resized
-        return out, r, dw, dh
+    # Candidates entering NMS are pre-selected to the best `max_nms` by score.
+    max_nms: int = 3000
+    # Class-agnostic NMS lets boxes of different classes suppress each other.
+    agnostic_nms: bool = False
+    # Attach (lazy, box-relative) instance masks to detections.
+    masks: bool = True
+    # Bind persistent input/output buffers to the session (ORT IO binding).
+    io_binding: bool = True
+    # For models with dynamic spatial axes, pad only up to the next `stride`
+    # multiple (e.g. 640x384 for 16:9) instead of to a square img_size x img_size.
+    rect: bool = True
+    stride: int = 32
+    # ONNX Runtime session options and optimized-model cache.
+    session: SessionConfig = field(default_factory=SessionConfig)
 
 
 class OnnxYoloSegDetector:
@@ -100,7 +49,7 @@ class OnnxYoloSegDetector:
         config: Optional[YoloSegConfig] = None,
     ):
         self.model_path = model_path
-        self.backend_choice = choose_backend(backend)
+        self.backend_choice = choose_backend(backend, runtime="onnx")
         self.cfg = config or YoloSegConfig()
 
         try:
@@ -110,90 +59,195 @@ class OnnxYoloSegDetector:
                 "onnxruntime is required for OnnxYoloSegDetector. Install with: pip install 'scanlt3d[onnx]'"
             ) from e
 
-        providers = None
-        bc = self.backend_choice.name
-        if bc == "cuda":
-            providers = ["CUDAExecutionProvider", "CPUExecutionProvider"]
-        elif bc == "dml":
-            providers = ["DmlExecutionProvider", "CPUExecutionProvider"]
-        else:
-            providers = ["CPUExecutionProvider"]
-
-        self.session = ort.InferenceSession(self.model_path, providers=providers)
+        providers = providers_for_backend(self.backend_choice.name)
+        self.session = create_session(self.model_path, providers, self.cfg.session)
         self.input_name = self.session.get_inputs()[0].name
+        in_shape = self.session.get_inputs()[0].shape
+        dims = in_shape[2:]
+        self.dynamic_hw = len(dims) == 2 and not any(isinstance(d, int) for d in dims)
+        self.dynamic_batch = bool(in_shape) and not isinstance(in_shape[0], int)
         self._output_names = [o.name for o in self.session.get_outputs()]
+        self._det_name, self._proto_name = self._resolve_output_roles()
+
+        # Persistent (1,3,S,S) input tensor, refilled in place every frame.
+        self._input = np.empty((1, 3, self.cfg.img_size, self.cfg.img_size), dtype=np.float32)
+        self._reset_io_binding(ort)
+        # Input tensor + IO binding of other rectangular input shapes seen recently.
+        self._per_shape: dict[tuple[int, int], tuple] = {}
+        # Reused (B, 3, H, W) tensor for predict_batch().
+        self._batch_input: Optional[np.ndarray] = None
+
+    def _reset_io_binding(self, ort) -> None:
+        self._binding = None
+        self._bound_names: list[str] = []
+        self._out_bufs: dict[str, np.ndarray] = {}
+        if self.cfg.io_binding:
+            try:
+                self._setup_io_binding(ort)
+            except Exception:
+                self._binding = None
+                self._bound_names = []
+                self._out_bufs = {}
+
+    def reconfigure(self, *, img_size: Optional[int] = None, masks: Optional[bool] = None) -> None:
+        """Change the input size and/or mask output without reloading the session.
+
+        Raises ``ValueError`` if the model has a fixed input size different from
+        ``img_size``.
+        """
+        if img_size is not None and img_size != self.cfg.img_size:
+            dims = self.session.get_inputs()[0].shape[2:]
+            if any(isinstance(d, int) and d != img_size for d in dims):
+                raise ValueError(
+                    f"Model input size is fixed at {list(dims)}; cannot run at img_size={img_size}"
+                )
+            import onnxruntime as ort  # type: ignore
 
-    def predict(self, frame: np.ndarray) -> list[Detection]:
-        # frame: RGB uint8 HWC
-        img, r, dw, dh = _letterbox_rgb(frame, self.cfg.img_size)
-        inp = img.astype(np.float32) / 255.0
-        inp = np.transpose(inp, (2, 0, 1))[None, ...]
-
-        outputs = self.session.run(None, {self.input_name: inp})
+            self.cfg = replace(self.cfg, img_size=img_size)
+            self._input = np.empty((1, 3, img_size, img_size), dtype=np.float32)
+            self._reset_io_binding(ort)
+            self._per_shape.clear()
+        if masks is not None:
+            self.cfg = replace(self.cfg, masks=masks)
+
+    def _rect_shape(self, h0: int, w0: int) -> tuple[int, int]:
+        """Smallest stride-aligned input holding the frame scaled to fit img_size."""
+        r = self.cfg.img_size / max(h0, w0)
+        st = max(1, self.cfg.stride)
+        in_h = -(-int(round(h0 * r)) // st) * st
+        in_w = -(-int(round(w0 * r)) // st) * st
+        return in_h, in_w
+
+    def _use_input_shape(self, in_h: int, in_w: int) -> None:
+        """Swap in the persistent input tensor (and binding) for this input shape."""
+        cur = tuple(self._input.shape[2:])
+        if cur == (in_h, in_w):
+            return
+        self._per_shape[cur] = (self._input, self._binding, self._bound_names, self._out_bufs)
+        state = self._per_shape.pop((in_h, in_w), None)
+        if state is not None:
+            self._input, self._binding, self._bound_names, self._out_bufs = state
+            return
+        # A camera rarely changes resolution; keep only a handful of shapes around.
+        while len(self._per_shape) > 3:
+            self._per_shape.pop(next(iter(self._per_shape)))
+
+        import onnxruntime as ort  # type: ignore
+
+        self._input = np.empty((1, 3, in_h, in_w), dtype=np.float32)
+        self._reset_io_binding(ort)
+
+    def _resolve_output_roles(self) -> tuple[Optional[str], Optional[str]]:
+        """Find the det (rank 3) and proto (rank 4) outputs once, at load time."""
+        outs = self.session.get_outputs()
+        names = [o.name for o in outs]
 
         # Identify det and proto outputs by ONNX output names first
-        det = None
-        proto = None
-        output_map = dict(zip(self._output_names, outputs))
-
-        if "output0" in output_map and "output1" in output_map:
-            det = output_map["output0"]
-            proto = output_map["output1"]
+        if "output0" in names and "output1" in names:
+            return "output0", "output1"
+
+        # Fallback: rank-based heuristic
+        det_name = None
+        proto_name = None
+        for o in outs:
+            if len(o.shape) == 4 and proto_name is None:
+                proto_name = o.name
+            elif len(o.shape) == 3 and det_name is None:
+                det_name = o.name
+        return det_name, proto_name
+
+    def _setup_io_binding(self, ort) -> None:
+        """Bind the persistent input tensor and preallocated output buffers once.
+
+        Outputs with a fully static shape get a persistent NumPy buffer that ORT
+        writes into every run; outputs with symbolic dims are left to ORT.
+        """
+        binding = self.session.io_binding()
+        binding.bind_ortvalue_input(self.input_name, ort.OrtValue.ortvalue_from_numpy(self._input))
+
+        for o in self.session.get_outputs():
+            if o.name not in (self._det_name, self._proto_name):
+                continue
+            self._bound_names.append(o.name)
+            if all(isinstance(d, int) for d in o.shape):
+                buf = np.empty(o.shape, dtype=np.float32)
+                binding.bind_ortvalue_output(o.name, ort.OrtValue.ortvalue_from_numpy(buf))
+                self._out_bufs[o.name] = buf
+            else:
+                binding.bind_output(o.name, "cpu")
+
+        self._binding = binding
+
+    def _infer(self, inp: np.ndarray) -> tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """Run the session; returns (det, proto) outputs (either may be None)."""
+        if self._binding is not None and inp is self._input:
+            self.session.run_with_iobinding(self._binding)
+            if len(self._out_bufs) == len(self._bound_names):
+                outs = self._out_bufs
+            else:
+                outs = dict(zip(self._bound_names, self._binding.copy_outputs_to_cpu()))
         else:
-            # Fallback: shape-based heuristic
-            for out in outputs:
-                if out.ndim == 4 and out.shape[0] == 1:
-                    proto = out
-                elif out.ndim == 3 and out.shape[0] == 1 and det is None:
-                    det = out
-
-        if det is None:
-            return []
-
-        det = det[0]  # remove batch dim
-        # YOLOv8 ONNX outputs (D, N) where D=attributes, N=anchors
-        # We need (N, D) — rows are detections, columns are attributes
-        if det.shape[0] < det.shape[1]:
+            outs = dict(zip(self._output_names, self.session.run(None, {self.input_name: inp})))
+
+        det = outs.get(self._det_name) if self._det_name is not None else None
+        proto = outs.get(self._proto_name) if self._proto_name is not None else None
+        return det, proto
+
+    def _decode(
+        self, det: np.ndarray, proto_c: int
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Decode one image's raw output into (boxes, conf, class_id, coeffs) candidates."""
+        # YOLOv8 ONNX outputs (D, N) where D=attributes, N=anchors.
+        # Some exports are transposed to (N, D); decode reads (D, N) views.
+        if det.shape[0] > det.shape[1]:
             det = det.T
 
         # YOLOv8-seg format: [x,y,w,h, cls0..cls79, mask0..mask31]
         # No objectness score — confidence = max class score
-        proto_c = int(proto.shape[1]) if proto is not None else 32
-        if det.shape[1] < 4 + proto_c:
-            return []
-
-        mask_coeffs = det[:, -proto_c:]
-        cls_scores = det[:, 4:-proto_c]
-
-        if cls_scores.shape[1] == 0:
-            return []
+        if det.shape[0] <= 4 + proto_c:
+            return (
+                np.zeros((0, 4), dtype=np.float32),
+                np.zeros(0, dtype=np.float32),
+                np.zeros(0, dtype=np.int32),
+                np.zeros((0, proto_c), dtype=np.float32),
+            )
 
-        conf = cls_scores.max(axis=1)
-        class_id = cls_scores.argmax(axis=1).astype(np.int32)
+        # Fused class max/argmax + threshold + xywh->xyxy; only survivors are materialized.
+        return decode_yolo_seg(det, proto_c, self.cfg.conf_thres)
 
-        keep = conf >= self.cfg.conf_thres
-        if not np.any(keep):
-            return []
-
-        det = det[keep]
-        conf = conf[keep]
-        class_id = class_id[keep]
-        mask_coeffs = mask_coeffs[keep]
-
-        # boxes xywh -> xyxy on letterboxed image
-        xywh = det[:, 0:4]
-        x = xywh[:, 0]
-        y = xywh[:, 1]
-        w = xywh[:, 2]
-        h = xywh[:, 3]
-        boxes = np.stack([x - w / 2, y - h / 2, x + w / 2, y + h / 2], axis=1)
-
-        # NMS
-        keep_idx = _nms_xyxy(boxes, conf, self.cfg.iou_thres, self.cfg.max_det)
-        boxes = boxes[keep_idx]
-        conf = conf[keep_idx]
-        class_id = class_id[keep_idx]
-        mask_coeffs = mask_coeffs[keep_idx]
+    def _nms(
+        self,
+        boxes: np.ndarray,
+        conf: np.ndarray,
+        class_id: np.ndarray,
+        batch_idx: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        return batched_nms(
+            boxes,
+            conf,
+            class_id,
+            batch_idx,
+            iou_threshold=self.cfg.iou_thres,
+            max_det=self.cfg.max_det,
+            top_k=self.cfg.max_nms,
+            agnostic=self.cfg.agnostic_nms,
+        )
+
+    def _to_detections(
+        self,
+        boxes: np.ndarray,
+        conf: np.ndarray,
+        class_id: np.ndarray,
+        mask_coeffs: np.ndarray,
+        proto_src: Optional[np.ndarray],
+        letterbox: tuple[float, float, float],
+        in_shape: tuple[int, int],
+        frame_shape: tuple[int, int],
+    ) -> list[Detection]:
+        """Map kept boxes back to the frame and attach lazy masks."""
+        r, dw, dh = letterbox
+        in_h, in_w = in_shape
+        h0, w0 = frame_shape
 
         # map boxes back to original frame
         # undo padding and scale
@@ -202,48 +256,24 @@ class OnnxYoloSegDetector:
         boxes /= r
 
         # clip
-        h0, w0 = frame.shape[:2]
         boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, w0 - 1)
         boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, h0 - 1)
 
-        # Compute masks if proto available
-        masks = None
-        if proto is not None:
-            proto = proto[0]  # (C, Hp, Wp)
-            # masks in proto space
-            m = mask_coeffs @ proto.reshape(proto_c, -1)  # (N, Hp*Wp)
-            m = _sigmoid(m).reshape(-1, proto.shape[1], proto.shape[2])  # (N, Hp, Wp)
-
-            # upsample to letterbox size
-            try:
-                import cv2  # type: ignore
-
-                up = []
-                for i in range(m.shape[0]):
-                    up.append(cv2.resize(m[i], (self.cfg.img_size, self.cfg.img_size), interpolation=cv2.INTER_LINEAR))
-                masks = np.stack(up, axis=0)
-            except Exception:
-                masks = m
-
-            # remove padding and scale to original frame
-            # crop padding
-            masks = masks[:, dh : dh + int(round(h0 * r)), dw : dw + int(round(w0 * r))]
-            # resize to original
-            try:
-                import cv2  # type: ignore
-
-                up2 = []
-                for i in range(masks.shape[0]):
-                    up2.append(cv2.resize(masks[i], (w0, h0), interpolation=cv2.INTER_LINEAR))
-                masks = np.stack(up2, axis=0)
-            except Exception:
-                pass
-
         detections: list[Detection] = []
         for i in range(boxes.shape[0]):
-            det_mask = masks[i] if masks is not None else None
+            bx1, by1, bx2, by2 = (float(v) for v in boxes[i])
+            det_mask = None
+            if proto_src is not None:
+                x0, y0 = int(bx1), int(by1)
+                x1 = max(x0 + 1, min(w0, int(np.ceil(bx2))))
+                y1 = max(y0 + 1, min(h0, int(np.ceil(by2))))
+                det_mask = InstanceMask(
+                    (x0, y0, x1, y1),
+                    (h0, w0),
+                    source=_ProtoSource(mask_coeffs[i], proto_src, r, dw, dh, in_h, in_w),
+                )
             det_obj = Detection(
-                xyxy=(float(boxes[i, 0]), float(boxes[i, 1]), float(boxes[i, 2]), float(boxes[i, 3])),
+                xyxy=(bx1, by1, bx2, by2),
                 score=float(conf[i]),
                 class_id=int(class_id[i]),
                 mask=det_mask,
@@ -251,3 +281,108 @@ class OnnxYoloSegDetector:
             detections.append(det_obj)
 
         return detections
+
+    def predict(self, frame: np.ndarray) -> list[Detection]:
+        # frame: uint8 HWC, RGB unless tagged BGR (swapped during the letterbox pass)
+        h0, w0 = frame.shape[:2]
+        if self.cfg.rect and self.dynamic_hw:
+            self._use_input_shape(*self._rect_shape(h0, w0))
+        inp, r, dw, dh = letterbox_normalize(
+            frame, self.cfg.img_size, out=self._input, swap_rb=channel_order(frame) == BGR
+        )
+
+        det, proto = self._infer(inp)
+        if det is None:
+            return []
+
+        proto_c = int(proto.shape[1]) if proto is not None else 32
+        boxes, conf, class_id, mask_coeffs = self._decode(det[0], proto_c)
+        if boxes.shape[0] == 0:
+            return []
+
+        keep_idx = self._nms(boxes, conf, class_id)
+
+        # Masks are rendered lazily, only inside each box, when a consumer reads them.
+        proto_src = None
+        if proto is not None and self.cfg.masks:
+            # The bound proto buffer is overwritten by the next run; lazy masks get a snapshot.
+            proto_src = proto[0].copy() if self._proto_name in self._out_bufs else proto[0]
+
+        return self._to_detections(
+            boxes[keep_idx],
+            conf[keep_idx],
+            class_id[keep_idx],
+            mask_coeffs[keep_idx],
+            proto_src,
+            (r, dw, dh),
+            tuple(inp.shape[2:]),
+            (h0, w0),
+        )
+
+    def predict_batch(self, frames: Sequence[np.ndarray]) -> list[list[Detection]]:
+        """Run several frames through one session call; returns one list per frame.
+
+        Frames are letterboxed into a single (B, 3, H, W) tensor when the model
+        has a dynamic batch axis; otherwise this falls back to :meth:`predict`
+        per frame. Candidates of all images go through one batched NMS call.
+        """
+        frames = list(frames)
+        if not self.dynamic_batch or len(frames) <= 1:
+            return [self.predict(f) for f in frames]
+
+        shapes = {f.shape[:2] for f in frames}
+        if self.cfg.rect and self.dynamic_hw and len(shapes) == 1:
+            in_h, in_w = self._rect_shape(*frames[0].shape[:2])
+        else:
+            in_h = in_w = self.cfg.img_size
+
+        b = len(frames)
+        buf = self._batch_input
+        if buf is None or buf.shape != (b, 3, in_h, in_w):
+            buf = self._batch_input = np.empty((b, 3, in_h, in_w), dtype=np.float32)
+        letterboxes = []
+        for i, frame in enumerate(frames):
+            _, r, dw, dh = letterbox_normalize(
+                frame, self.cfg.img_size, out=buf[i : i + 1], swap_rb=channel_order(frame) == BGR
+            )
+            letterboxes.append((r, dw, dh))
+
+        outs = dict(zip(self._output_names, self.session.run(None, {self.input_name: buf})))
+        det = outs.get(self._det_name) if self._det_name is not None else None
+        proto = outs.get(self._proto_name) if self._proto_name is not None else None
+        if det is None:
+            return [[] for _ in frames]
+
+        proto_c = int(proto.shape[1]) if proto is not None else 32
+        decoded = [self._decode(det[i], proto_c) for i in range(b)]
+        counts = [d[0].shape[0] for d in decoded]
+        if sum(counts) == 0:
+            return [[] for _ in frames]
+
+        boxes = np.concatenate([d[0] for d in decoded])
+        conf = np.concatenate([d[1] for d in decoded])
+        class_id = np.concatenate([d[2] for d in decoded])
+        coeffs = np.concatenate([d[3] for d in decoded])
+        batch_idx = np.repeat(np.arange(b, dtype=np.int32), counts)
+
+        # One NMS call for the whole batch; kept indices come back grouped by image.
+        keep_idx = self._nms(boxes, conf, class_id, batch_idx)
+        kept_batch = batch_idx[keep_idx]
+
+        results: list[list[Detection]] = []
+        for i, frame in enumerate(frames):
+            sel = keep_idx[kept_batch == i]
+            proto_src = proto[i] if proto is not None and self.cfg.masks else None
+            results.append(
+                self._to_detections(
+                    boxes[sel],
+                    conf[sel],
+                    class_id[sel],
+                    coeffs[sel],
+                    proto_src,
+                    letterboxes[i],
+                    (in_h, in_w),
+                    tuple(frame.shape[:2]),
+                )
+            )
+        return results
@@ -0,0 +1,179 @@
+"""ONNX Runtime session construction with tunable options and an optimized-model cache."""
+
+from __future__ import annotations
+
+import os
+import pathlib
+import platform
+from dataclasses import dataclass
+from typing import Any, Optional
+
+_GRAPH_OPT_LEVELS = {
+    "disable": "ORT_DISABLE_ALL",
+    "basic": "ORT_ENABLE_BASIC",
+    "extended": "ORT_ENABLE_EXTENDED",
+    "all": "ORT_ENABLE_ALL",
+}
+
+# Highest level whose optimized graph is portable. "all" adds layout
+# transformations (e.g. NCHWc) chosen for the CPU the session runs on, so
+# those passes run at load time instead of being serialized.
+_SERIALIZE_LEVEL = "extended"
+
+_EXECUTION_MODES = {
+    "sequential": "ORT_SEQUENTIAL",
+    "parallel": "ORT_PARALLEL",
+}
+
+
+@dataclass(frozen=True)
+class SessionConfig:
+    """ONNX Runtime ``SessionOptions`` surface.
+
+    - ``graph_optimization``: disable / basic / extended / all
+    - ``intra_op_threads`` / ``inter_op_threads``: 0 lets ORT decide
+    - ``execution_mode``: sequential / parallel
+    - ``cache_optimized_model``: serialize the optimized graph under the model
+      cache directory and load it directly on later process starts (at most
+      the "extended" optimizations are cached; "all" finishes at load time)
+    """
+
+    graph_optimization: str = "all"
+    intra_op_threads: int = 0
+    inter_op_threads: int = 0
+    execution_mode: str = "sequential"
+    enable_cpu_mem_arena: bool = True
+    enable_mem_pattern: bool = True
+    cache_optimized_model: bool = True
+    cache_dir: Optional[str] = None
+
+
+def providers_for_backend(name: str) -> list[str]:
+    """Map a ``BackendChoice.name`` to an ORT execution provider list."""
+    if name == "cuda":
+        return ["CUDAExecutionProvider", "CPUExecutionProvider"]
+    if name == "dml":
+        return ["DmlExecutionProvider", "CPUExecutionProvider"]
+    return ["CPUExecutionProvider"]
+
+
+def _session_options(ort: Any, cfg: SessionConfig, *, graph_optimization: Optional[str] = None) -> Any:
+    level = graph_optimization or cfg.graph_optimization
+    if level not in _GRAPH_OPT_LEVELS:
+        raise ValueError(
+            f"Unknown graph_optimization '{level}'. Choose one of: {', '.join(_GRAPH_OPT_LEVELS)}"
+        )
+    if cfg.execution_mode not in _EXECUTION_MODES:
+        raise ValueError(
+            f"Unknown execution_mode '{cfg.execution_mode}'. Choose one of: {', '.join(_EXECUTION_MODES)}"
+        )
+
+    so = ort.SessionOptions()
+    so.graph_optimization_level = getattr(ort.GraphOptimizationLevel, _GRAPH_OPT_LEVELS[level])
+    so.execution_mode = getattr(ort.ExecutionMode, _EXECUTION_MODES[cfg.execution_mode])
+    if cfg.intra_op_threads > 0:
+        so.intra_op_num_threads = cfg.intra_op_threads
+    if cfg.inter_op_threads > 0:
+        so.inter_op_num_threads = cfg.inter_op_threads
+    so.enable_cpu_mem_arena = cfg.enable_cpu_mem_arena
+    so.enable_mem_pattern = cfg.enable_mem_pattern
+    return so
+
+
+def _serialized_level(cfg: SessionConfig) -> str:
+    levels = list(_GRAPH_OPT_LEVELS)
+    if cfg.graph_optimization not in levels:
+        return cfg.graph_optimization  # rejected by _session_options
+    return min(cfg.graph_optimization, _SERIALIZE_LEVEL, key=levels.index)
+
+
+def optimized_model_path(model_path: str, providers: list[str], cfg: SessionConfig) -> pathlib.Path:
+    """Cache location of the optimized graph for this model/provider/ORT version."""
+    import onnxruntime as ort  # type: ignore
+
+    from .model_zoo import _default_cache_dir, file_sha256
+
+    src = pathlib.Path(model_path)
+    cache = pathlib.Path(cfg.cache_dir) if cfg.cache_dir is not None else _default_cache_dir()
+    # Models outside the cache (user paths, shared mounts) get their hash stamp
+    # under the cache instead of a sidecar file next to them.
+    try:
+        owned = src.resolve().is_relative_to(cache.resolve())
+    except OSError:
+        owned = False
+    digest = file_sha256(src, stamp_dir=None if owned else cache / "optimized" / "stamps")[:16]
+    provider = providers[0].replace("ExecutionProvider", "").lower() if providers else "default"
+    machine = platform.machine().lower() or "unknown"
+    level = _serialized_level(cfg)
+    name = f"{src.stem}-{digest}-{provider}-{machine}-ort{ort.__version__}-{level}.onnx"
+    return cache / "optimized" / name
+
+
+def create_session(model_path: str, providers: list[str], cfg: Optional[SessionConfig] = None) -> Any:
+    """Create an ``ort.InferenceSession`` configured by ``cfg``.
+
+    With ``cache_optimized_model`` the first start writes the optimized graph to
+    the cache; later starts load it without repeating those passes. Only
+    hardware-independent optimizations (up to "extended") are serialized, so a
+    shared cache directory never hands one CPU a graph laid out for another;
+    with "all" the layout passes run when the cached graph is loaded.
+    """
+    try:
+        import onnxruntime as ort  # type: ignore
+    except Exception as e:
+        raise RuntimeError(
+            "onnxruntime is required for ONNX models. Install with: pip install 'scanlt3d[onnx]'"
+        ) from e
+
+    cfg = cfg or SessionConfig()
+
+    if not cfg.cache_optimized_model or cfg.graph_optimization == "disable":
+        return ort.InferenceSession(model_path, sess_options=_session_options(ort, cfg), providers=providers)
+
+    try:
+        cached = optimized_model_path(model_path, providers, cfg)
+    except OSError:
+        return ort.InferenceSession(model_path, sess_options=_session_options(ort, cfg), providers=providers)
+
+    level = _serialized_level(cfg)
+    # Passes beyond the serialized level still have to run on load.
+    load_level = "disable" if level == cfg.graph_optimization else cfg.graph_optimization
+    if cached.exists():
+        try:
+            so = _session_options(ort, cfg, graph_optimization=load_level)
+            return ort.InferenceSession(str(cached), sess_options=so, providers=providers)
+        except Exception:
+            # Stale or corrupt cache entry: drop it and rebuild below.
+            try:
+                cached.unlink()
+            except OSError:
+                pass
+
+    so = _session_options(ort, cfg, graph_optimization=level)
+    tmp = cached.with_suffix(f".{os.getpid()}.part")
+    try:
+        cached.parent.mkdir(parents=True, exist_ok=True)
+        so.optimized_model_filepath = str(tmp)
+    except OSError:
+        tmp = None
+
+    try:
+        session = ort.InferenceSession(model_path, sess_options=so, providers=providers)
+    except Exception:
+        if tmp is None:
+            raise
+        # Some execution providers cannot serialize their optimized graph.
+        tmp = None
+        session = ort.InferenceSession(model_path, sess_options=_session_options(ort, cfg), providers=providers)
+
+    if tmp is not None and tmp.exists():
+        try:
+            tmp.replace(cached)
+        except OSError:
+            pass
+        else:
+            if load_level != "disable":
+                # This session stopped at the serialized level; finish on the cached graph.
+                so = _session_options(ort, cfg, graph_optimization=load_level)
+                session = ort.InferenceSession(str(cached), sess_options=so, providers=providers)
+    return session
@@ -0,0 +1,246 @@
+"""Pipelined (multi-threaded) execution mode for :func:`scanlt.run`.
+
+Each stage (capture, detection, depth) runs on its own worker thread and hands
+frames to the next stage through a bounded queue. The output stage (``on_result``
+and the preview window) stays on the calling thread because GUI toolkits such as
+OpenCV's HighGUI expect to be driven from the main thread.
+
+Every stage has exactly one worker and every queue is FIFO, so results come out
+in capture order even when frames are dropped by backpressure.
+"""
+
+from __future__ import annotations
+
+import collections
+import threading
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Optional
+
+import numpy as np
+
+from .api import Detection, Result, _now_s
+
+if TYPE_CHECKING:
+    from .adaptive import AdaptiveController
+    from .api import FrameSource, _Preview, _StageRunner
+
+
+BACKPRESSURE_POLICIES = ("drop_oldest", "drop_newest", "block")
+
+
+class _Closed(Exception):
+    """Raised by :meth:`_BoundedQueue.get` once the queue is closed and drained."""
+
+
+class _BoundedQueue:
+    """Small FIFO with a configurable overflow policy.
+
+    - ``drop_oldest``: evict the oldest queued item to make room (lowest latency).
+    - ``drop_newest``: discard the incoming item (keeps already queued work).
+    - ``block``: wait until the consumer makes room (no drops, highest latency).
+    """
+
+    def __init__(self, maxsize: int, policy: str):
+        if policy not in BACKPRESSURE_POLICIES:
+            raise ValueError(
+                f"Unknown backpressure '{policy}'. Choose one of: {', '.join(BACKPRESSURE_POLICIES)}"
+            )
+        self.maxsize = max(1, int(maxsize))
+        self.policy = policy
+        self.dropped = 0
+
+        self._items: collections.deque[Any] = collections.deque()
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def put(self, item: Any, stop: threading.Event) -> None:
+        with self._cond:
+            while len(self._items) >= self.maxsize:
+                if self.policy == "drop_oldest":
+                    self._items.popleft()
+                    self.dropped += 1
+                elif self.policy == "drop_newest":
+                    self.dropped += 1
+                    return
+                else:
+                    if stop.is_set() or self._closed:
+                        return
+                    self._cond.wait(0.05)
+            self._items.append(item)
+            self._cond.notify_all()
+
+    def get(self, stop: threading.Event) -> Any:
+        with self._cond:
+            while not self._items:
+                if self._closed or stop.is_set():
+                    raise _Closed()
+                self._cond.wait(0.05)
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+@dataclass
+class _Packet:
+    frame_id: int
+    frame: np.ndarray
+    detections: list[Detection]
+    detections_fresh: bool = False
+    depth: Optional[np.ndarray] = None
+    depth_fresh: bool = False
+
+
+class _Stage(threading.Thread):
+    """Worker thread that records the first exception instead of losing it."""
+
+    def __init__(self, name: str, target: Callable[[], None], errors: list[BaseException], stop: threading.Event):
+        super().__init__(name=name, daemon=True)
+        self._target_fn = target
+        self._errors = errors
+        self._stop_event = stop
+
+    def run(self) -> None:
+        try:
+            self._target_fn()
+        except BaseException as e:  # noqa: BLE001 - re-raised on the calling thread
+            self._errors.append(e)
+            self._stop_event.set()
+
+
+def run_pipelined(
+    *,
+    source: FrameSource,
+    stages: _StageRunner,
+    on_result: Optional[Callable[[Result], None]],
+    preview: Optional[_Preview],
+    target_fps: float,
+    max_frames: Optional[int],
+    queue_size: int = 2,
+    backpressure: str = "drop_oldest",
+    controller: Optional[AdaptiveController] = None,
+) -> None:
+    """Run capture → detect → depth → output with one thread per stage.
+
+    Usually called through ``scanlt.run(pipeline=True, ...)``; ``stages`` carries
+    the detector, depth estimator and their cadences. ``controller`` is fed the
+    detection stage's latency for every frame.
+    """
+
+    depth = stages.depth
+
+    stop = threading.Event()
+    errors: list[BaseException] = []
+
+    q_capture = _BoundedQueue(queue_size, backpressure)
+    q_detect = _BoundedQueue(queue_size, backpressure)
+    q_out = _BoundedQueue(queue_size, backpressure) if depth is not None else q_detect
+
+    frame_interval = 1.0 / max(target_fps, 1e-6)
+
+    def _capture() -> None:
+        it: Iterator[np.ndarray] = iter(source)
+        frame_id = 0
+        try:
+            while not stop.is_set():
+                t0 = _now_s()
+                try:
+                    frame = next(it)
+                except StopIteration:
+                    break
+                q_capture.put(_Packet(frame_id=frame_id, frame=frame, detections=[]), stop)
+                frame_id += 1
+
+                sleep_s = frame_interval - (_now_s() - t0)
+                if sleep_s > 0:
+                    stop.wait(sleep_s)
+        finally:
+            q_capture.close()
+            close = getattr(it, "close", None)
+            if close is not None:
+                close()
+
+    def _detect() -> None:
+        try:
+            while True:
+                pkt = q_capture.get(stop)
+                t0 = _now_s()
+                pkt.detections, pkt.detections_fresh = stages.detect(pkt.frame, pkt.frame_id)
+                if controller is not None:
+                    controller.observe(_now_s() - t0)
+                q_detect.put(pkt, stop)
+        except _Closed:
+            pass
+        finally:
+            q_detect.close()
+
+    def _depth() -> None:
+        try:
+            while True:
+                pkt = q_detect.get(stop)
+                pkt.depth, pkt.depth_fresh = stages.estimate_depth(
+                    pkt.frame, pkt.detections, pkt.frame_id
+                )
+                q_out.put(pkt, stop)
+        except _Closed:
+            pass
+        finally:
+            q_out.close()
+
+    workers = [
+        _Stage("scanlt-capture", _capture, errors, stop),
+        _Stage("scanlt-detect", _detect, errors, stop),
+    ]
+    if depth is not None:
+        workers.append(_Stage("scanlt-depth", _depth, errors, stop))
+
+    for st in workers:
+        st.start()
+
+    t_last = _now_s()
+    fps = 0.0
+    n = 0
+    try:
+        while True:
+            try:
+                pkt = q_out.get(stop)
+            except _Closed:
+                break
+
+            t1 = _now_s()
+            dt = max(t1 - t_last, 1e-9)
+            inst_fps = 1.0 / dt
+            fps = inst_fps if fps == 0.0 else (0.9 * fps + 0.1 * inst_fps)
+            t_last = t1
+
+            res = Result(
+                frame=pkt.frame,
+                detections=pkt.detections,
+                depth=pkt.depth,
+                fps=fps,
+                frame_id=pkt.frame_id,
+                detections_fresh=pkt.detections_fresh,
+                depth_fresh=pkt.depth_fresh,
+            )
+            if on_result is not None:
+                on_result(res)
+
+            if preview is not None and not preview.show(res):
+                break
+
+            n += 1
+            if max_frames is not None and n >= max_frames:
+                break
+    finally:
+        stop.set()
+        for q in (q_capture, q_detect, q_out):
+            q.close()
+        for st in workers:
+            st.join(timeout=1.0)
+
+    if errors:
+        raise errors[0]
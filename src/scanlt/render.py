@@ -0,0 +1,261 @@
+"""Drawing results into an image.
+
+The preview used to draw with OpenCV: a float32 blend over the whole frame per
+mask channel and detection, then ``cv2.rectangle`` / ``cv2.putText`` per box.
+Everything here goes through :func:`scanlt._accel.composite_detections`
+instead, which draws masks (8-bit fixed-point alpha), boxes and labels (a
+built-in bitmap font) in one pass over only the rows they touch. No OpenCV is
+needed, so :func:`render_result` also works headless, e.g. to save or stream
+annotated frames from ``on_result``.
+
+Depth panels go through :class:`DepthColorizer`. Normalizing every map to its
+own min / max makes the colors jump from frame to frame (one far pixel is
+enough); the colorizer maps robust percentiles instead and smooths that range
+over time, measuring each frame in the same pass that colors it.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional, Sequence
+
+import numpy as np
+
+from ._accel import (
+    COLORMAPS,
+    colorize_depth,
+    composite_detections,
+    depth_histogram,
+    draw_text,
+    swap_rb_inplace,
+)
+from .buffers import BufferPool
+from .frames import BGR, channel_order
+from .masks import InstanceMask
+
+if TYPE_CHECKING:
+    from .api import Detection, Result
+
+# Per-class colors (RGB), cycled by class id.
+DEFAULT_PALETTE = np.frombuffer(
+    bytes.fromhex(
+        "FF3838 FF9D97 FF701F FFB21D CFD231 48F90A 92CC17 3DDB86 1A9334 00D4BB"
+        "2C99A8 00C2FF 344593 6473FF 0018EC 8438FF 520085 CB38FF FF95C8 FF37C7"
+    ),
+    dtype=np.uint8,
+).reshape(-1, 3)
+
+
+def _label(det: Detection) -> str:
+    label = f"{det.class_id}:{det.score:.2f}"
+    if det.track_id is not None:
+        label = f"#{det.track_id} {label}"
+    return label
+
+
+def _mask_and_origin(
+    mask: InstanceMask | np.ndarray | None,
+) -> tuple[Optional[np.ndarray], tuple[int, int]]:
+    if mask is None:
+        return None, (0, 0)
+    if isinstance(mask, InstanceMask):
+        return mask.data, (int(mask.box[0]), int(mask.box[1]))
+    # Full-frame mask: binary (nonzero) or probabilities (> 0.5).
+    m = mask[..., 0] if mask.ndim == 3 else mask
+    if m.dtype != np.uint8:
+        m = m > (127.5 if m.max() > 1.0 else 0.5)
+    return m, (0, 0)
+
+
+def text_scale_for(width: int) -> int:
+    """Bitmap font scale that stays readable at a frame width (1 up to 1279 px)."""
+    return max(1, int(width) // 640)
+
+
+def draw_detections(
+    image: np.ndarray,
+    detections: Sequence[Detection],
+    *,
+    bgr: bool = False,
+    palette: Optional[np.ndarray] = None,
+    alpha: float = 0.45,
+    thickness: int = 2,
+    text_scale: Optional[int] = None,
+) -> np.ndarray:
+    """Draw masks, boxes and ``class:score`` labels onto ``image`` in place.
+
+    ``palette`` is (K, 3) RGB (default: :data:`DEFAULT_PALETTE`); pass
+    ``bgr=True`` when ``image`` is BGR. Returns ``image``.
+    """
+    if not detections:
+        return image
+    pal = DEFAULT_PALETTE if palette is None else np.asarray(palette, dtype=np.uint8)
+    if bgr:
+        pal = pal[:, ::-1]
+
+    masks, origins = [], []
+    for det in detections:
+        m, origin = _mask_and_origin(det.mask)
+        masks.append(m)
+        origins.append(origin)
+    has_masks = any(m is not None for m in masks)
+
+    return composite_detections(
+        image,
+        np.array([det.xyxy for det in detections], dtype=np.float32),
+        np.array([det.class_id for det in detections], dtype=np.int32),
+        np.ascontiguousarray(pal),
+        masks=masks if has_masks else None,
+        mask_origins=np.array(origins, dtype=np.int32) if has_masks else None,
+        labels=[_label(det) for det in detections],
+        alpha=alpha,
+        thickness=thickness,
+        text_scale=text_scale_for(image.shape[1]) if text_scale is None else text_scale,
+    )
+
+
+def _hist_quantile(
+    hist: np.ndarray, d_min: float, d_max: float, lo: float, hi: float, q: float
+) -> float:
+    """Approximate ``q``-th percentile from a :func:`depth_histogram` over ``[lo, hi]``."""
+    cum = np.cumsum(hist, dtype=np.float64)
+    target = q / 100.0 * float(cum[-1])
+    k = min(int(np.searchsorted(cum, target)), len(hist) - 1)
+    frac = (target - (float(cum[k - 1]) if k > 0 else 0.0)) / max(float(hist[k]), 1.0)
+    if k == 0:  # below lo: assume the values are spread evenly over [min, lo)
+        return d_min + (lo - d_min) * frac
+    if k == len(hist) - 1:  # above hi
+        return hi + (d_max - hi) * frac
+    return min(hi, lo + (k - 1 + frac) * (hi - lo) / 255.0)
+
+
+class DepthColorizer:
+    """Depth map → (H, W, 3) BGR image with a range that is stable over time.
+
+    - ``colormap``: one of ``scanlt._accel.COLORMAPS`` ("jet", "turbo", "inferno").
+    - ``percentiles``: the depth percentiles mapped to the two ends of the
+      colormap; ``(0, 100)`` is plain min / max. Values outside are clipped.
+    - ``smoothing``: weight of the previous range in an exponential moving
+      average, in ``[0, 1)``; 0 uses each frame's own range.
+
+    With smoothing, a frame is colored with the range carried over from the
+    previous frames and the same pass measures it for the next update, so each
+    frame costs one pass. Percentiles are then estimated from a 256-bin
+    histogram over the current range. Without smoothing (or on the first frame
+    after :meth:`reset`) the frame is measured first, which takes an extra pass.
+    """
+
+    def __init__(
+        self,
+        colormap: str = "jet",
+        percentiles: tuple[float, float] = (2.0, 98.0),
+        smoothing: float = 0.8,
+    ):
+        if colormap not in COLORMAPS:
+            raise ValueError(
+                f"Unknown colormap '{colormap}'. Choose one of: {', '.join(COLORMAPS)}"
+            )
+        low, high = (float(p) for p in percentiles)
+        if not 0.0 <= low < high <= 100.0:
+            raise ValueError("percentiles must satisfy 0 <= low < high <= 100")
+        if not 0.0 <= smoothing < 1.0:
+            raise ValueError("smoothing must be in [0, 1)")
+        self.colormap = colormap
+        self.percentiles = (low, high)
+        self.smoothing = float(smoothing)
+        self._range: Optional[tuple[float, float]] = None
+
+    @property
+    def range(self) -> Optional[tuple[float, float]]:
+        """Depth values currently mapped to the ends of the colormap."""
+        return self._range
+
+    def reset(self) -> None:
+        """Forget the carried range (e.g. after switching sources)."""
+        self._range = None
+
+    def _target(
+        self, hist: np.ndarray, d_min: float, d_max: float, lo: float, hi: float
+    ) -> Optional[tuple[float, float]]:
+        if d_min > d_max:  # no valid depth
+            return None
+        if self.percentiles == (0.0, 100.0):
+            return d_min, d_max
+        low, high = self.percentiles
+        return (
+            _hist_quantile(hist, d_min, d_max, lo, hi, low),
+            _hist_quantile(hist, d_min, d_max, lo, hi, high),
+        )
+
+    def __call__(self, depth: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Colorize ``depth`` ((H, W)); writes into ``out`` ((H, W, 3) uint8) when given."""
+        if self._range is None or self.smoothing == 0.0:
+            if self.percentiles == (0.0, 100.0):
+                # The kernel measures min / max itself.
+                img, d_min, d_max, _ = colorize_depth(depth, colormap=self.colormap, out=out)
+                self._range = (d_min, d_max) if d_min <= d_max else None
+                return img
+            d_min, d_max, hist = depth_histogram(depth)
+            self._range = self._target(hist, d_min, d_max, d_min, d_max)
+            lo, hi = self._range if self._range is not None else (None, None)
+            return colorize_depth(depth, lo, hi, self.colormap, out)[0]
+
+        lo, hi = self._range
+        img, d_min, d_max, hist = colorize_depth(depth, lo, hi, self.colormap, out)
+        target = self._target(hist, d_min, d_max, lo, hi)
+        if target is not None:
+            s = self.smoothing
+            self._range = (s * lo + (1.0 - s) * target[0], s * hi + (1.0 - s) * target[1])
+        return img
+
+
+def render_result(
+    res: Result,
+    *,
+    show_depth: bool = True,
+    detector_hint: bool = False,
+    pool: Optional[BufferPool] = None,
+    depth_colorizer: Optional[DepthColorizer] = None,
+) -> np.ndarray:
+    """Render a result the way the preview shows it. Returns a BGR image.
+
+    The frame with its detections and the FPS, followed on the right by the
+    depth map when ``show_depth`` and ``res.depth`` is set. The depth map is
+    colored by ``depth_colorizer`` (keep one across frames for a stable range),
+    or with JET over its own min / max without one. ``res.frame`` is left
+    untouched; with a ``pool`` the returned image and the scratch arrays come
+    from it.
+    """
+
+    def scratch(shape: tuple[int, ...]) -> Optional[np.ndarray]:
+        return pool.get(shape) if pool is not None else None
+
+    frame = res.frame
+    bgr = channel_order(frame) == BGR
+    vis = scratch(frame.shape)
+    if vis is None:
+        vis = np.array(frame, dtype=np.uint8)
+    else:
+        np.copyto(vis, frame)
+    scale = text_scale_for(vis.shape[1])
+
+    draw_detections(vis, res.detections, bgr=bgr, text_scale=scale)
+    draw_text(vis, f"FPS: {res.fps:.1f}", 10, 10, (0, 0, 255) if bgr else (255, 0, 0), scale)
+    if detector_hint:
+        hint = "No detector configured (pass detector=...)"
+        draw_text(vis, hint, 10, 10 + 12 * scale, (0, 255, 255) if bgr else (255, 255, 0), scale)
+
+    # BGR frames are drawn as is; RGB ones are swapped in place (vis is ours).
+    panels = [vis if bgr else swap_rb_inplace(vis)]
+
+    if show_depth and res.depth is not None:
+        d_out = scratch((*res.depth.shape[:2], 3))
+        if depth_colorizer is not None:
+            panels.append(depth_colorizer(res.depth, out=d_out))
+        else:
+            panels.append(colorize_depth(res.depth, out=d_out)[0])
+
+    if len(panels) == 1:
+        return panels[0]
+    h = panels[0].shape[0]
+    w = sum(p.shape[1] for p in panels)
+    return np.concatenate(panels, axis=1, out=scratch((h, w, 3)))
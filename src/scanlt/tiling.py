@@ -0,0 +1,169 @@
+"""Tiled (sliced) inference for high-resolution frames.
+
+A 4K frame letterboxed to 640 shrinks small objects below what the detector can
+see, while raising ``img_size`` grows cost quadratically. :class:`TiledDetector`
+instead cuts the frame into overlapping tiles of roughly the detector's input
+size, runs the detector on every tile (optionally plus one downscaled
+full-frame pass for large objects), maps the results back into frame
+coordinates and merges duplicates from overlapping tiles with NMS.
+
+Tiles are run through ``predict_batch`` when the detector provides it, and can
+be spread over several detectors (e.g. one ORT session per core group) running
+on parallel threads.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+
+from ._accel import batched_nms
+from .api import Detection, Detector
+from .masks import InstanceMask
+
+
+@dataclass(frozen=True)
+class TileConfig:
+    # Tile edge in frame pixels; usually the detector's img_size.
+    tile_size: int = 640
+    # Fraction of a tile shared with its neighbour, in [0, 1). Should exceed the
+    # size of the objects of interest so every object is whole in at least one tile.
+    overlap: float = 0.2
+    # Also run the detector on the whole (downscaled) frame to catch large objects.
+    full_frame: bool = True
+    # NMS used to merge detections from overlapping tiles.
+    iou_thres: float = 0.5
+    max_det: int = 300
+
+
+def _check_tiling(tile_size: int, overlap: float) -> None:
+    if tile_size < 1:
+        raise ValueError("tile_size must be at least 1")
+    # overlap >= 1 would step one pixel at a time; a negative one leaves gaps.
+    if not 0.0 <= overlap < 1.0:
+        raise ValueError("overlap must be in [0, 1)")
+
+
+def tile_grid(
+    h: int, w: int, tile_size: int, overlap: float = 0.2
+) -> list[tuple[int, int, int, int]]:
+    """Return ``(x0, y0, x1, y1)`` tiles covering an ``h x w`` frame.
+
+    Tiles are ``tile_size`` square (clipped to the frame) and overlap by at least
+    ``overlap`` (in ``[0, 1)``); the last row/column is aligned to the frame edge.
+    """
+    _check_tiling(tile_size, overlap)
+    step = max(1, int(tile_size * (1.0 - overlap)))
+
+    def starts(length: int) -> list[int]:
+        if length <= tile_size:
+            return [0]
+        s = list(range(0, length - tile_size, step))
+        return s + [length - tile_size]
+
+    return [
+        (x0, y0, min(w, x0 + tile_size), min(h, y0 + tile_size))
+        for y0 in starts(h)
+        for x0 in starts(w)
+    ]
+
+
+def _to_frame(det: Detection, x0: int, y0: int, frame_shape: tuple[int, int]) -> Detection:
+    bx1, by1, bx2, by2 = det.xyxy
+    mask = det.mask
+    if isinstance(mask, InstanceMask):
+        mask = mask.moved(x0, y0, frame_shape)
+    elif mask is not None:
+        # Tile-sized full mask: keep only the part under the box, box-relative.
+        # Boxes may overhang the tile, so clamp to the mask before slicing.
+        h, w = frame_shape
+        m = np.asarray(mask)
+        mh, mw = m.shape[:2]
+        mx0, my0 = min(max(int(bx1), 0), mw), min(max(int(by1), 0), mh)
+        mx1 = min(max(mx0 + 1, int(np.ceil(bx2))), mw)
+        my1 = min(max(my0 + 1, int(np.ceil(by2))), mh)
+        data = (m[my0:my1, mx0:mx1] > 0).astype(np.uint8)
+        mask = InstanceMask((mx0 + x0, my0 + y0, mx1 + x0, my1 + y0), (h, w), data)
+    return dataclasses.replace(det, xyxy=(bx1 + x0, by1 + y0, bx2 + x0, by2 + y0), mask=mask)
+
+
+class TiledDetector:
+    """Detector wrapper running ``detector`` on overlapping tiles of each frame.
+
+    ``detector`` may also be a sequence of detectors; tiles are then divided
+    among them and each runs on its own thread (ORT releases the GIL while a
+    session runs). Each detector is only ever used by one thread at a time.
+    """
+
+    def __init__(
+        self,
+        detector: Detector | Sequence[Detector],
+        config: Optional[TileConfig] = None,
+    ):
+        if isinstance(detector, (list, tuple)):
+            self.detectors = list(detector)
+        else:
+            self.detectors = [detector]
+        if not self.detectors:
+            raise ValueError("TiledDetector needs at least one detector")
+        self.cfg = config or TileConfig()
+        _check_tiling(self.cfg.tile_size, self.cfg.overlap)
+        self._pool = (
+            ThreadPoolExecutor(len(self.detectors), thread_name_prefix="scanlt-tile")
+            if len(self.detectors) > 1
+            else None
+        )
+
+    def _run(self, detector: Detector, crops: list[np.ndarray]) -> list[list[Detection]]:
+        predict_batch = getattr(detector, "predict_batch", None)
+        if predict_batch is not None and len(crops) > 1:
+            return predict_batch(crops)
+        return [detector.predict(c) for c in crops]
+
+    def predict(self, frame: np.ndarray) -> list[Detection]:
+        cfg = self.cfg
+        h, w = frame.shape[:2]
+        tiles = tile_grid(h, w, cfg.tile_size, cfg.overlap)
+        if cfg.full_frame and len(tiles) > 1:
+            tiles.append((0, 0, w, h))
+        crops = [frame[y0:y1, x0:x1] for x0, y0, x1, y1 in tiles]
+
+        n = len(self.detectors)
+        if self._pool is None or len(crops) == 1:
+            per_tile = self._run(self.detectors[0], crops)
+        else:
+            # Interleave tiles so every worker gets an equal share.
+            parts = [list(range(i, len(crops), n)) for i in range(n)]
+            futures = [
+                self._pool.submit(self._run, det, [crops[i] for i in idx])
+                for det, idx in zip(self.detectors, parts)
+            ]
+            per_tile = [[] for _ in crops]
+            for idx, fut in zip(parts, futures):
+                for i, dets in zip(idx, fut.result()):
+                    per_tile[i] = dets
+
+        if len(tiles) == 1:
+            return per_tile[0]
+
+        merged: list[Detection] = []
+        for (x0, y0, _, _), dets in zip(tiles, per_tile):
+            merged.extend(_to_frame(d, x0, y0, (h, w)) for d in dets)
+        if not merged:
+            return merged
+
+        boxes = np.array([d.xyxy for d in merged], dtype=np.float32)
+        scores = np.array([d.score for d in merged], dtype=np.float32)
+        class_ids = np.array([d.class_id for d in merged], dtype=np.int32)
+        keep = batched_nms(
+            boxes, scores, class_ids, iou_threshold=cfg.iou_thres, max_det=cfg.max_det
+        )
+        return [merged[i] for i in keep.tolist()]
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
@@ -0,0 +1,202 @@
+"""Lightweight SORT-style multi-object tracker.
+
+Each track is a constant-velocity Kalman filter over ``(cx, cy, area, aspect)``.
+All tracks are stored in stacked arrays so prediction and correction are a
+handful of batched matrix operations per frame; association builds one IoU
+matrix and matches it greedily, visiting only candidate pairs above the IoU
+threshold. This keeps per-frame cost flat with hundreds of tracks.
+
+Between detector runs :meth:`SortTracker.predict` extrapolates every track, so
+boxes keep moving on frames where the detector was skipped by a cadence or a
+motion gate.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+
+import numpy as np
+
+from ._accel import greedy_match, iou_matrix
+from .api import Detection
+from .masks import InstanceMask
+
+# State: [cx, cy, s, r, vcx, vcy, vs]; measurement: [cx, cy, s, r].
+_F = np.eye(7, dtype=np.float64)
+_F[0, 4] = _F[1, 5] = _F[2, 6] = 1.0
+_H = np.eye(4, 7, dtype=np.float64)
+_Q = np.diag([1.0, 1.0, 1.0, 1.0, 0.01, 0.01, 1e-4])
+_R = np.diag([1.0, 1.0, 10.0, 10.0])
+_P0 = np.diag([10.0, 10.0, 10.0, 10.0, 1e4, 1e4, 1e4])
+
+
+def _xyxy_to_z(b: np.ndarray) -> np.ndarray:
+    w = b[:, 2] - b[:, 0]
+    h = b[:, 3] - b[:, 1]
+    return np.stack(
+        [b[:, 0] + w / 2, b[:, 1] + h / 2, w * h, w / np.maximum(h, 1e-6)], axis=1
+    )
+
+
+def _x_to_xyxy(x: np.ndarray) -> np.ndarray:
+    s = np.maximum(x[:, 2], 0.0)
+    w = np.sqrt(s * np.maximum(x[:, 3], 0.0))
+    h = s / np.maximum(w, 1e-6)
+    return np.stack(
+        [x[:, 0] - w / 2, x[:, 1] - h / 2, x[:, 0] + w / 2, x[:, 1] + h / 2], axis=1
+    )
+
+
+class SortTracker:
+    """Assigns persistent ``track_id`` values to detections.
+
+    - ``iou_threshold``: minimum IoU between a detection and a predicted track box.
+    - ``max_age``: frames a track survives without a matching detection.
+    - ``min_hits``: matches needed before a track is reported.
+    - ``class_aware``: only match detections and tracks of the same class.
+
+    Call :meth:`update` with the detections of every frame the detector ran on
+    and :meth:`predict` on frames it did not; each call advances one frame.
+    """
+
+    def __init__(
+        self,
+        iou_threshold: float = 0.3,
+        *,
+        max_age: int = 30,
+        min_hits: int = 1,
+        class_aware: bool = True,
+    ):
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.min_hits = min_hits
+        self.class_aware = class_aware
+        self.reset()
+
+    def reset(self) -> None:
+        self._x = np.zeros((0, 7), dtype=np.float64)
+        self._p = np.zeros((0, 7, 7), dtype=np.float64)
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._hits = np.zeros(0, dtype=np.int64)
+        self._misses = np.zeros(0, dtype=np.int64)
+        self._classes = np.zeros(0, dtype=np.int64)
+        # Last matched detection per track (score, class and mask are carried over).
+        self._last: list[Detection] = []
+        self._next_id = 1
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _advance(self) -> None:
+        if not len(self._x):
+            return
+        # Keep the predicted area positive.
+        shrink = self._x[:, 2] + self._x[:, 6] <= 0
+        self._x[shrink, 6] = 0.0
+        self._x = self._x @ _F.T
+        self._p = _F @ self._p @ _F.T + _Q
+        self._misses += 1
+
+    def _prune(self) -> None:
+        alive = self._misses <= self.max_age
+        if alive.all():
+            return
+        self._x = self._x[alive]
+        self._p = self._p[alive]
+        self._ids = self._ids[alive]
+        self._hits = self._hits[alive]
+        self._misses = self._misses[alive]
+        self._classes = self._classes[alive]
+        self._last = [d for d, keep in zip(self._last, alive.tolist()) if keep]
+
+    def _emit(self, rows: np.ndarray) -> list[Detection]:
+        boxes = _x_to_xyxy(self._x[rows]).tolist()
+        out = []
+        for i, box in zip(rows.tolist(), boxes):
+            last = self._last[i]
+            mask = last.mask
+            if isinstance(mask, InstanceMask) and self._misses[i] > 0:
+                dx = int(round((box[0] + box[2] - last.xyxy[0] - last.xyxy[2]) / 2))
+                dy = int(round((box[1] + box[3] - last.xyxy[1] - last.xyxy[3]) / 2))
+                mask = mask.translated(dx, dy) if dx or dy else mask
+            elif mask is not None and self._misses[i] > 0:
+                # Full-frame masks cannot be moved cheaply; drop them when coasting.
+                mask = None
+            out.append(
+                dataclasses.replace(
+                    last, xyxy=tuple(box), mask=mask, track_id=int(self._ids[i])
+                )
+            )
+        return out
+
+    def update(self, detections: list[Detection]) -> list[Detection]:
+        """Advance one frame and correct the tracks with ``detections``.
+
+        Returns the detections that belong to confirmed tracks, in input order,
+        with ``track_id`` set; box, score, class and mask are the detector's own.
+        """
+        self._advance()
+
+        n = len(detections)
+        det_boxes = np.array([d.xyxy for d in detections], dtype=np.float32).reshape(n, 4)
+        det_cls = np.array([d.class_id for d in detections], dtype=np.int64)
+
+        rows = cols = np.zeros(0, dtype=np.int64)
+        if n and len(self._x):
+            iou = iou_matrix(det_boxes, _x_to_xyxy(self._x))
+            if self.class_aware:
+                iou[det_cls[:, None] != self._classes[None, :]] = 0.0
+            rows, cols = greedy_match(iou, self.iou_threshold)
+
+        if cols.size:
+            # Batched Kalman correction of the matched tracks.
+            z = _xyxy_to_z(det_boxes[rows].astype(np.float64))
+            p = self._p[cols]
+            s = _H @ p @ _H.T + _R
+            k = np.linalg.solve(s, _H @ p).transpose(0, 2, 1)
+            innov = z - self._x[cols] @ _H.T
+            self._x[cols] += np.einsum("kij,kj->ki", k, innov)
+            self._p[cols] = p - k @ _H @ p
+            self._hits[cols] += 1
+            self._misses[cols] = 0
+            self._classes[cols] = det_cls[rows]
+            for r, c in zip(rows.tolist(), cols.tolist()):
+                self._last[c] = detections[r]
+
+        new = np.ones(n, dtype=bool)
+        new[rows] = False
+        new_rows = np.flatnonzero(new)
+        track_of = np.empty(n, dtype=np.int64)
+        track_of[rows] = cols
+        track_of[new_rows] = len(self._ids) + np.arange(new_rows.size)
+        if new_rows.size:
+            k = new_rows.size
+            x = np.zeros((k, 7), dtype=np.float64)
+            x[:, :4] = _xyxy_to_z(det_boxes[new_rows].astype(np.float64))
+            self._x = np.concatenate([self._x, x])
+            self._p = np.concatenate([self._p, np.broadcast_to(_P0, (k, 7, 7))])
+            self._ids = np.concatenate([self._ids, np.arange(self._next_id, self._next_id + k)])
+            self._next_id += k
+            self._hits = np.concatenate([self._hits, np.ones(k, dtype=np.int64)])
+            self._misses = np.concatenate([self._misses, np.zeros(k, dtype=np.int64)])
+            self._classes = np.concatenate([self._classes, det_cls[new_rows]])
+            self._last.extend(detections[i] for i in new_rows.tolist())
+
+        confirmed = self._hits[track_of] >= self.min_hits
+        ids = self._ids[track_of].tolist()
+        out = [
+            dataclasses.replace(detections[r], track_id=ids[r])
+            for r in np.flatnonzero(confirmed).tolist()
+        ]
+        self._prune()
+        return out
+
+    def predict(self) -> list[Detection]:
+        """Advance one frame without detections.
+
+        Returns every confirmed track at its extrapolated position. Box-relative
+        masks are shifted along with the box.
+        """
+        self._advance()
+        self._prune()
+        return self._emit(np.flatnonzero(self._hits >= self.min_hits))